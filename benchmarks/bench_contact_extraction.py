@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: DOM-free contact extractor vs the BeautifulSoup implementation.
+Scores both against the expected contacts of the team-page fixtures (addresses found,
+false positives, names and roles right) and reports throughput.
+
+Usage: python benchmarks/bench_contact_extraction.py [--iterations 50]
+"""
+
+import sys
+import json
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from contact_extractor import BEAUTIFULSOUP_AVAILABLE, extract_contacts_bs4, extract_contacts_fast
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "team_pages"
+
+
+def load_fixtures():
+    """Load every team-page fixture as (name, html, expected contacts)."""
+    expected = json.loads((FIXTURES_DIR / "expected.json").read_text(encoding="utf-8"))
+    return [(name, (FIXTURES_DIR / name).read_text(encoding="utf-8"), contacts) for name, contacts in expected.items()]
+
+
+def score(extractor, fixtures) -> dict:
+    """Count expected addresses found, extra addresses, and correct names and roles."""
+    result = {"expected": 0, "found": 0, "extra": 0, "names": 0, "roles": 0}
+    for _, html_content, expected_contacts in fixtures:
+        expected = {contact["email"]: contact for contact in expected_contacts}
+        found = {}
+        for contact in extractor(html_content):
+            found.setdefault(contact["email"], contact)
+        
+        result["expected"] += len(expected)
+        result["extra"] += len(set(found) - set(expected))
+        for email, contact in expected.items():
+            if email in found:
+                result["found"] += 1
+                result["names"] += found[email]["name"] == contact["name"]
+                result["roles"] += found[email]["role"] == contact["role"]
+    return result
+
+
+def time_extractor(extractor, documents, iterations: int) -> float:
+    """Return total seconds spent extracting all documents `iterations` times."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for html_content in documents:
+            extractor(html_content)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=50, help="passes over the fixture set (default: 50)")
+    args = parser.parse_args()
+    
+    if not BEAUTIFULSOUP_AVAILABLE:
+        print("❌ BeautifulSoup library not installed!")
+        print("  Install with: pip install beautifulsoup4")
+        return 1
+    
+    fixtures = load_fixtures()
+    documents = [html_content for _, html_content, _ in fixtures]
+    total_bytes = sum(len(html_content.encode("utf-8")) for html_content in documents) * args.iterations
+    total_docs = len(documents) * args.iterations
+    engines = (("beautifulsoup", extract_contacts_bs4), ("fast", extract_contacts_fast))
+    
+    print(f"{'engine':<14} {'found':>9} {'extra':>6} {'names':>9} {'roles':>9}")
+    for label, extractor in engines:
+        result = score(extractor, fixtures)
+        print(
+            f"{label:<14} {result['found']:>4}/{result['expected']:<4} {result['extra']:>6} "
+            f"{result['names']:>4}/{result['found']:<4} {result['roles']:>4}/{result['found']:<4}"
+        )
+    
+    results = {}
+    for label, extractor in engines:
+        # Warm up before timing
+        time_extractor(extractor, documents, 1)
+        results[label] = time_extractor(extractor, documents, args.iterations)
+    
+    print(f"\n{'=' * 60}")
+    print(f"{len(fixtures)} fixtures x {args.iterations} iterations = {total_docs} documents")
+    for label, seconds in results.items():
+        print(
+            f"  {label:<14} {seconds:8.3f}s  {total_docs / seconds:10.0f} docs/s  "
+            f"{total_bytes / seconds / 1e6:7.2f} MB/s"
+        )
+    print(f"  speedup        {results['beautifulsoup'] / results['fast']:.1f}x")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,131 @@
+#!/usr/bin/env python3
+"""
+Benchmark: Public-Suffix-aware domain normalization vs the old two-part-TLD heuristic.
+Generates a synthetic stream of hosts shaped like show-notes links (a hot set of
+recurring sponsors plus a long tail of one-off hosts) and reports hosts/sec,
+cache hit rates, and how many hosts the old heuristic labelled differently.
+
+Usage: python benchmarks/bench_domains.py [--hosts 2000000] [--hot-ratio 0.8]
+"""
+
+import sys
+import time
+import random
+import argparse
+from pathlib import Path
+from urllib.parse import urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+import domains
+
+
+SUFFIXES = [
+    "com", "com", "com", "com", "net", "org", "io", "ai", "co", "fm", "tv", "me",
+    "co.uk", "com.au", "com.br", "co.jp", "de", "fr", "ca", "myshopify.com", "github.io",
+]
+SUBDOMAINS = ["", "", "", "www.", "shop.", "go.", "try.", "join.", "link."]
+WORDS = [
+    "athletic", "greens", "eight", "sleep", "helix", "drink", "lmnt", "inside", "tracker",
+    "express", "vpn", "better", "help", "master", "class", "rocket", "money", "zoc", "doc",
+    "square", "space", "shop", "notion", "levels", "calm", "oura", "ridge", "manscaped",
+]
+
+
+def legacy_domain_name(domain: str) -> str:
+    """The previous scraper heuristic, kept here as the baseline."""
+    parts = domain.lower().strip().split('.')
+    two_part_tlds = {'co', 'com', 'net', 'org', 'io', 'ai', 'tv', 'me', 'us', 'uk', 'ca', 'au'}
+    if len(parts) >= 3 and parts[-2] in two_part_tlds:
+        return parts[-3]
+    elif len(parts) >= 2:
+        return parts[-2]
+    return parts[0] if parts else domain
+
+
+def legacy_root_domain(url: str) -> str:
+    """The previous per-link URL parsing, kept here as the baseline."""
+    if not url.startswith(('http://', 'https://')):
+        url = 'https://' + url
+    domain = urlparse(url).netloc.lower()
+    if domain.startswith('www.'):
+        domain = domain[4:]
+    if ':' in domain:
+        domain = domain.split(':')[0]
+    return domain
+
+
+def random_host(rng: random.Random) -> str:
+    name = rng.choice(WORDS) + rng.choice(WORDS) + str(rng.randint(0, 99999))
+    return rng.choice(SUBDOMAINS) + name + "." + rng.choice(SUFFIXES)
+
+
+def generate_hosts(count: int, hot_ratio: float, seed: int = 42):
+    """Host stream where hot_ratio of entries come from a small recurring set."""
+    rng = random.Random(seed)
+    hot_set = [random_host(rng) for _ in range(2000)]
+    return [rng.choice(hot_set) if rng.random() < hot_ratio else random_host(rng) for _ in range(count)]
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--hosts", type=int, default=2_000_000, help="hosts to normalize (default: 2,000,000)")
+    parser.add_argument("--hot-ratio", type=float, default=0.8, help="share of recurring hosts (default: 0.8)")
+    args = parser.parse_args()
+    
+    start = time.perf_counter()
+    trie = domains.get_suffix_trie()
+    print(f"✓ Compiled {trie.rule_count} public suffix rules in {time.perf_counter() - start:.3f}s")
+    
+    print(f"Generating {args.hosts:,} hosts (hot ratio {args.hot_ratio:.0%})...")
+    hosts = generate_hosts(args.hosts, args.hot_ratio)
+    
+    start = time.perf_counter()
+    legacy_labels = [legacy_domain_name(host) for host in hosts]
+    legacy_seconds = time.perf_counter() - start
+    
+    # Uncached: the trie walk itself
+    uncached = domains.split_host.__wrapped__
+    start = time.perf_counter()
+    for host in hosts:
+        uncached(host)
+    uncached_seconds = time.perf_counter() - start
+    
+    # Cached: what the scraper actually pays
+    domains.split_host.cache_clear()
+    start = time.perf_counter()
+    labels = [domains.split_host(host)[1] for host in hosts]
+    cached_seconds = time.perf_counter() - start
+    
+    # Per link, as in the scraper's hot loop: URL -> root domain -> brand label
+    urls = [f"https://{host}/podcast" for host in hosts]
+    start = time.perf_counter()
+    for url in urls:
+        legacy_domain_name(legacy_root_domain(url))
+    legacy_link_seconds = time.perf_counter() - start
+    
+    domains.extract_host.cache_clear()
+    start = time.perf_counter()
+    for url in urls:
+        domains.extract_domain_name(domains.extract_root_domain(url))
+    link_seconds = time.perf_counter() - start
+    
+    differing = sum(1 for old, new in zip(legacy_labels, labels) if old != new.lower())
+    info = domains.split_host.cache_info()
+    
+    print(f"\n{'=' * 60}")
+    for label, seconds in (
+        ("legacy heuristic", legacy_seconds),
+        ("psl trie", uncached_seconds),
+        ("psl trie + lru", cached_seconds),
+    ):
+        print(f"  {label:<18} {seconds:8.3f}s  {len(hosts) / seconds:12,.0f} hosts/s")
+    print("  per link (url -> brand label):")
+    for label, seconds in (("legacy", legacy_link_seconds), ("psl trie + lru", link_seconds)):
+        print(f"  {label:<18} {seconds:8.3f}s  {len(urls) / seconds:12,.0f} links/s")
+    print(f"  cache: {info.hits:,} hits, {info.misses:,} misses ({info.hits / max(1, info.hits + info.misses):.1%} hit rate)")
+    print(f"  brand label differs from legacy heuristic for {differing:,} hosts ({differing / len(hosts):.1%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,90 @@
+#!/usr/bin/env python3
+"""
+Micro-benchmark: DOM-free link extractor vs the BeautifulSoup implementation.
+Runs both over the show-notes fixtures, checks they return identical links,
+and reports throughput.
+
+Usage: python benchmarks/bench_link_extraction.py [--iterations 200]
+"""
+
+import sys
+import time
+import argparse
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from link_extractor import BEAUTIFULSOUP_AVAILABLE, extract_links_bs4, extract_links_fast
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "show_notes"
+
+
+def load_fixtures():
+    """Load every show-notes fixture as (name, html)."""
+    return [(path.name, path.read_text(encoding="utf-8")) for path in sorted(FIXTURES_DIR.glob("*.html"))]
+
+
+def time_extractor(extractor, documents, iterations: int) -> float:
+    """Return total seconds spent extracting all documents `iterations` times."""
+    start = time.perf_counter()
+    for _ in range(iterations):
+        for html_content in documents:
+            extractor(html_content)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--iterations", type=int, default=200, help="passes over the fixture set (default: 200)")
+    args = parser.parse_args()
+    
+    if not BEAUTIFULSOUP_AVAILABLE:
+        print("❌ BeautifulSoup library not installed!")
+        print("  Install with: pip install beautifulsoup4")
+        return 1
+    
+    fixtures = load_fixtures()
+    if not fixtures:
+        print(f"❌ No fixtures found in {FIXTURES_DIR}")
+        return 1
+    
+    # Compatibility check first: both engines must agree on every fixture
+    mismatches = 0
+    for name, html_content in fixtures:
+        fast_links = extract_links_fast(html_content)
+        reference_links = extract_links_bs4(html_content)
+        if fast_links != reference_links:
+            mismatches += 1
+            print(f"⚠ {name}: outputs differ")
+            for link in sorted(reference_links - fast_links):
+                print(f"    - missing: {link}")
+            for link in sorted(fast_links - reference_links):
+                print(f"    + extra:   {link}")
+        else:
+            print(f"✓ {name}: {len(fast_links)} links, outputs match")
+    
+    documents = [html_content for _, html_content in fixtures]
+    total_bytes = sum(len(html_content.encode("utf-8")) for html_content in documents) * args.iterations
+    total_docs = len(documents) * args.iterations
+    
+    results = {}
+    for label, extractor in (("beautifulsoup", extract_links_bs4), ("fast", extract_links_fast)):
+        # Warm up before timing
+        time_extractor(extractor, documents, 1)
+        results[label] = time_extractor(extractor, documents, args.iterations)
+    
+    print(f"\n{'=' * 60}")
+    print(f"{len(fixtures)} fixtures x {args.iterations} iterations = {total_docs} documents")
+    for label, seconds in results.items():
+        print(
+            f"  {label:<14} {seconds:8.3f}s  {total_docs / seconds:10.0f} docs/s  "
+            f"{total_bytes / seconds / 1e6:7.2f} MB/s"
+        )
+    print(f"  speedup        {results['beautifulsoup'] / results['fast']:.1f}x")
+    
+    return 1 if mismatches else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,328 @@
+#!/usr/bin/env python3
+"""
+Benchmark: the scrape_feed pipeline end to end, fully offline.
+Serves recorded RSS/Atom fixtures plus a generated 10k-episode feed from a local HTTP server,
+runs scrape_feed against an in-memory Supabase stand-in, and reports episodes/sec, links/sec,
+peak RSS and the time split across fetch, parse, extract, filter and save.
+Results are written as JSON; pass --compare with an earlier file to see regressions.
+
+Usage: python benchmarks/bench_scraper.py [--repeat 3] [--synthetic-episodes 10000]
+                                          [--output results.json] [--compare baseline.json]
+"""
+
+import io
+import sys
+import json
+import time
+import random
+import argparse
+import platform
+import resource
+import tempfile
+import threading
+import subprocess
+import contextlib
+import email.utils
+from collections import Counter
+from datetime import datetime, timedelta, timezone
+from functools import partial
+from http.server import SimpleHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+sys.path.insert(0, str(Path(__file__).resolve().parent))
+
+with contextlib.redirect_stdout(io.StringIO()):
+    import scraper
+from memory_supabase import MemorySupabase
+from storage import SQLiteStore, SupabaseStore
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "feeds"
+RESULTS_DIR = Path(__file__).parent / "results"
+STAGES = ["fetch", "parse", "extract", "filter", "save"]
+
+HOT_SPONSORS = [f"{a}{b}.com" for a in ("drink", "try", "get", "use", "join", "shop") for b in (
+    "greens", "sleep", "lmnt", "vpn", "shave", "meals", "cards", "money", "wallet", "learn")]
+TRASH_LINKS = [
+    "https://twitter.com/show", "https://www.instagram.com/show/", "https://open.spotify.com/show/abc",
+    "https://podcasts.apple.com/us/podcast/id123", "https://www.youtube.com/@show", "https://www.patreon.com/show",
+]
+FILLER = ("We talk about training blocks, sleep, focus, money habits, and the tools we use every day. "
+          "Timestamps, guest links and the full transcript are on the website. ")
+
+
+def generate_synthetic_feed(path: Path, episodes: int, seed: int = 42):
+    """
+    Write a large RSS feed shaped like a long-running daily show: newest first,
+    2-3 recurring sponsors, a one-off sponsor, social links and a few paragraphs per episode.
+    """
+    rng = random.Random(seed)
+    newest = datetime(2026, 10, 1, 6, 0, tzinfo=timezone.utc)
+    
+    with open(path, "w", encoding="utf-8") as f:
+        f.write('<?xml version="1.0" encoding="UTF-8"?>\n'
+                '<rss version="2.0" xmlns:content="http://purl.org/rss/1.0/modules/content/">\n'
+                '<channel>\n<title>Synthetic Daily</title>\n<link>https://synthetic-daily.fm</link>\n')
+        for n in range(episodes, 0, -1):
+            sponsors = rng.sample(HOT_SPONSORS, rng.randint(2, 3))
+            sponsors.append(f"oneoff{rng.randint(0, episodes * 10)}.co.uk")
+            links = [f'<p>{domain.split(".")[0]}: <a href="https://www.{domain}/daily?code=SD{n}">{domain}</a></p>'
+                     for domain in sponsors]
+            links += [f'<a href="{url}">{url}</a><br>' for url in rng.sample(TRASH_LINKS, 3)]
+            notes = f"<p>{FILLER * rng.randint(2, 6)}</p>" + "".join(links)
+            published = email.utils.format_datetime(newest - timedelta(days=episodes - n))
+            f.write(f"<item>\n<title>Episode {n}</title>\n<guid>synthetic-{n}</guid>\n"
+                    f"<pubDate>{published}</pubDate>\n<description><![CDATA[{notes}]]></description>\n</item>\n")
+        f.write("</channel>\n</rss>\n")
+
+
+class QuietHandler(SimpleHTTPRequestHandler):
+    def log_message(self, *args):
+        pass
+
+
+class StageTimer:
+    """
+    Times pipeline stages by wrapping the functions scraper.py calls through its module globals.
+    Adds a few hundred nanoseconds per wrapped call, small next to the work being timed.
+    """
+
+    def __init__(self):
+        self.seconds = Counter()
+        self.counts = Counter()
+        self._originals = []
+
+    def wrap(self, name: str, stage: str, count=None):
+        original = getattr(scraper, name)
+
+        def timed(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                result = original(*args, **kwargs)
+            finally:
+                self.seconds[stage] += time.perf_counter() - start
+            if count:
+                self.counts[stage] += count(result)
+            return result
+        
+        self._originals.append((name, original))
+        setattr(scraper, name, timed)
+
+    def wrap_parser(self):
+        """
+        Time read_feed_entries as parsing, minus the time spent waiting for network chunks,
+        which is counted as fetching.
+        """
+        original = scraper.read_feed_entries
+
+        def timed_chunks(chunks):
+            iterator = iter(chunks)
+            while True:
+                start = time.perf_counter()
+                try:
+                    chunk = next(iterator)
+                except StopIteration:
+                    return
+                finally:
+                    self.seconds["network"] += time.perf_counter() - start
+                yield chunk
+
+        def timed(chunks, *args, **kwargs):
+            start = time.perf_counter()
+            result = original(timed_chunks(chunks), *args, **kwargs)
+            self.seconds["read_feed_entries"] += time.perf_counter() - start
+            self.counts["episodes"] += len(result["entries"])
+            self.counts["bytes"] += result["bytes_read"]
+            return result
+        
+        self._originals.append(("read_feed_entries", original))
+        scraper.read_feed_entries = timed
+
+    def restore(self):
+        for name, original in reversed(self._originals):
+            setattr(scraper, name, original)
+        self._originals = []
+
+    def stage_seconds(self) -> dict:
+        """Fold the raw timings into the reported stages."""
+        parse = self.seconds["read_feed_entries"] - self.seconds["network"]
+        return {
+            "fetch": self.seconds["fetch_total"] - parse,
+            "parse": parse,
+            "extract": self.seconds["extract"],
+            "filter": self.seconds["filter"],
+            "save": self.seconds["save"],
+        }
+
+
+def peak_rss_mb() -> float:
+    """Peak resident set size of this process so far."""
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kilobytes, macOS bytes
+    return peak / (1024 * 1024) if sys.platform == "darwin" else peak / 1024
+
+
+def run_fixture(url: str, max_episodes: int, latency: float, storage: str, verbose: bool) -> dict:
+    """Scrape one feed into a fresh database and return its measurements."""
+    with tempfile.TemporaryDirectory() as db_dir:
+        if storage == "sqlite":
+            store = SQLiteStore(Path(db_dir) / "bench.db")
+        else:
+            store = SupabaseStore(MemorySupabase(latency=latency))
+        try:
+            return measure_fixture(url, max_episodes, store, verbose)
+        finally:
+            store.close()
+
+
+def measure_fixture(url: str, max_episodes: int, store, verbose: bool) -> dict:
+    registry = scraper.BrandRegistry(store)
+    registry.load()
+    writer = scraper.SponsorWriter(store, registry)
+    
+    timer = StageTimer()
+    timer.wrap("fetch_feed", "fetch_total")
+    timer.wrap_parser()
+    timer.wrap("extract_all_links", "extract", count=len)
+    for name in ("extract_host", "is_trash_domain", "extract_root_domain"):
+        timer.wrap(name, "filter")
+    timer.wrap("save_sponsor", "save")
+    
+    output = contextlib.nullcontext() if verbose else contextlib.redirect_stdout(io.StringIO())
+    try:
+        with output:
+            start = time.perf_counter()
+            sponsors = scraper.scrape_feed(url, max_episodes=max_episodes, writer=writer)
+            flush_start = time.perf_counter()
+            writer.flush()
+            timer.seconds["save"] += time.perf_counter() - flush_start
+            total = time.perf_counter() - start
+    finally:
+        timer.restore()
+    
+    stages = timer.stage_seconds()
+    episodes = timer.counts["episodes"]
+    links = timer.counts["extract"]
+    return {
+        "bytes": timer.counts["bytes"],
+        "episodes": episodes,
+        "links": links,
+        "sponsors": sponsors,
+        "db_requests": getattr(getattr(store, "supabase", None), "requests", None),
+        "seconds": total,
+        "episodes_per_sec": episodes / total if total else 0.0,
+        "links_per_sec": links / total if total else 0.0,
+        "stages": stages,
+        "other_seconds": max(0.0, total - sum(stages.values())),
+        "peak_rss_mb": peak_rss_mb(),
+    }
+
+
+def git_revision() -> str:
+    try:
+        return subprocess.run(
+            ["git", "rev-parse", "--short", "HEAD"], cwd=Path(__file__).parent,
+            capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return "unknown"
+
+
+def print_results(results: dict):
+    print(f"\n{'=' * 100}")
+    print(f"  {'fixture':<24} {'episodes':>8} {'links':>7} {'seconds':>8} {'eps/s':>9} {'links/s':>9} "
+          + " ".join(f"{stage:>7}" for stage in STAGES) + f" {'rss MB':>7}")
+    for name, result in results["fixtures"].items():
+        shares = " ".join(f"{result['stages'][stage] / result['seconds']:7.0%}" for stage in STAGES)
+        print(f"  {name:<24} {result['episodes']:8,} {result['links']:7,} {result['seconds']:8.3f} "
+              f"{result['episodes_per_sec']:9,.0f} {result['links_per_sec']:9,.0f} {shares} {result['peak_rss_mb']:7.1f}")
+
+
+def print_comparison(results: dict, baseline_path: Path):
+    """Print throughput changes against an earlier results file."""
+    baseline = json.loads(baseline_path.read_text(encoding="utf-8"))
+    print(f"\nCompared with {baseline_path.name} ({baseline.get('git_revision', '?')}):")
+    for name, result in results["fixtures"].items():
+        before = baseline.get("fixtures", {}).get(name)
+        if not before or not before.get("episodes_per_sec"):
+            print(f"  {name:<24} (not in baseline)")
+            continue
+        change = result["episodes_per_sec"] / before["episodes_per_sec"] - 1
+        marker = "⚠" if change < -0.1 else "✓"
+        print(f"  {marker} {name:<22} {before['episodes_per_sec']:9,.0f} -> {result['episodes_per_sec']:9,.0f} eps/s ({change:+.1%})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--repeat", type=int, default=3, help="runs per fixture, best is reported (default: 3)")
+    parser.add_argument("--synthetic-episodes", type=int, default=10_000,
+                        help="episodes in the generated feed, 0 to skip it (default: 10,000)")
+    parser.add_argument("--max-episodes", type=int, default=1_000_000,
+                        help="episode limit passed to scrape_feed (default: effectively unlimited)")
+    parser.add_argument("--storage", choices=("memory", "sqlite"), default="memory",
+                        help="in-memory Supabase stand-in or a temporary SQLite store (default: memory)")
+    parser.add_argument("--latency-ms", type=float, default=0.0,
+                        help="simulated round trip of the in-memory Supabase (default: 0)")
+    parser.add_argument("--output", type=Path, help="results file (default: benchmarks/results/scraper-<rev>-<time>.json)")
+    parser.add_argument("--compare", type=Path, metavar="BASELINE", help="earlier results file to compare against")
+    parser.add_argument("--verbose", action="store_true", help="show the scraper's own output")
+    args = parser.parse_args()
+    
+    # Offline: link resolution would reach out to real redirectors
+    scraper.RESOLVE_LINKS = False
+    # One-time setup (rule compilation) shouldn't be charged to the first fixture
+    scraper.get_trash_rules()
+    scraper.extract_domain_name("warmup.co.uk")
+    
+    with tempfile.TemporaryDirectory() as serve_dir:
+        serve_path = Path(serve_dir)
+        for fixture in sorted(FIXTURES_DIR.iterdir()):
+            (serve_path / fixture.name).write_bytes(fixture.read_bytes())
+        if args.synthetic_episodes:
+            name = f"synthetic_{args.synthetic_episodes}.xml"
+            print(f"Generating {name}...")
+            generate_synthetic_feed(serve_path / name, args.synthetic_episodes)
+        
+        server = ThreadingHTTPServer(("127.0.0.1", 0), partial(QuietHandler, directory=serve_dir))
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_address[1]}"
+        
+        results = {
+            "benchmark": "scraper",
+            "git_revision": git_revision(),
+            "timestamp": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+            "storage": args.storage,
+            "latency_ms": args.latency_ms,
+            "fixtures": {},
+        }
+        
+        # Smallest first, so the peak RSS column shows what each size adds
+        for fixture in sorted(serve_path.iterdir(), key=lambda path: path.stat().st_size):
+            runs = []
+            for _ in range(max(1, args.repeat)):
+                run = run_fixture(f"{base_url}/{fixture.name}", args.max_episodes, args.latency_ms / 1000,
+                                  args.storage, args.verbose)
+                runs.append(run)
+            best = min(runs, key=lambda run: run["seconds"])
+            results["fixtures"][fixture.name] = best
+            print(f"✓ {fixture.name}: {best['episodes']:,} episodes in {best['seconds']:.3f}s (best of {len(runs)})")
+        
+        server.shutdown()
+    
+    print_results(results)
+    
+    output = args.output or RESULTS_DIR / f"scraper-{results['git_revision']}-{datetime.now():%Y%m%d-%H%M%S}.json"
+    output.parent.mkdir(parents=True, exist_ok=True)
+    output.write_text(json.dumps(results, indent=2), encoding="utf-8")
+    print(f"\n💾 Results written to {output}")
+    
+    if args.compare:
+        print_comparison(results, args.compare)
+
+
+if __name__ == "__main__":
+    main()
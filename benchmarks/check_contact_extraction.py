@@ -0,0 +1,51 @@
+#!/usr/bin/env python3
+"""
+Check: contact extraction against the team-page fixtures and their expected contacts.
+Covers mailto links (%-encoded and with several addresses), addresses in the text,
+"[at]/(at)/at ... dot" obfuscations, Cloudflare-protected addresses, name and role
+inference from the surrounding text, and pages whose scripts, comments and image
+names only look like they hold addresses.
+
+Usage: python benchmarks/check_contact_extraction.py
+"""
+
+import sys
+import json
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from contact_extractor import extract_contacts_fast
+
+
+FIXTURES_DIR = Path(__file__).parent / "fixtures" / "team_pages"
+
+
+def main():
+    expected = json.loads((FIXTURES_DIR / "expected.json").read_text(encoding="utf-8"))
+    
+    failures = 0
+    for name, expected_contacts in expected.items():
+        contacts = extract_contacts_fast((FIXTURES_DIR / name).read_text(encoding="utf-8"))
+        if contacts == expected_contacts:
+            print(f"  ✓ {name}: {len(contacts)} contact(s)")
+            continue
+        
+        failures += 1
+        print(f"  ❌ {name}")
+        for contact in expected_contacts:
+            if contact not in contacts:
+                print(f"    - missing: {contact}")
+        for contact in contacts:
+            if contact not in expected_contacts:
+                print(f"    + extra:   {contact}")
+    
+    if failures:
+        print(f"❌ {failures} fixture(s) differ from expected.json")
+        return 1
+    print("✓ All contact extraction checks passed")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,132 @@
+#!/usr/bin/env python3
+"""
+Check: Hunter.io domain-search caching against a local stub API (no internet or credits needed).
+Covers reuse of cached responses, re-filtering by TARGET_ROLES without a request,
+negative caching of domains without emails, TTL expiry, and that API errors are not cached.
+
+Usage: python benchmarks/check_hunter_cache.py
+"""
+
+import io
+import sys
+import json
+import tempfile
+import threading
+from collections import Counter
+from contextlib import redirect_stdout
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+from urllib.parse import parse_qs, urlparse
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+with redirect_stdout(io.StringIO()):
+    import enricher
+from hunter import HunterCache
+
+
+class HunterStub(BaseHTTPRequestHandler):
+    """
+    Answers /v2/domain-search like Hunter.io.
+        acme.com      three people: marketing, engineering, partnerships
+        empty.com     no emails
+        broken.com    an API error
+    """
+    
+    requests_seen: Counter = Counter()
+
+    def do_GET(self):
+        domain = parse_qs(urlparse(self.path).query).get("domain", [""])[0]
+        HunterStub.requests_seen[domain] += 1
+        
+        if domain == "broken.com":
+            body = {"errors": [{"id": "wrong_params", "details": "stub error"}]}
+        else:
+            emails = []
+            if domain == "acme.com":
+                emails = [
+                    {"value": "ann@acme.com", "first_name": "Ann", "last_name": "Lee", "position": "Marketing Director"},
+                    {"value": "bob@acme.com", "first_name": "Bob", "last_name": "", "position": "Software Engineer"},
+                    {"value": "cy@acme.com", "first_name": None, "last_name": None, "position": "Head of Partnerships"},
+                ]
+            body = {"data": {"domain": domain, "emails": emails}, "meta": {"results": len(emails)}}
+        
+        payload = json.dumps(body).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def log_message(self, *args):
+        pass
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✓' if condition else '❌'} {label}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def search(domain: str) -> list:
+    with redirect_stdout(io.StringIO()):
+        return enricher.hunter_api_search(domain)
+
+
+def use_cache(cache: HunterCache):
+    enricher.close_hunter_cache()
+    enricher._hunter_cache = cache
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), HunterStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    enricher.HUNTER_API_URL = f"http://127.0.0.1:{server.server_address[1]}/v2/domain-search"
+    enricher.HUNTER_API_KEY = "stub-key"
+    default_roles = list(enricher.TARGET_ROLES)
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / "hunter.db"
+        
+        print("First run:")
+        use_cache(HunterCache(cache_path))
+        contacts = search("acme.com")
+        check("only target roles are returned", sorted(c["email"] for c in contacts) == ["ann@acme.com", "cy@acme.com"])
+        check("missing names become None", any(c["name"] is None for c in contacts))
+        check("empty domain returns nothing", search("empty.com") == [])
+        check("API error returns nothing", search("broken.com") == [])
+        check("one request per domain", all(HunterStub.requests_seen[d] == 1 for d in ("acme.com", "empty.com", "broken.com")))
+        
+        print("Second run (same cache file):")
+        use_cache(HunterCache(cache_path))
+        again = search("acme.com")
+        check("results match the first run", again == contacts)
+        search("EMPTY.com")
+        check("cached domains sent no request", HunterStub.requests_seen["acme.com"] == 1 and HunterStub.requests_seen["empty.com"] == 1)
+        search("broken.com")
+        check("API errors were not cached", HunterStub.requests_seen["broken.com"] == 2)
+        
+        print("Changed TARGET_ROLES:")
+        enricher.TARGET_ROLES = ["engineer"]
+        check("cached response is re-filtered", [c["email"] for c in search("acme.com")] == ["bob@acme.com"])
+        check("no request sent", HunterStub.requests_seen["acme.com"] == 1)
+        enricher.TARGET_ROLES = default_roles
+        
+        print("Expired entries:")
+        use_cache(HunterCache(cache_path, negative_ttl=0))
+        search("acme.com")
+        search("empty.com")
+        check("empty results are asked again, others stay cached",
+              HunterStub.requests_seen["empty.com"] == 2 and HunterStub.requests_seen["acme.com"] == 1)
+        use_cache(HunterCache(cache_path, ttl=0))
+        search("acme.com")
+        check("responses past the TTL are fetched again", HunterStub.requests_seen["acme.com"] == 2)
+        enricher.close_hunter_cache()
+    
+    enricher.http.close()
+    server.shutdown()
+    print("✓ All Hunter.io cache checks passed")
+
+
+if __name__ == "__main__":
+    main()
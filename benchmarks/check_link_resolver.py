@@ -0,0 +1,120 @@
+#!/usr/bin/env python3
+"""
+Check: link resolution against a local redirect stub server (no internet needed).
+Covers redirect chains, the hop limit, HEAD-rejecting redirectors, negative caching,
+and that a link resolved once is served from the cache by a later run.
+
+Usage: python benchmarks/check_link_resolver.py
+"""
+
+import sys
+import tempfile
+import threading
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from pathlib import Path
+
+sys.path.insert(0, str(Path(__file__).resolve().parent.parent))
+
+from domain_rules import DomainRuleSet
+from link_resolver import LinkResolver, ResolvedLinkCache
+
+
+class RedirectStub(BaseHTTPRequestHandler):
+    """
+    127.0.0.1 plays the redirector, localhost the sponsor site.
+        /chain/N   redirects N more times, then to the sponsor
+        /loop      redirects to itself forever
+        /no-head   405 for HEAD, redirect for GET
+        /dead      404
+    """
+    
+    requests_seen: Counter = Counter()
+
+    def _respond(self):
+        RedirectStub.requests_seen[self.path] += 1
+        port = self.server.server_address[1]
+        
+        if self.path.startswith("/chain/"):
+            remaining = int(self.path.rsplit("/", 1)[1])
+            target = f"/chain/{remaining - 1}" if remaining > 0 else f"http://localhost:{port}/sponsor?ref=pod"
+            self._redirect(target)
+        elif self.path == "/loop":
+            self._redirect("/loop")
+        elif self.path == "/no-head":
+            if self.command == "HEAD":
+                self._status(405)
+            else:
+                self._redirect(f"http://localhost:{port}/sponsor")
+        elif self.path.startswith("/sponsor"):
+            self._status(200)
+        else:
+            self._status(404)
+
+    def _redirect(self, location: str):
+        self.send_response(302)
+        self.send_header("Location", location)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+
+    def _status(self, code: int):
+        self.send_response(code)
+        self.send_header("Content-Length", "0")
+        self.end_headers()
+    
+    do_HEAD = _respond
+    do_GET = _respond
+
+    def log_message(self, *args):
+        pass
+
+
+def check(label: str, condition: bool):
+    print(f"  {'✓' if condition else '❌'} {label}")
+    if not condition:
+        raise SystemExit(1)
+
+
+def main():
+    server = ThreadingHTTPServer(("127.0.0.1", 0), RedirectStub)
+    threading.Thread(target=server.serve_forever, daemon=True).start()
+    base = f"http://127.0.0.1:{server.server_address[1]}"
+    sponsor = f"http://localhost:{server.server_address[1]}/sponsor"
+    rules = DomainRuleSet(["=127.0.0.1"], name="Redirectors")
+    
+    with tempfile.TemporaryDirectory() as tmp:
+        cache_path = Path(tmp) / "links.db"
+        links = [f"{base}/chain/3", f"{base}/loop", f"{base}/no-head", f"{base}/dead", "https://example.com/x"]
+        
+        print("First run:")
+        resolver = LinkResolver(rules, ResolvedLinkCache(cache_path), max_hops=5)
+        results = resolver.resolve_many(links + [f"{base}/chain/3#again"])
+        check("redirect chain reaches the sponsor", results[links[0]] == sponsor + "?ref=pod")
+        check("hop limit stops a redirect loop", results[links[1]] is None)
+        check("HEAD-rejecting redirector falls back to GET", results[links[2]] == sponsor)
+        check("dead link resolves to None", results[links[3]] is None)
+        check("non-redirector link is left alone", results[links[4]] == links[4])
+        check("fragment variants share one resolution", RedirectStub.requests_seen["/chain/3"] == 1)
+        resolver.close()
+        
+        print("Second run (same cache file):")
+        seen_before = sum(RedirectStub.requests_seen.values())
+        resolver = LinkResolver(rules, ResolvedLinkCache(cache_path))
+        again = resolver.resolve_many(links)
+        check("results match the first run", all(again[url] == results[url] for url in links))
+        check("no requests sent", sum(RedirectStub.requests_seen.values()) == seen_before)
+        check("all redirector links served from cache", resolver.cache_hits == 4)
+        resolver.close()
+        
+        print("Expired negative entries:")
+        resolver = LinkResolver(rules, ResolvedLinkCache(cache_path, negative_ttl=0))
+        resolver.resolve_many(links)
+        check("failures are retried, successes stay cached", resolver.cache_hits == 2 and resolver.failed == 2)
+        resolver.close()
+    
+    server.shutdown()
+    print("✓ All link resolver checks passed")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,155 @@
+"""
+In-memory stand-in for the Supabase client, for offline benchmarks.
+Implements the small part of the PostgREST query builder the scripts use
+(select/eq/in_/gte/order/range/insert/update/execute) and the RPC functions from
+supabase/migrations, with an optional simulated round-trip latency per call.
+"""
+
+import time
+import uuid
+from datetime import datetime, timezone
+from typing import Callable, Dict, List, Optional
+
+
+class MemoryResponse:
+    def __init__(self, data):
+        self.data = data
+
+
+class MemoryQuery:
+    """One PostgREST-style query against an in-memory table."""
+
+    def __init__(self, client: "MemorySupabase", table: str):
+        self.client = client
+        self.table_name = table
+        self.filters: List[Callable[[dict], bool]] = []
+        self.orders: List[str] = []
+        self.bounds: Optional[tuple] = None
+        self.operation = "select"
+        self.payload = None
+
+    def select(self, *columns, **kwargs):
+        return self
+
+    def eq(self, column: str, value):
+        self.filters.append(lambda row: row.get(column) == value)
+        return self
+
+    def in_(self, column: str, values):
+        values = set(values)
+        self.filters.append(lambda row: row.get(column) in values)
+        return self
+
+    def gte(self, column: str, value):
+        self.filters.append(lambda row: row.get(column) is not None and row[column] >= value)
+        return self
+
+    def order(self, column: str, **kwargs):
+        self.orders.append(column)
+        return self
+
+    def limit(self, count: int):
+        self.bounds = (0, count - 1)
+        return self
+
+    def range(self, start: int, end: int):
+        self.bounds = (start, end)
+        return self
+
+    def insert(self, payload):
+        self.operation = "insert"
+        self.payload = payload
+        return self
+
+    def update(self, payload):
+        self.operation = "update"
+        self.payload = payload
+        return self
+
+    def execute(self) -> MemoryResponse:
+        self.client.round_trip()
+        rows = self.client.tables.setdefault(self.table_name, [])
+        
+        if self.operation == "insert":
+            payload = self.payload if isinstance(self.payload, list) else [self.payload]
+            return MemoryResponse([self.client.insert_row(self.table_name, dict(row)) for row in payload])
+        
+        matched = [row for row in rows if all(check(row) for check in self.filters)]
+        if self.operation == "update":
+            for row in matched:
+                row.update(self.payload)
+            return MemoryResponse(matched)
+        
+        for column in reversed(self.orders):
+            matched.sort(key=lambda row: str(row.get(column)))
+        if self.bounds:
+            matched = matched[self.bounds[0]:self.bounds[1] + 1]
+        return MemoryResponse([dict(row) for row in matched])
+
+
+class MemoryRpc:
+    def __init__(self, client: "MemorySupabase", function: Callable, params: dict):
+        self.client = client
+        self.function = function
+        self.params = params
+
+    def execute(self) -> MemoryResponse:
+        self.client.round_trip()
+        return MemoryResponse(self.function(self.params))
+
+
+class MemorySupabase:
+    """
+    Drop-in replacement for supabase.Client backed by Python lists.
+    latency adds a fixed sleep per request to approximate network round trips.
+    """
+
+    def __init__(self, latency: float = 0.0):
+        self.latency = latency
+        self.tables: Dict[str, List[dict]] = {}
+        self.requests = 0
+        self.functions: Dict[str, Callable[[dict], list]] = {
+            "insert_brands_ignore_duplicates": self._insert_brands_ignore_duplicates,
+            "insert_contacts_ignore_duplicates": self._insert_contacts_ignore_duplicates,
+        }
+
+    def table(self, name: str) -> MemoryQuery:
+        return MemoryQuery(self, name)
+
+    def rpc(self, name: str, params: dict) -> MemoryRpc:
+        return MemoryRpc(self, self.functions[name], params)
+
+    def round_trip(self):
+        self.requests += 1
+        if self.latency:
+            time.sleep(self.latency)
+
+    def insert_row(self, table: str, row: dict) -> dict:
+        row.setdefault("id", str(uuid.uuid4()))
+        row.setdefault("created_at", datetime.now(timezone.utc).isoformat())
+        self.tables.setdefault(table, []).append(row)
+        return dict(row)
+
+    def _insert_brands_ignore_duplicates(self, params: dict) -> list:
+        """Mirror of the SQL function: insert brands, skipping case-insensitive duplicates."""
+        existing = {row["name"].lower() for row in self.tables.get("brands", [])}
+        inserted = []
+        for brand in params["new_brands"]:
+            name = brand["name"].lower()
+            if name in existing:
+                continue
+            existing.add(name)
+            inserted.append(self.insert_row("brands", dict(brand)))
+        return inserted
+
+    def _insert_contacts_ignore_duplicates(self, params: dict) -> list:
+        """Mirror of the SQL function: insert contacts, skipping (brand_id, email) pairs that exist."""
+        existing = {(row["brand_id"], row["email"].lower()) for row in self.tables.get("contacts", [])}
+        inserted = []
+        for contact in params["new_contacts"]:
+            key = (contact["brand_id"], contact["email"].lower())
+            if key in existing:
+                continue
+            existing.add(key)
+            inserted.append(self.insert_row("contacts", dict(contact)))
+        return inserted
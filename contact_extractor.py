@@ -0,0 +1,514 @@
+"""
+SponsorFinder contact extraction - finds email contacts on team/about/contact pages.
+Reads a page in one pass with a regex tokenizer (no DOM, and unlike HTMLParser only the
+attributes of links are parsed) and picks up mailto links, addresses written out in the text, and the usual obfuscations
+("jane [at] acme [dot] com", Cloudflare-protected addresses). Only a bounded window of
+text around each address is kept, within its enclosing element, to infer a name and role.
+
+The BeautifulSoup implementation the enricher used before is kept as a fallback and as
+the baseline for benchmarks/bench_contact_extraction.py.
+"""
+
+import os
+import re
+from html import unescape
+from typing import Dict, List, Optional, Tuple
+from urllib.parse import unquote
+
+try:
+    from bs4 import BeautifulSoup
+    BEAUTIFULSOUP_AVAILABLE = True
+except ImportError:
+    BEAUTIFULSOUP_AVAILABLE = False
+
+
+CONTACT_CONTEXT_CHARS = int(os.getenv("CONTACT_CONTEXT_CHARS", "200"))  # text kept on each side of an address
+
+DEFAULT_ROLE = "Contact"
+
+# Checked in this order; the old "contact"/"general"/"info" group only ever produced DEFAULT_ROLE
+ROLE_KEYWORDS = {
+    "press": ["press", "media", "pr", "public relations"],
+    "marketing": ["marketing", "growth", "acquisition"],
+    "partnership": ["partnership", "partner", "sponsor", "sponsorship"],
+}
+ROLE_PATTERNS = [
+    (role.title(), re.compile(r'\b(?:' + '|'.join(map(re.escape, keywords)) + r')s?\b', re.IGNORECASE))
+    for role, keywords in ROLE_KEYWORDS.items()
+]
+
+EMAIL_PATTERN = re.compile(r'[A-Za-z0-9._%+-]+@(?:[A-Za-z0-9-]+\.)+[A-Za-z]{2,24}')
+
+# A written-out address: plain "@" and ".", or "at"/"dot" in brackets or as separate words
+EMAIL_TEXT_PATTERN = re.compile(r"""
+    (?<![\w.%+-])
+    (?P<local>[A-Za-z0-9._%+-]+)
+    (?P<at>\s*[\[({<]\s*(?:at|@)\s*[\])}>]\s*|\s+(?:at|@)\s+|@)
+    (?P<domain>[A-Za-z0-9-]+(?:(?:\s*[\[({<]\s*(?:dot|\.)\s*[\])}>]\s*|\s+dot\s+|\.)[A-Za-z0-9-]+)+)
+""", re.IGNORECASE | re.VERBOSE)
+DOT_PATTERN = re.compile(r'\s*[\[({<]\s*(?:dot|\.)\s*[\])}>]\s*|\s+dot\s+', re.IGNORECASE)
+
+# Text is only scanned for addresses if it contains "@" or one of these, and a tag's attributes
+# are only parsed if they contain one of the others (substring tests beat a regex on big pages)
+OBFUSCATION_HINTS = ("dot", "[at", "(at", "{at", "<at", "[ at", "( at", "{ at", "< at")
+ADDRESS_ATTRIBUTE_HINTS = ("mailto:", "cfemail", "email-protection")
+
+# "contact us at acme dot com" is a sentence, not an address
+BARE_AT_STOPWORDS = {"us", "me", "we", "you", "them", "him", "her", "it", "is", "are", "was", "be",
+                     "here", "there", "email", "mail", "contact", "reach", "find", "visit", "look", "online"}
+NOT_EMAIL_SUFFIXES = (".png", ".jpg", ".jpeg", ".gif", ".svg", ".webp", ".css", ".js")
+
+NAME_WORD_PATTERN = re.compile(r"[A-ZÀ-Þ][A-Za-zÀ-ÿ'’-]*[a-zß-ÿ]|[A-Z]\.")
+# Capitalized words that are not part of a person's name
+NOT_NAME_WORDS = {
+    "email", "e-mail", "mail", "contact", "contacts", "us", "our", "the", "get", "in", "touch", "reach", "send",
+    "write", "for", "and", "of", "at", "to", "a", "an", "by", "or", "here", "click", "more", "read", "inquiries",
+    "enquiries", "general", "info", "information", "hello", "team", "about", "press", "media", "public",
+    "relations", "marketing", "growth", "acquisition", "partnership", "partnerships", "partner", "partners",
+    "sponsor", "sponsors", "sponsorship", "sponsorships", "head", "director", "manager", "lead", "senior",
+    "junior", "associate", "vp", "vice", "president", "chief", "officer", "founder", "co-founder", "ceo",
+    "cmo", "coo", "cto", "cfo", "business", "development", "brand", "brands", "communications", "sales",
+    "support", "customer", "success", "careers", "jobs", "investor", "investors", "office", "global",
+}
+
+# Comments, doctypes and tags (group 1: "/" for end tags, 2: name, 3: attributes)
+TAG_PATTERN = re.compile(r"""<(?:!--.*?--\s*>|(/?)([A-Za-z][A-Za-z0-9:-]*)((?:[^>"']|"[^"]*"|'[^']*')*)>|[!?][^>]*>)""", re.DOTALL)
+ATTRIBUTE_PATTERN = re.compile(r"""([^\s"'=<>/]+)(?:\s*=\s*(?:"([^"]*)"|'([^']*)'|([^\s>]+)))?""")
+
+# Elements whose text isn't shown, and elements without an end tag
+SKIP_TAGS = {"script", "style", "template", "noscript"}
+VOID_TAGS = {"area", "base", "br", "col", "embed", "hr", "img", "input", "link", "meta", "source", "track", "wbr"}
+# Elements that start a new line of text, so words on either side don't run together
+BLOCK_TAGS = {
+    "address", "article", "aside", "blockquote", "br", "dd", "div", "dl", "dt", "figcaption", "footer", "form",
+    "h1", "h2", "h3", "h4", "h5", "h6", "header", "hr", "li", "main", "nav", "ol", "p", "section", "table",
+    "td", "th", "tr", "ul",
+}
+# Start tags that end an open element of these kinds ("<li>a<li>b" is two items)
+IMPLIED_END_TAGS = {
+    "li": {"li"}, "p": {"p"}, "dt": {"dt", "dd"}, "dd": {"dt", "dd"},
+    "tr": {"tr", "td", "th"}, "td": {"td", "th"}, "th": {"td", "th"},
+}
+# Paragraphs and inline elements are too small to hold a contact's context ("<p><a>Email</a></p>");
+# it is taken from the nearest element around them instead (the team card, list item, table row...)
+TEXT_TAGS = {
+    "a", "abbr", "b", "bdi", "bdo", "cite", "code", "em", "font", "i", "kbd", "label", "mark", "p", "q",
+    "s", "small", "span", "strong", "sub", "sup", "td", "th", "time", "u",
+}
+
+
+def contains_any(text: str, hints: Tuple[str, ...]) -> bool:
+    lowered = text.lower()
+    return any(hint in lowered for hint in hints)
+
+
+def could_hold_address(text: str) -> bool:
+    """Cheap test for whether EMAIL_TEXT_PATTERN can match anything in text."""
+    return "@" in text or contains_any(text, OBFUSCATION_HINTS)
+
+
+def clean_email(email: str) -> Optional[str]:
+    """Lowercased address, or None if it doesn't look like an email."""
+    email = email.strip().strip(".").lower()
+    if not EMAIL_PATTERN.fullmatch(email) or email.endswith(NOT_EMAIL_SUFFIXES):
+        return None
+    return email
+
+
+def mailto_emails(href: str) -> List[str]:
+    """Addresses of a mailto: href (there can be several, and they may be %-encoded)."""
+    addresses = unquote(href.strip()[len("mailto:"):].split("?")[0])
+    return [email for email in map(clean_email, re.split(r'[,;]', addresses)) if email]
+
+
+def decode_cfemail(encoded: str) -> Optional[str]:
+    """Decode a Cloudflare-protected address (hex; the first byte XORs the rest)."""
+    try:
+        data = bytes.fromhex(encoded.strip())
+    except ValueError:
+        return None
+    if len(data) < 2:
+        return None
+    return clean_email("".join(chr(byte ^ data[0]) for byte in data[1:]))
+
+
+def text_email(match: "re.Match") -> Optional[str]:
+    """The address an EMAIL_TEXT_PATTERN match spells out, or None for false positives."""
+    local, at = match.group("local"), match.group("at").strip().lower()
+    domain = DOT_PATTERN.sub(".", match.group("domain"))
+    if at == "at":
+        # Bare "at" only counts when the domain is spelled out too ("jane at acme dot com")
+        if not DOT_PATTERN.search(match.group("domain")) or local.lower() in BARE_AT_STOPWORDS:
+            return None
+    return clean_email(f"{local}@{domain}")
+
+
+def parse_attributes(text: str) -> List[Tuple[str, str]]:
+    """(name, value) pairs of a tag's attribute text, names lowercased and values unescaped."""
+    attributes = []
+    for match in ATTRIBUTE_PATTERN.finditer(text):
+        value = match.group(2) if match.group(2) is not None else match.group(3) or match.group(4) or ""
+        attributes.append((match.group(1).lower(), unescape(value)))
+    return attributes
+
+
+def infer_role(*texts: str) -> Optional[str]:
+    """The role whose keyword appears in the texts, in ROLE_KEYWORDS order."""
+    for role, pattern in ROLE_PATTERNS:
+        if any(pattern.search(text) for text in texts):
+            return role
+    return None
+
+
+def nearest_role(before: str, after: str) -> Optional[str]:
+    """The role whose keyword is closest to the address (before it, or after it)."""
+    best, best_distance = None, None
+    for role, pattern in ROLE_PATTERNS:
+        for match in pattern.finditer(before):
+            distance = len(before) - match.end()
+            if best_distance is None or distance < best_distance:
+                best, best_distance = role, distance
+        match = pattern.search(after)
+        if match and (best_distance is None or match.start() < best_distance):
+            best, best_distance = role, match.start()
+    return best
+
+
+def name_candidates(text: str, min_words: int = 2) -> List[str]:
+    """Runs of capitalized words in text that could be a person's name, in order."""
+    runs: List[List[str]] = [[]]
+    last_end = None
+    for match in NAME_WORD_PATTERN.finditer(text):
+        word = match.group()
+        # Words only belong to the same name if spaces on one line are all that separate them
+        gap = text[last_end:match.start()] if last_end is not None else "\n"
+        if gap.strip() or "\n" in gap or word.lower() in NOT_NAME_WORDS:
+            runs.append([])
+        if word.lower() not in NOT_NAME_WORDS:
+            runs[-1].append(word)
+        last_end = match.end()
+    return [" ".join(run) for run in runs if len(run) >= min_words]
+
+
+def infer_name(email: str, link_text: str, before: str, after: str) -> Optional[str]:
+    """
+    A person's name for an address: the link text if it is one, else the nearest
+    name before the address, else the first one after it. The company's own name
+    ("Harbor Roasters" or "Harbor Roasters Co" for harborroasters.com) doesn't count.
+    """
+    company = email.split("@")[1].split(".")[0].replace("-", "")
+
+    def is_person(name: str) -> bool:
+        return not re.sub(r'[\W_]', '', name).lower().startswith(company)
+    
+    link_text = " ".join(link_text.split())
+    if link_text and "@" not in link_text:
+        names = name_candidates(link_text, min_words=1)
+        if len(names) == 1 and names[0] == link_text and is_person(link_text):
+            return link_text
+    
+    names = [name for name in name_candidates(before) if is_person(name)]
+    if names:
+        return names[-1]
+    names = [name for name in name_candidates(after) if is_person(name)]
+    return names[0] if names else None
+
+
+class Occurrence:
+    """One address found on the page, with the text around it."""
+
+    def __init__(self, email: str, depth: int, before: str, link_start: Optional[int] = None,
+                 after_start: Optional[int] = None):
+        self.email = email
+        self.depth = depth  # open elements when it was found; the last one encloses it
+        self.before = before
+        self.link_start = link_start  # where the text of its <a> starts (None outside links)
+        self.link_text = ""
+        self.after_start = after_start  # None until the link's text has ended
+        self.after = ""
+
+    def to_contact(self) -> Dict[str, Optional[str]]:
+        role = infer_role(self.email.split("@")[0], self.link_text) or nearest_role(self.before, self.after)
+        return {
+            "name": infer_name(self.email, self.link_text, self.before, self.after),
+            "role": role or DEFAULT_ROLE,
+            "email": self.email,
+        }
+
+
+class ContactParser:
+    """
+    Collects email addresses and their surrounding text in one pass over the markup.
+    Only the last CONTACT_CONTEXT_CHARS (and then some) of the page's text are kept. An
+    address's context is at most context_chars on each side, within its enclosing element
+    (see TEXT_TAGS), and doesn't reach past the addresses next to it.
+    """
+
+    def __init__(self, context_chars: int = CONTACT_CONTEXT_CHARS):
+        self.context_chars = max(1, context_chars)
+        self.occurrences: List[Occurrence] = []
+        self._open: List[Occurrence] = []  # still collecting context
+        self._stack: List[Tuple[str, int]] = []  # open elements and where their text starts
+        self._links: List[Tuple[int, List[Occurrence]]] = []  # open <a> elements and their addresses
+        self._tail = ""  # end of the page text so far
+        self._length = 0  # characters of page text so far
+        self._last_address_end = 0
+
+    def feed(self, html_content: str):
+        position = 0
+        lowered = None
+        while position < len(html_content):
+            match = TAG_PATTERN.search(html_content, position)
+            end = match.start() if match else len(html_content)
+            if end > position:
+                text = html_content[position:end]
+                self.handle_data(unescape(text) if "&" in text else text)
+            if match is None:
+                break
+            
+            position = match.end()
+            tag = match.group(2)
+            if tag is None:
+                # Comment, doctype or processing instruction
+                continue
+            tag = tag.lower()
+            attributes = match.group(3)
+            if match.group(1):
+                self.handle_endtag(tag)
+            elif tag in SKIP_TAGS:
+                # Their contents aren't shown (and a script's aren't markup); jump to the end tag
+                lowered = lowered or html_content.lower()
+                end = lowered.find("</" + tag, position)
+                position = end if end >= 0 else len(html_content)
+            else:
+                self.handle_starttag(tag, attributes)
+                if attributes.endswith("/") and tag not in VOID_TAGS:
+                    self.handle_endtag(tag)
+
+    def handle_starttag(self, tag: str, attributes: str):
+        while self._stack and self._stack[-1][0] in IMPLIED_END_TAGS.get(tag, ()):
+            self.handle_endtag(self._stack[-1][0])
+        if tag in BLOCK_TAGS:
+            self._separate()
+        
+        emails = []
+        # Attributes are only parsed if they can hold an address (mailto links, Cloudflare protection)
+        attrs = parse_attributes(attributes) if contains_any(attributes, ADDRESS_ATTRIBUTE_HINTS) else []
+        for name, value in attrs:
+            if not value:
+                continue
+            if name == "data-cfemail":
+                emails.append(decode_cfemail(value))
+            elif name == "href" and tag == "a":
+                if value.strip().lower().startswith("mailto:"):
+                    emails.extend(mailto_emails(value))
+                elif "/cdn-cgi/l/email-protection#" in value:
+                    emails.append(decode_cfemail(value.split("#", 1)[1]))
+        
+        emails = [email for email in emails if email]
+        occurrences = [self._found(email, self._length, link_start=self._length) for email in emails]
+        if tag == "a":
+            self._links.append((len(self._stack), occurrences))
+        elif occurrences:
+            # A protected address in a <span>: its text is the address itself
+            self._end_link(occurrences)
+        
+        if tag not in VOID_TAGS:
+            self._stack.append((tag, self._length))
+
+    def handle_endtag(self, tag: str):
+        if tag in BLOCK_TAGS:
+            self._separate()
+        
+        # Close the element and anything left open inside it; stray end tags are ignored
+        for index in range(len(self._stack) - 1, -1, -1):
+            if self._stack[index][0] == tag:
+                del self._stack[index:]
+                break
+        else:
+            return
+        
+        while self._links and self._links[-1][0] >= len(self._stack):
+            self._end_link(self._links.pop()[1])
+        if self._open:
+            self._finish(lambda occurrence: occurrence.depth > len(self._stack))
+
+    def handle_data(self, data: str):
+        start = self._length
+        self._append(data)
+        
+        if could_hold_address(data):
+            for match in EMAIL_TEXT_PATTERN.finditer(data):
+                email = text_email(match)
+                if email:
+                    self._found(email, start + match.start(), after_start=start + match.end())
+        
+        if self._open:
+            self._finish(lambda occurrence: occurrence.after_start is not None
+                         and self._length - occurrence.after_start >= self.context_chars)
+        self._trim()
+
+    def close(self):
+        while self._links:
+            self._end_link(self._links.pop()[1])
+        self._finish(lambda occurrence: True)
+
+    def _found(self, email: str, position: int, link_start: Optional[int] = None,
+               after_start: Optional[int] = None) -> Occurrence:
+        # The context of addresses found earlier ends here
+        self._finish(lambda occurrence: occurrence.after_start is not None, end=position)
+        
+        depth = len(self._stack)
+        while depth and self._stack[depth - 1][0] in TEXT_TAGS:
+            depth -= 1
+        container_start = self._stack[depth - 1][1] if depth else 0
+        start = max(container_start, position - self.context_chars, min(self._last_address_end, position))
+        occurrence = Occurrence(email, depth, self._text(start, position), link_start, after_start)
+        self._last_address_end = after_start if after_start is not None else position
+        self.occurrences.append(occurrence)
+        self._open.append(occurrence)
+        return occurrence
+
+    def _end_link(self, occurrences: List[Occurrence]):
+        for occurrence in occurrences:
+            occurrence.link_text = self._text(occurrence.link_start, self._length)
+            occurrence.after_start = self._length
+        if occurrences:
+            self._last_address_end = self._length
+
+    def _finish(self, condition, end: Optional[int] = None):
+        """Stop collecting context for the addresses that meet condition (at offset end)."""
+        end = self._length if end is None else end
+        still_open = []
+        for occurrence in self._open:
+            if condition(occurrence):
+                if occurrence.after_start is None:
+                    occurrence.link_text = self._text(occurrence.link_start, self._length)
+                    occurrence.after_start = self._length
+                stop = max(occurrence.after_start, min(end, occurrence.after_start + self.context_chars))
+                occurrence.after = self._text(occurrence.after_start, stop)
+            else:
+                still_open.append(occurrence)
+        self._open = still_open
+
+    def _append(self, text: str):
+        self._tail += text
+        self._length += len(text)
+
+    def _separate(self):
+        if self._tail and not self._tail[-1].isspace():
+            self._append("\n")
+
+    def _text(self, start: int, end: int) -> str:
+        """Page text between two offsets, as far as it is still kept."""
+        tail_start = self._length - len(self._tail)
+        return self._tail[max(start, tail_start) - tail_start:max(end, tail_start) - tail_start]
+
+    def _trim(self):
+        # Keep enough text for the context of the next address (longer link texts are cut)
+        keep = 2 * self.context_chars
+        if len(self._tail) > 2 * keep:
+            self._tail = self._tail[-keep:]
+
+
+def merge_occurrences(occurrences: List[Occurrence]) -> List[Dict[str, Optional[str]]]:
+    """
+    One contact per address, in order of first appearance. Later mentions fill in
+    a name, or a more specific role than the default, that earlier ones lacked.
+    """
+    contacts: Dict[str, Dict[str, Optional[str]]] = {}
+    for occurrence in occurrences:
+        contact = occurrence.to_contact()
+        known = contacts.get(contact["email"])
+        if known is None:
+            contacts[contact["email"]] = contact
+            continue
+        if not known["name"]:
+            known["name"] = contact["name"]
+        if known["role"] == DEFAULT_ROLE:
+            known["role"] = contact["role"]
+    return list(contacts.values())
+
+
+def extract_contacts_fast(html_content: str, context_chars: int = CONTACT_CONTEXT_CHARS) -> List[Dict[str, Optional[str]]]:
+    """
+    Extract email contacts without building a document tree.
+    Returns a list of dicts with name (None if unknown), role and email, one per address.
+    """
+    if not html_content:
+        return []
+    
+    # Cheap pre-check: pages without any address can be skipped outright
+    if not could_hold_address(html_content) and not contains_any(html_content, ADDRESS_ATTRIBUTE_HINTS):
+        return []
+    
+    parser = ContactParser(context_chars)
+    parser.feed(html_content)
+    parser.close()
+    return merge_occurrences(parser.occurrences)
+
+
+def extract_contacts_bs4(html_content: str) -> List[Dict[str, Optional[str]]]:
+    """
+    Extract mailto contacts using BeautifulSoup, with the parent element's text as context.
+    Reference implementation (what the enricher did before); one entry per mailto link.
+    """
+    if not html_content:
+        return []
+    
+    soup = BeautifulSoup(html_content, 'html.parser')
+    contacts = []
+    
+    for anchor in soup.find_all('a', href=True):
+        href = anchor.get('href', '').strip()
+        if not href.startswith('mailto:'):
+            continue
+        
+        email = href.replace('mailto:', '').split('?')[0].split('&')[0].strip()
+        if not email or '@' not in email:
+            continue
+        
+        # Extract name and role from surrounding context
+        link_text = anchor.get_text().strip()
+        parent_text = anchor.parent.get_text().strip() if anchor.parent else ""
+        combined_text = (link_text + " " + parent_text).lower()
+        
+        role_keywords = {
+            "press": ["press", "media", "pr", "public relations"],
+            "marketing": ["marketing", "growth", "acquisition"],
+            "partnership": ["partnership", "partnerships", "sponsor", "sponsorship"],
+            "contact": ["contact", "general", "info"]
+        }
+        role = DEFAULT_ROLE
+        for role_name, keywords in role_keywords.items():
+            if any(keyword in combined_text for keyword in keywords):
+                role = role_name.title()
+                break
+        
+        name = None
+        if link_text and '@' not in link_text:
+            # If link text doesn't contain email, it might be a name
+            name = link_text
+        elif parent_text:
+            name_match = re.search(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', parent_text)
+            if name_match:
+                name = name_match.group(1)
+        
+        contacts.append({"name": name, "role": role, "email": email.lower()})
+    
+    return contacts
+
+
+def extract_contacts(html_content: str) -> List[Dict[str, Optional[str]]]:
+    """DOM-free extraction, falling back to BeautifulSoup if the parser fails."""
+    try:
+        return extract_contacts_fast(html_content)
+    except Exception as e:
+        if not BEAUTIFULSOUP_AVAILABLE:
+            print(f"      Error parsing HTML: {e}")
+            return []
+        try:
+            return extract_contacts_bs4(html_content)
+        except Exception as e:
+            print(f"      Error parsing HTML: {e}")
+            return []
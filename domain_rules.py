@@ -0,0 +1,117 @@
+"""
+SponsorFinder domain rules - matches hosts against large rule lists (e.g. the trash filter).
+Rules are loaded from text files and compiled into a trie of reversed labels,
+so matching costs O(labels in host) no matter how many rules there are.
+
+Rule syntax (one per line, "#" starts a comment):
+    example.com      suffix rule: example.com and every subdomain
+    =example.com     exact rule: only that host
+    *.example.com    "*" stands for exactly one label (any position)
+"""
+
+from collections import Counter
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+
+# Trie node markers (not valid DNS labels, so they can't collide with real labels)
+_SUFFIX_RULE = "\0suffix"
+_EXACT_RULE = "\0exact"
+
+
+class DomainRuleSet:
+    """
+    Compiled set of exact, suffix and wildcard domain rules.
+    Keeps a hit counter per rule so unused rules can be spotted.
+    """
+
+    def __init__(self, rules: Iterable[str] = (), name: str = "rules"):
+        self.name = name
+        self.root: Dict[str, dict] = {}
+        self.rules: List[str] = []
+        self.hits: Counter = Counter()
+        for rule in rules:
+            self.add_rule(rule)
+
+    @classmethod
+    def from_file(cls, path: Path, name: Optional[str] = None) -> "DomainRuleSet":
+        """Load rules from a text file."""
+        with open(path, encoding="utf-8") as f:
+            return cls(parse_rule_lines(f), name=name or Path(path).stem)
+
+    def __len__(self) -> int:
+        return len(self.rules)
+
+    def add_rule(self, rule: str):
+        """Compile one rule into the trie."""
+        rule = rule.strip().lower()
+        if not rule:
+            return
+        
+        exact = rule.startswith("=")
+        pattern = rule[1:] if exact else rule
+        if pattern.startswith("www."):
+            pattern = pattern[4:]
+        
+        node = self.root
+        for label in reversed(pattern.split(".")):
+            node = node.setdefault(label, {})
+        node[_EXACT_RULE if exact else _SUFFIX_RULE] = rule
+        self.rules.append(rule)
+
+    def find(self, host: str) -> Optional[str]:
+        """
+        Return the most specific rule matching host, without counting a hit.
+        Example: rule "spotify.com" matches "open.spotify.com".
+        """
+        if not host:
+            return None
+        
+        host = host.lower().rstrip(".")
+        if host.startswith("www."):
+            host = host[4:]
+        labels = host.split(".")
+        
+        best: Optional[Tuple[int, str]] = None
+        frontier = [self.root]
+        
+        for depth, label in enumerate(reversed(labels), 1):
+            next_frontier = []
+            for node in frontier:
+                for key in (label, "*"):
+                    child = node.get(key)
+                    if child is None:
+                        continue
+                    rule = child.get(_SUFFIX_RULE)
+                    if rule is None and depth == len(labels):
+                        rule = child.get(_EXACT_RULE)
+                    if rule is not None and (best is None or depth > best[0]):
+                        best = (depth, rule)
+                    next_frontier.append(child)
+            if not next_frontier:
+                break
+            frontier = next_frontier
+        
+        return best[1] if best else None
+
+    def match(self, host: str) -> Optional[str]:
+        """Return the matching rule (or None) and count the hit."""
+        rule = self.find(host)
+        if rule is not None:
+            self.hits[rule] += 1
+        return rule
+
+    def report(self, top: int = 10):
+        """Print the rules that fired most often this run."""
+        total = sum(self.hits.values())
+        print(f"🗑 {self.name}: {total} matches from {len(self.hits)} of {len(self.rules)} rules")
+        for rule, count in self.hits.most_common(top):
+            print(f"   {count:6}  {rule}")
+
+
+def parse_rule_lines(lines: Iterable[str]) -> Iterable[str]:
+    """Yield rules from file lines, skipping comments and blank lines."""
+    for line in lines:
+        line = line.split("#", 1)[0].strip()
+        if line:
+            yield line
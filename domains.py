@@ -0,0 +1,217 @@
+"""
+SponsorFinder domain normalization - shared by the scraper and the enricher.
+Maps URLs and hosts to registrable domains (athleticgreens.com, bbc.co.uk) and brand labels
+using a bundled Public Suffix List snapshot compiled into a label trie. No network access.
+"""
+
+import os
+import threading
+from functools import lru_cache
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+from urllib.parse import urlparse
+
+
+# Public Suffix List snapshot (override with PUBLIC_SUFFIX_LIST_PATH to use a newer copy)
+PUBLIC_SUFFIX_LIST_PATH = Path(
+    os.getenv("PUBLIC_SUFFIX_LIST_PATH") or Path(__file__).parent / "data" / "public_suffix_list.dat"
+)
+
+# Entries kept in each memoization cache (URLs and hosts repeat heavily across episodes)
+DOMAIN_CACHE_SIZE = int(os.getenv("DOMAIN_CACHE_SIZE", "65536"))
+
+# Trie node markers (not valid DNS labels, so they can't collide with real labels)
+_RULE = "\0rule"
+_EXCEPTION = "\0exception"
+
+
+class PublicSuffixTrie:
+    """
+    Public Suffix List rules stored as a trie of reversed labels.
+    Finding a host's public suffix costs O(number of labels).
+    """
+
+    def __init__(self, rules: Iterable[str] = ()):
+        self.root: Dict[str, dict] = {}
+        self.rule_count = 0
+        for rule in rules:
+            self.add_rule(rule)
+
+    @classmethod
+    def from_file(cls, path: Path) -> "PublicSuffixTrie":
+        """Compile a public_suffix_list.dat file."""
+        with open(path, encoding="utf-8") as f:
+            return cls(parse_rules(f))
+
+    def add_rule(self, rule: str):
+        """Add one PSL rule (e.g. "co.uk", "*.ck", "!www.ck")."""
+        is_exception = rule.startswith("!")
+        if is_exception:
+            rule = rule[1:]
+        
+        for variant in rule_variants(rule):
+            node = self.root
+            for label in reversed(variant.split(".")):
+                node = node.setdefault(label, {})
+            node[_EXCEPTION if is_exception else _RULE] = True
+        self.rule_count += 1
+
+    def suffix_length(self, labels: List[str]) -> int:
+        """
+        Number of trailing labels that form the public suffix.
+        Follows the PSL algorithm: exception rules win, then the longest matching rule,
+        and an unlisted TLD counts as a one-label suffix.
+        PSL wildcards only ever appear as the leftmost label, so "*" nodes are leaves.
+        """
+        longest = 1
+        node = self.root
+        depth = 0
+        
+        for label in reversed(labels):
+            depth += 1
+            wildcard = node.get("*")
+            node = node.get(label)
+            
+            if node is not None and _EXCEPTION in node:
+                return depth - 1
+            if wildcard is not None and _RULE in wildcard:
+                longest = depth
+            if node is None:
+                break
+            if _RULE in node:
+                longest = depth
+        
+        return longest
+
+
+def parse_rules(lines: Iterable[str]) -> Iterable[str]:
+    """Yield rules from PSL file lines, skipping comments and blank lines."""
+    for line in lines:
+        line = line.strip()
+        if not line or line.startswith("//"):
+            continue
+        # Rules end at the first whitespace
+        yield line.split()[0].lower()
+
+
+def rule_variants(rule: str) -> List[str]:
+    """A rule plus its punycode form, so both Unicode and xn-- hosts match."""
+    variants = [rule]
+    try:
+        ascii_rule = ".".join(
+            label if label == "*" or label.isascii() else label.encode("idna").decode("ascii")
+            for label in rule.split(".")
+        )
+        if ascii_rule != rule:
+            variants.append(ascii_rule)
+    except UnicodeError:
+        pass
+    return variants
+
+
+_trie: Optional[PublicSuffixTrie] = None
+_trie_lock = threading.Lock()
+
+
+def get_suffix_trie() -> PublicSuffixTrie:
+    """Compile the bundled Public Suffix List once, on first use."""
+    global _trie
+    if _trie is None:
+        with _trie_lock:
+            if _trie is None:
+                try:
+                    _trie = PublicSuffixTrie.from_file(PUBLIC_SUFFIX_LIST_PATH)
+                except OSError as e:
+                    print(f"⚠ Could not load Public Suffix List from {PUBLIC_SUFFIX_LIST_PATH}: {e}")
+                    print("  Falling back to treating the last label as the suffix")
+                    _trie = PublicSuffixTrie()
+    return _trie
+
+
+def is_ip_address(host: str) -> bool:
+    """True for IPv4/IPv6 literals, which have no registrable domain."""
+    return ":" in host or host.replace(".", "").isdigit()
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def split_host(host: str) -> Tuple[Optional[str], str]:
+    """
+    Split a host into (registrable domain, brand label).
+    Example: shop.athleticgreens.co.uk -> ("athleticgreens.co.uk", "athleticgreens")
+    Returns (None, "") when the host is itself a public suffix or an IP address.
+    """
+    host = (host or "").strip().lower().rstrip(".")
+    if not host or is_ip_address(host):
+        return (None, "")
+    
+    labels = host.split(".")
+    if any(not label for label in labels):
+        return (None, "")
+    
+    suffix_length = get_suffix_trie().suffix_length(labels)
+    if len(labels) <= suffix_length:
+        return (None, "")
+    
+    registrable_labels = labels[-(suffix_length + 1):]
+    return (".".join(registrable_labels), registrable_labels[0])
+
+
+@lru_cache(maxsize=DOMAIN_CACHE_SIZE)
+def extract_host(url: str) -> Optional[str]:
+    """
+    Extract the lower-cased host from a URL, without www. prefix or port.
+    Example: https://www.athleticgreens.com/tim -> athleticgreens.com
+    """
+    if not url:
+        return None
+    
+    try:
+        # Add protocol if missing
+        if not url.startswith(('http://', 'https://')):
+            url = 'https://' + url
+        
+        host = urlparse(url).hostname or ""
+        host = host.rstrip(".")
+        
+        # Remove www. prefix
+        if host.startswith('www.'):
+            host = host[4:]
+        
+        return host if host else None
+    except Exception as e:
+        print(f"      Error parsing URL '{url}': {e}")
+        return None
+
+
+def extract_root_domain(url: str) -> Optional[str]:
+    """
+    Extract the registrable (root) domain from a URL.
+    Example: https://shop.athleticgreens.com/tim -> athleticgreens.com
+    Falls back to the bare host when it has no registrable domain (IP addresses, suffixes).
+    """
+    host = extract_host(url)
+    if not host:
+        return None
+    
+    registrable_domain, _ = split_host(host)
+    return registrable_domain or host
+
+
+def extract_domain_name(domain: str) -> str:
+    """
+    Extract brand name from a domain (registrable label, without the public suffix).
+    Example: athleticgreens.com -> athleticgreens, bbc.co.uk -> bbc
+    """
+    if not domain:
+        return ""
+    
+    _, brand_label = split_host(domain)
+    return brand_label
+
+
+def cache_stats() -> Dict[str, dict]:
+    """Hit/miss counts of the memoization caches."""
+    return {
+        "split_host": split_host.cache_info()._asdict(),
+        "extract_host": extract_host.cache_info()._asdict(),
+    }
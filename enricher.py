@@ -7,13 +7,18 @@ Uses a waterfall method to find specific human contacts:
 3. Smart guesser (last resort)
 """
 
+import io
 import os
-import re
+import sys
 import time
-from datetime import datetime, timezone
-from typing import Optional, List, Dict, Set, Tuple
+import atexit
+import argparse
+import threading
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from contextlib import contextmanager
+from typing import Optional, List, Dict, Iterable, Iterator, Set, Tuple
 from pathlib import Path
-from urllib.parse import urljoin, urlparse
+from urllib.parse import urldefrag, urljoin, urlparse
 
 try:
     from dotenv import load_dotenv
@@ -35,6 +40,18 @@ except ImportError:
 
 from supabase import create_client, Client
 
+from contact_extractor import extract_contacts
+from domains import extract_root_domain
+from http_client import HttpClient, read_text, wire_bytes_read
+from hunter import (
+    HUNTER_ACCOUNT_URL, HUNTER_API_URL, HUNTER_CREDIT_LIMIT, HunterBudgetExhausted, HunterCache, HunterQuota,
+    account_search_credits, filter_hunter_contacts,
+)
+from local_state import state_path
+from metrics import Metrics, add_metrics_arguments, profile_path, profiled
+from page_cache import PAGE_CACHE_DISK, Page, PageCache
+from storage import Store, add_storage_arguments, open_store
+
 
 # Load environment variables from .env.local or .env
 if DOTENV_AVAILABLE:
@@ -56,9 +73,17 @@ SUPABASE_URL = os.getenv("SUPABASE_URL") or os.getenv("NEXT_PUBLIC_SUPABASE_URL"
 SUPABASE_KEY = os.getenv("SUPABASE_SERVICE_ROLE_KEY") or os.getenv("SUPABASE_ANON_KEY")
 HUNTER_API_KEY = os.getenv("HUNTER_API_KEY")
 
+# Brands fetched per page while streaming brands without contacts
+BRAND_PAGE_SIZE = int(os.getenv("ENRICH_PAGE_SIZE", "500"))
+
 # Request settings
 REQUEST_TIMEOUT = 10  # seconds
-REQUEST_DELAY = 2  # seconds between requests (be polite)
+HOST_REQUEST_DELAY = float(os.getenv("ENRICH_HOST_DELAY", "1"))  # seconds between requests to the same site (be polite)
+ENRICH_WORKERS = int(os.getenv("ENRICH_WORKERS", "4"))  # brands enriched in parallel
+CONTACT_BATCH_SIZE = int(os.getenv("CONTACT_BATCH_SIZE", "100"))  # contacts (and brand check-offs) per bulk write
+CONTACT_FLUSH_INTERVAL = float(os.getenv("CONTACT_FLUSH_INTERVAL", "10"))  # seconds before a partial batch is flushed
+PAGE_MAX_BYTES = int(os.getenv("PAGE_MAX_BYTES", str(1024 * 1024)))  # most of a page read (bounds memory per worker)
+HTML_CONTENT_TYPES = ("text/html", "application/xhtml+xml")  # pages of other types are not downloaded
 USER_AGENT = "Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36"
 
 # Target roles for filtering Hunter.io results
@@ -67,6 +92,116 @@ TARGET_ROLES = ["marketing", "partnership", "sponsorship", "pr", "director"]
 # Generic department emails to try as last resort
 GENERIC_DEPARTMENTS = ["partnerships", "marketing", "press", "creators"]
 
+# Stage timings and counters for this run (written to <metrics dir>/enricher.prom and .json)
+metrics = Metrics("enricher")
+
+
+class HostScheduler:
+    """
+    Spaces requests to the same host at least delay seconds apart.
+    Each caller reserves the host's next free slot and sleeps until it, so threads
+    working on different sites never wait for each other.
+    """
+
+    def __init__(self, delay: float = HOST_REQUEST_DELAY):
+        self.delay = delay
+        self._next_allowed: Dict[str, float] = {}
+        self._lock = threading.Lock()
+
+    def wait(self, url: str):
+        """Block until a request to url's host is allowed."""
+        host = urlparse(url).netloc.lower()
+        with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_allowed.get(host, now))
+            self._next_allowed[host] = slot + self.delay
+        
+        if slot > now:
+            metrics.observe("host_wait", slot - now)
+            time.sleep(slot - now)
+
+
+host_scheduler = HostScheduler()
+
+# One pooled, retrying client for Hunter.io and website requests (shared by all worker threads)
+http = HttpClient(user_agent=USER_AGENT, metrics=metrics)
+
+# Hunter.io rate limit and search credits left for this run (set by load_hunter_credits)
+hunter_quota = HunterQuota(metrics=metrics)
+
+# Hunter.io responses cached across runs (opened on first use)
+_hunter_cache: Optional[HunterCache] = None
+_hunter_cache_lock = threading.Lock()
+
+
+def get_hunter_cache() -> HunterCache:
+    """Open the Hunter.io response cache once."""
+    global _hunter_cache
+    with _hunter_cache_lock:
+        if _hunter_cache is None:
+            _hunter_cache = HunterCache()
+        return _hunter_cache
+
+
+def close_hunter_cache():
+    global _hunter_cache
+    with _hunter_cache_lock:
+        if _hunter_cache is not None:
+            _hunter_cache.close()
+            _hunter_cache = None
+
+# Web pages fetched this run, shared by all worker threads (opened on first use)
+_page_cache: Optional[PageCache] = None
+_page_cache_lock = threading.Lock()
+
+
+def get_page_cache() -> PageCache:
+    """Create the page cache once (stored in pages.db between runs when PAGE_CACHE_DISK is set)."""
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is None:
+            _page_cache = PageCache(path=state_path("pages.db") if PAGE_CACHE_DISK else None, metrics=metrics)
+        return _page_cache
+
+
+def close_page_cache():
+    global _page_cache
+    with _page_cache_lock:
+        if _page_cache is not None:
+            _page_cache.close()
+            _page_cache = None
+
+
+class ThreadBufferedOutput:
+    """
+    Stand-in for sys.stdout while brands are enriched concurrently.
+    Output of a worker thread inside capture() is collected separately, so each
+    brand's log can be printed as one block instead of interleaving with others.
+    """
+
+    def __init__(self, stream):
+        self.stream = stream
+        self._local = threading.local()
+
+    def write(self, text: str) -> int:
+        buffer = getattr(self._local, "buffer", None)
+        return (buffer or self.stream).write(text)
+
+    def flush(self):
+        if getattr(self._local, "buffer", None) is None:
+            self.stream.flush()
+
+    def __getattr__(self, name):
+        return getattr(self.stream, name)
+
+    @contextmanager
+    def capture(self) -> Iterator[io.StringIO]:
+        self._local.buffer = io.StringIO()
+        try:
+            yield self._local.buffer
+        finally:
+            self._local.buffer = None
+
 
 def get_supabase_client() -> Client:
     """Create and return Supabase client."""
@@ -79,36 +214,6 @@ def get_supabase_client() -> Client:
     return create_client(SUPABASE_URL, SUPABASE_KEY)
 
 
-def extract_root_domain(url: str) -> Optional[str]:
-    """
-    Extract root domain from a URL.
-    Example: https://www.athleticgreens.com/tim -> athleticgreens.com
-    """
-    if not url:
-        return None
-    
-    try:
-        # Add protocol if missing
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
-        
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
-        
-        # Remove www. prefix
-        if domain.startswith('www.'):
-            domain = domain[4:]
-        
-        # Remove port if present
-        if ':' in domain:
-            domain = domain.split(':')[0]
-        
-        return domain if domain else None
-    except Exception as e:
-        print(f"      Error parsing URL '{url}': {e}")
-        return None
-
-
 def normalize_url(url: str) -> Optional[str]:
     """Normalize URL by adding protocol if missing."""
     if not url:
@@ -123,41 +228,63 @@ def normalize_url(url: str) -> Optional[str]:
     return url
 
 
-def fetch_brands_without_contacts(supabase: Client) -> List[dict]:
+def fetch_brands_without_contacts(store: Store, page_size: int = BRAND_PAGE_SIZE,
+                                  by_mentions: bool = False) -> Iterator[dict]:
     """
-    Fetch all brands that have website_url but no contacts yet.
+    Yield brands that have website_url but no contacts yet (most mentioned first with by_mentions).
+    The database does the filtering and pages are fetched as they are needed,
+    so enrichment starts after the first page and memory stays at one page.
     """
-    try:
-        # Get all brands with their contacts
-        response = supabase.table("brands").select("id, name, website_url, contacts(id)").execute()
-        
-        if not response.data:
-            return []
-        
-        # Filter brands without contacts but with website_url
-        brands_without_contacts = []
-        for brand in response.data:
-            contacts = brand.get('contacts', [])
-            if not contacts or len(contacts) == 0:
-                if brand.get('website_url'):
-                    brands_without_contacts.append({
-                        'id': brand['id'],
-                        'name': brand['name'],
-                        'website_url': brand['website_url']
-                    })
+    pages = store.iter_brands_without_contacts(page_size, by_mentions)
+    while True:
+        try:
+            with metrics.timer("load_brands"):
+                page = next(pages, None)
+        except Exception as e:
+            print(f"❌ Error fetching brands: {e}")
+            return
         
-        return brands_without_contacts
+        if not page:
+            return
+        yield from page
+
+
+def load_hunter_credits() -> Optional[int]:
+    """
+    Number of Hunter.io searches this run may spend: what the account has left this period,
+    capped by HUNTER_CREDIT_LIMIT. None when neither is known (searches aren't budgeted).
+    """
+    limit = max(0, int(HUNTER_CREDIT_LIMIT)) if HUNTER_CREDIT_LIMIT else None
+    remaining = None
+    try:
+        response = http.get(
+            HUNTER_ACCOUNT_URL, target="hunter_account", params={"api_key": HUNTER_API_KEY}, timeout=REQUEST_TIMEOUT
+        )
+        if response.status_code == 200:
+            remaining = account_search_credits(response.json())
+        else:
+            print(f"⚠ Hunter.io account lookup returned {response.status_code}")
+    except (requests.exceptions.RequestException, ValueError) as e:
+        print(f"⚠ Could not read Hunter.io credits: {e}")
     
-    except Exception as e:
-        print(f"❌ Error fetching brands: {e}")
-        return []
+    if remaining is None:
+        return limit
+    return remaining if limit is None else min(remaining, limit)
 
 
 def hunter_api_search(domain: str) -> List[Dict[str, str]]:
     """
     Step A: Use Hunter.io API to find contacts.
     Returns list of contacts with name, role, and email.
+    Responses are cached per domain; TARGET_ROLES is applied to the cached response.
     """
+    cache = get_hunter_cache()
+    data = cache.get(domain)
+    if data is not None:
+        metrics.inc("hunter_cache", result="hit")
+        print("      ♻ Using cached Hunter.io response")
+        return filter_hunter_contacts(data, TARGET_ROLES)
+    
     if not HUNTER_API_KEY:
         print("      ⚠ HUNTER_API_KEY not set, skipping Hunter.io API")
         return []
@@ -166,60 +293,150 @@ def hunter_api_search(domain: str) -> List[Dict[str, str]]:
         print("      ⚠ requests library not available")
         return []
     
+    metrics.inc("hunter_cache", result="miss")
+    if not hunter_quota.reserve():
+        raise HunterBudgetExhausted()
+    
     try:
-        url = "https://api.hunter.io/v2/domain-search"
         params = {
             "domain": domain,
             "api_key": HUNTER_API_KEY
         }
         
-        response = requests.get(url, params=params, timeout=REQUEST_TIMEOUT)
+        with metrics.timer("hunter"):
+            response = http.get(
+                HUNTER_API_URL, target="hunter", throttle=hunter_quota.wait, params=params, timeout=REQUEST_TIMEOUT
+            )
+        
+        if response.status_code == 429:
+            # Still refused after the client's retries despite the rate limit: the credits are used up
+            print("      ⚠ Hunter.io usage limit reached, no more searches this run")
+            hunter_quota.exhaust()
+            raise HunterBudgetExhausted()
         
         if response.status_code != 200:
             print(f"      ⚠ Hunter.io API returned {response.status_code}")
+            hunter_quota.refund()
             return []
         
         data = response.json()
         
-        # Check for API errors
+        # Check for API errors (not cached, so the domain is tried again next run)
         if data.get("errors"):
             print(f"      ⚠ Hunter.io API error: {data['errors']}")
+            hunter_quota.refund()
             return []
         
-        # Extract contacts from response
-        contacts = []
-        emails = data.get("data", {}).get("emails", [])
-        
-        for email_data in emails:
-            # Filter by target roles
-            role = email_data.get("position", "").lower()
-            if not any(target_role in role for target_role in TARGET_ROLES):
-                continue
-            
-            contact = {
-                "name": email_data.get("first_name", "") + " " + email_data.get("last_name", ""),
-                "role": email_data.get("position", ""),
-                "email": email_data.get("value", "")
-            }
-            
-            # Clean up name
-            contact["name"] = contact["name"].strip()
-            if not contact["name"]:
-                contact["name"] = None
-            
-            if contact["email"]:
-                contacts.append(contact)
-        
-        return contacts
+        cache.save(domain, data)
+        return filter_hunter_contacts(data, TARGET_ROLES)
     
+    except HunterBudgetExhausted:
+        raise
     except requests.exceptions.RequestException as e:
         print(f"      ⚠ Hunter.io API request failed: {e}")
+        hunter_quota.refund()
         return []
     except Exception as e:
         print(f"      ⚠ Error with Hunter.io API: {e}")
         return []
 
 
+def is_html(content_type: Optional[str]) -> bool:
+    """True for HTML content types (and when the server didn't send one)."""
+    if not content_type:
+        return True
+    return content_type.split(";", 1)[0].strip().lower() in HTML_CONTENT_TYPES
+
+
+def download_page(url: str, headers: Dict[str, str]) -> Optional[Page]:
+    """
+    GET a page for the page cache, politely per host. Returns None if the request failed.
+    The body is streamed and only its first PAGE_MAX_BYTES are read; non-HTML responses
+    are recognized from their headers and their body isn't downloaded at all.
+    """
+    try:
+        with metrics.timer("page_fetch"):
+            response = http.get(
+                url,
+                target="page",
+                throttle=host_scheduler.wait,
+                headers=headers,
+                timeout=REQUEST_TIMEOUT,
+                allow_redirects=True,
+                stream=True
+            )
+            try:
+                text = ""
+                if response.status_code == 200:
+                    text = read_page_body(url, response)
+            finally:
+                # Closing an unread stream drops the connection instead of downloading the rest
+                response.close()
+    except requests.exceptions.RequestException as e:
+        print(f"      ⚠ Could not fetch {url}: {e}")
+        return None
+    
+    return Page(
+        url,
+        response.status_code,
+        text,
+        etag=response.headers.get("ETag"),
+        last_modified=response.headers.get("Last-Modified")
+    )
+
+
+def read_page_body(url: str, response: "requests.Response") -> str:
+    """Read an HTML body up to PAGE_MAX_BYTES, counting the bytes read and the bytes left unread."""
+    content_length = response.headers.get("Content-Length", "")
+    content_length = int(content_length) if content_length.isdigit() else None
+    
+    if not is_html(response.headers.get("Content-Type")):
+        print(f"      ⏭ Skipping {url} ({response.headers.get('Content-Type')})")
+        metrics.inc("pages_skipped", reason="content_type")
+        if content_length:
+            metrics.inc("page_bytes_saved", content_length)
+        return ""
+    
+    text, size, truncated = read_text(response, PAGE_MAX_BYTES)
+    metrics.inc("page_bytes", size)
+    if truncated:
+        metrics.inc("pages_skipped", reason="too_large")
+        wire_read = wire_bytes_read(response)
+        if content_length and wire_read is not None and content_length > wire_read:
+            metrics.inc("page_bytes_saved", content_length - wire_read)
+        print(f"      ✂ Read only the first {size // 1024} KB of {url}")
+    return text
+
+
+def parse_links(text: str) -> List[Tuple[str, str]]:
+    """(href, lowercased link text) of every link on a page; the document tree is dropped afterwards."""
+    with metrics.timer("page_parse"):
+        soup = BeautifulSoup(text, 'html.parser')
+        return [
+            (anchor.get('href', '').strip(), anchor.get_text().lower().strip())
+            for anchor in soup.find_all('a', href=True)
+        ]
+
+
+def fetch_page(url: str) -> Optional[Page]:
+    """
+    The page at url, or None if it couldn't be fetched (or wasn't a 200).
+    Each page is downloaded at most once per run (see page_cache.py).
+    """
+    page = get_page_cache().fetch(url, download_page)
+    if page is None or not page.ok:
+        return None
+    return page
+
+
+def fetch_page_links(url: str) -> Optional[List[Tuple[str, str]]]:
+    """The links on the page at url, or None if it couldn't be fetched. Each page is parsed at most once per run."""
+    page = fetch_page(url)
+    if page is None:
+        return None
+    return page.parsed(parse_links)
+
+
 def find_team_pages(base_url: str) -> List[str]:
     """
     Find potential team/contact pages by looking for common links.
@@ -231,34 +448,25 @@ def find_team_pages(base_url: str) -> List[str]:
     normalized_url = normalize_url(base_url)
     if not normalized_url:
         return []
+    if not urlparse(normalized_url).path:
+        # Same page cache key as the site's own "/" links
+        normalized_url = urlparse(normalized_url)._replace(path="/").geturl()
     
     team_keywords = ["about", "team", "contact", "press"]
     found_pages = [normalized_url]  # Always check the homepage
     
     try:
-        response = requests.get(
-            normalized_url,
-            timeout=REQUEST_TIMEOUT,
-            headers={'User-Agent': USER_AGENT},
-            allow_redirects=True
-        )
-        
-        if response.status_code != 200:
+        links = fetch_page_links(normalized_url)
+        if links is None:
             return found_pages
         
-        soup = BeautifulSoup(response.text, 'html.parser')
-        
-        # Find all links
-        for anchor in soup.find_all('a', href=True):
-            href = anchor.get('href', '').strip()
-            link_text = anchor.get_text().lower().strip()
-            
+        for href, link_text in links:
             # Check if link text or href contains team keywords
             if any(keyword in link_text for keyword in team_keywords) or \
                any(keyword in href.lower() for keyword in team_keywords):
                 
-                # Resolve relative URLs
-                full_url = urljoin(normalized_url, href)
+                # Resolve relative URLs (without #fragment, so "/#contact" is the homepage again)
+                full_url = urldefrag(urljoin(normalized_url, href))[0]
                 
                 # Only add if it's from the same domain
                 parsed_base = urlparse(normalized_url)
@@ -278,7 +486,8 @@ def find_team_pages(base_url: str) -> List[str]:
 
 def scrape_team_pages_for_contacts(domain: str, base_url: str) -> List[Dict[str, str]]:
     """
-    Step B: Scrape team/about/contact pages for mailto links.
+    Step B: Scrape team/about/contact pages for email addresses
+    (mailto links, addresses in the text and obfuscated ones, see contact_extractor.py).
     Returns list of contacts with name, role, and email.
     """
     if not REQUESTS_AVAILABLE or not BEAUTIFULSOUP_AVAILABLE:
@@ -289,78 +498,14 @@ def scrape_team_pages_for_contacts(domain: str, base_url: str) -> List[Dict[str,
     
     for page_url in team_pages:
         try:
-            response = requests.get(
-                page_url,
-                timeout=REQUEST_TIMEOUT,
-                headers={'User-Agent': USER_AGENT},
-                allow_redirects=True
-            )
-            
-            if response.status_code != 200:
+            # The homepage was already fetched by find_team_pages
+            page = fetch_page(page_url)
+            if page is None:
                 continue
             
-            soup = BeautifulSoup(response.text, 'html.parser')
-            
-            # Find all mailto links
-            for anchor in soup.find_all('a', href=True):
-                href = anchor.get('href', '').strip()
-                
-                if href.startswith('mailto:'):
-                    # Extract email
-                    email = href.replace('mailto:', '').split('?')[0].split('&')[0].strip()
-                    
-                    if not email or '@' not in email:
-                        continue
-                    
-                    # Extract name and role from surrounding context
-                    link_text = anchor.get_text().strip()
-                    parent_text = ""
-                    
-                    # Try to get parent element text for context
-                    parent = anchor.parent
-                    if parent:
-                        parent_text = parent.get_text().strip()
-                    
-                    # Smart extraction: look for role indicators
-                    role = None
-                    combined_text = (link_text + " " + parent_text).lower()
-                    
-                    role_keywords = {
-                        "press": ["press", "media", "pr", "public relations"],
-                        "marketing": ["marketing", "growth", "acquisition"],
-                        "partnership": ["partnership", "partnerships", "sponsor", "sponsorship"],
-                        "contact": ["contact", "general", "info"]
-                    }
-                    
-                    for role_name, keywords in role_keywords.items():
-                        if any(keyword in combined_text for keyword in keywords):
-                            role = role_name.title()
-                            break
-                    
-                    if not role:
-                        role = "Contact"  # Default role
-                    
-                    # Try to extract name from link text or nearby text
-                    name = None
-                    if link_text and '@' not in link_text:
-                        # If link text doesn't contain email, it might be a name
-                        name = link_text
-                    elif parent_text:
-                        # Try to extract name from parent text (before email)
-                        name_match = re.search(r'([A-Z][a-z]+(?:\s+[A-Z][a-z]+)*)', parent_text)
-                        if name_match:
-                            name = name_match.group(1)
-                    
-                    contact = {
-                        "name": name,
-                        "role": role,
-                        "email": email.lower()
-                    }
-                    
-                    contacts.append(contact)
-            
-            # Small delay between page requests
-            time.sleep(1)
+            # Single pass over the HTML; no document tree is built for the contact pages
+            with metrics.timer("contact_extract"):
+                contacts.extend(extract_contacts(page.text))
         
         except Exception as e:
             print(f"      ⚠ Error scraping {page_url}: {e}")
@@ -388,58 +533,117 @@ def generate_generic_emails(domain: str) -> List[Dict[str, str]]:
     return contacts
 
 
-def save_contact(supabase: Client, brand_id: str, name: Optional[str], role: Optional[str], email: str) -> bool:
+class ContactWriter:
     """
-    Save contact to database.
-    Returns True if saved successfully, False otherwise.
+    Buffers contacts and brand check-offs from all worker threads and writes them in batches.
+    Each flush is one bulk insert (contacts the brand already has are skipped by the store)
+    and one updated_at update for all brands checked since the last flush.
+    Contacts already queued in this run are dropped in memory. Flushes when the buffer is
+    full, when the flush interval has elapsed, and at exit (until close() is called).
     """
-    if not brand_id or not email:
-        return False
-    
-    try:
-        contact_data = {
+
+    def __init__(self, store: Store, batch_size: int = CONTACT_BATCH_SIZE,
+                 flush_interval: float = CONTACT_FLUSH_INTERVAL):
+        self.store = store
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.pending_contacts: List[dict] = []
+        self.pending_checked: List[str] = []
+        self.queued: Set[Tuple[str, str]] = set()
+        self.last_flush = time.monotonic()
+        self.inserted_total = 0
+        self.failed_batches = 0
+        self._lock = threading.Lock()
+        self._flush_lock = threading.Lock()
+        atexit.register(self.flush)
+
+    def add(self, brand_id: str, name: Optional[str], role: Optional[str], email: str) -> bool:
+        """
+        Queue a contact for saving.
+        Returns False if it has no email or was already queued for this brand.
+        """
+        if not brand_id or not email:
+            return False
+        
+        email = email.lower().strip()
+        contact = {
             "brand_id": brand_id,
-            "email": email.lower().strip(),
+            "email": email,
             "name": name.strip() if name else None,
             "role": role.strip() if role else None
         }
+        with self._lock:
+            if (brand_id, email) in self.queued:
+                metrics.inc("contacts_duplicate")
+                return False
+            self.queued.add((brand_id, email))
+            self.pending_contacts.append(contact)
+            full = len(self.pending_contacts) >= self.batch_size
         
-        # Remove None values
-        contact_data = {k: v for k, v in contact_data.items() if v is not None}
-        
-        response = supabase.table("contacts").insert(contact_data).execute()
-        
-        if response.data and len(response.data) > 0:
-            return True
+        if full:
+            self.flush()
         else:
-            return False
-    
-    except Exception as e:
-        # Handle duplicate key errors gracefully
-        error_str = str(e).lower()
-        if 'duplicate' in error_str or 'unique' in error_str or 'already exists' in error_str:
-            return False
-        print(f"      ⚠ Error saving contact '{email}': {e}")
-        return False
-
-
-def mark_brand_checked(supabase: Client, brand_id: str) -> bool:
-    """
-    Mark brand as checked by updating updated_at timestamp.
-    This helps track which brands have been processed.
-    """
-    try:
-        # Update the updated_at timestamp
-        supabase.table("brands").update({
-            "updated_at": datetime.now(timezone.utc).isoformat()
-        }).eq("id", brand_id).execute()
+            self.flush_if_due()
         return True
-    except Exception as e:
-        # Fail gracefully if update fails
-        return False
+
+    def mark_checked(self, brand_id: str):
+        """Queue a brand's updated_at touch, so processed brands can be tracked."""
+        with self._lock:
+            self.pending_checked.append(brand_id)
+            full = len(self.pending_checked) >= self.batch_size
+        
+        if full:
+            self.flush()
+        else:
+            self.flush_if_due()
+
+    def close(self):
+        """Flush pending contacts and check-offs, close the store and drop the exit hook."""
+        atexit.unregister(self.flush)
+        self.flush()
+        self.store.close()
+
+    def flush_if_due(self):
+        """Flush a partial batch once the flush interval has elapsed."""
+        if time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self):
+        """Write all pending contacts in one call, then check off all pending brands in one update."""
+        with self._flush_lock:
+            with self._lock:
+                contacts, self.pending_contacts = self.pending_contacts, []
+                checked, self.pending_checked = self.pending_checked, []
+                self.last_flush = time.monotonic()
+            
+            if contacts:
+                try:
+                    with metrics.timer("save"):
+                        inserted = self.store.insert_contacts(contacts)
+                except Exception as e:
+                    print(f"      ⚠ Error saving batch of {len(contacts)} contacts: {e}")
+                    self.failed_batches += 1
+                    metrics.inc("contact_batches", result="failed")
+                    metrics.inc("contact_errors", len(contacts))
+                    # Release them so a later brand step can queue these contacts again
+                    with self._lock:
+                        self.queued.difference_update((c["brand_id"], c["email"]) for c in contacts)
+                else:
+                    self.inserted_total += len(inserted)
+                    metrics.inc("contact_batches", result="ok")
+                    metrics.inc("contacts_written", len(inserted))
+                    metrics.inc("contacts_duplicate", len(contacts) - len(inserted))
+            
+            if checked:
+                try:
+                    with metrics.timer("mark_checked"):
+                        self.store.mark_brands_checked(checked)
+                except Exception as e:
+                    # Check-offs are only bookkeeping; fail gracefully
+                    print(f"      ⚠ Error marking {len(checked)} brands as checked: {e}")
 
 
-def enrich_brand(supabase: Client, brand: dict) -> Tuple[bool, int]:
+def enrich_brand(writer: ContactWriter, brand: dict) -> Tuple[bool, int]:
     """
     Enrich a single brand using waterfall method.
     Returns (success, contacts_found) tuple.
@@ -453,7 +657,8 @@ def enrich_brand(supabase: Client, brand: dict) -> Tuple[bool, int]:
     domain = extract_root_domain(website_url)
     if not domain:
         print(f"   ⚠ Could not extract domain from {website_url}")
-        mark_brand_checked(supabase, brand_id)
+        writer.mark_checked(brand_id)
+        metrics.inc("brands_processed", result="no_domain")
         return (False, 0)
     
     print(f"   Domain: {domain}")
@@ -462,36 +667,46 @@ def enrich_brand(supabase: Client, brand: dict) -> Tuple[bool, int]:
     
     # Step A: Hunter.io API
     print("   Step A: Trying Hunter.io API...")
-    hunter_contacts = hunter_api_search(domain)
+    try:
+        hunter_contacts = hunter_api_search(domain)
+    except HunterBudgetExhausted:
+        print("   ⏭ No Hunter.io credits left, skipping Step A")
+        metrics.inc("hunter_skipped")
+        hunter_contacts = []
     
     if hunter_contacts:
         print(f"   ✓ Found {len(hunter_contacts)} contact(s) via Hunter.io")
         for contact in hunter_contacts:
-            if save_contact(supabase, brand_id, contact.get("name"), contact.get("role"), contact.get("email")):
+            if writer.add(brand_id, contact.get("name"), contact.get("role"), contact.get("email")):
                 contacts_found += 1
+                metrics.inc("contacts_saved", source="hunter")
                 name_display = contact.get("name") or "Unknown"
                 role_display = contact.get("role") or "Unknown"
                 print(f"      ✓ Found {name_display} ({role_display}) at {brand_name}")
         
         if contacts_found > 0:
-            mark_brand_checked(supabase, brand_id)
+            writer.mark_checked(brand_id)
+            metrics.inc("brands_processed", result="hunter")
             return (True, contacts_found)
     
     # Step B: Team page scraper
     print("   Step B: Trying team page scraper...")
-    team_contacts = scrape_team_pages_for_contacts(domain, website_url)
+    with metrics.timer("team_pages"):
+        team_contacts = scrape_team_pages_for_contacts(domain, website_url)
     
     if team_contacts:
         print(f"   ✓ Found {len(team_contacts)} contact(s) via team pages")
         for contact in team_contacts:
-            if save_contact(supabase, brand_id, contact.get("name"), contact.get("role"), contact.get("email")):
+            if writer.add(brand_id, contact.get("name"), contact.get("role"), contact.get("email")):
                 contacts_found += 1
+                metrics.inc("contacts_saved", source="team_page")
                 name_display = contact.get("name") or "Unknown"
                 role_display = contact.get("role") or "Unknown"
                 print(f"      ✓ Found {name_display} ({role_display}) at {brand_name}")
         
         if contacts_found > 0:
-            mark_brand_checked(supabase, brand_id)
+            writer.mark_checked(brand_id)
+            metrics.inc("brands_processed", result="team_page")
             return (True, contacts_found)
     
     # Step C: Smart guesser
@@ -499,22 +714,140 @@ def enrich_brand(supabase: Client, brand: dict) -> Tuple[bool, int]:
     generic_contacts = generate_generic_emails(domain)
     
     for contact in generic_contacts:
-        if save_contact(supabase, brand_id, contact.get("name"), contact.get("role"), contact.get("email")):
+        if writer.add(brand_id, contact.get("name"), contact.get("role"), contact.get("email")):
             contacts_found += 1
+            metrics.inc("contacts_saved", source="generic")
             print(f"      ✓ Generated {contact.get('email')} ({contact.get('role')}) for {brand_name}")
     
     # Mark as checked regardless of success
-    mark_brand_checked(supabase, brand_id)
+    writer.mark_checked(brand_id)
     
     if contacts_found > 0:
+        metrics.inc("brands_processed", result="generic")
         return (True, contacts_found)
     else:
         print(f"   ⚠ No contacts found for {brand_name}")
+        metrics.inc("brands_processed", result="none")
         return (False, 0)
 
 
-def main():
+def enrich_brands(store: Store, brands: Iterable[dict], workers: int = ENRICH_WORKERS) -> Tuple[int, int, int]:
+    """
+    Enrich brands on a pool of worker threads.
+    Brands are pulled from the iterable only as workers free up, so a streamed brand list
+    stays streamed. Politeness is per host (host_scheduler), not a pause between brands.
+    Contacts and check-offs are written in batches by one shared ContactWriter.
+    Returns (brands processed, brands enriched, contacts found).
+    """
+    workers = max(1, workers)
+    output = ThreadBufferedOutput(sys.stdout)
+    writer = ContactWriter(store)
+    processed = enriched = total_contacts = 0
+
+    def run_one(brand: dict) -> Tuple[bool, int, str]:
+        with output.capture() as log:
+            try:
+                with metrics.timer("brand"):
+                    success, contacts = enrich_brand(writer, brand)
+            except Exception as e:
+                print(f"   ❌ Error enriching {brand.get('name')}: {e}")
+                metrics.inc("brands_processed", result="error")
+                success, contacts = False, 0
+        return success, contacts, log.getvalue()
+
+    def finish(future):
+        nonlocal processed, enriched, total_contacts
+        success, contacts, log = future.result()
+        processed += 1
+        if success:
+            enriched += 1
+            total_contacts += contacts
+        print(f"\n{'=' * 60}")
+        print(f"Brand {processed}")
+        print(log, end="")
+    
+    sys.stdout = output
+    try:
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            in_flight = set()
+            for brand in brands:
+                # A small backlog keeps workers busy without reading ahead of them
+                if len(in_flight) >= workers * 2:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        finish(future)
+                in_flight.add(executor.submit(run_one, brand))
+            
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    finish(future)
+    finally:
+        sys.stdout = output.stream
+        writer.close()
+    
+    print(f"\n💾 Saved {writer.inserted_total} contact(s) in batches of up to {writer.batch_size}")
+    if writer.failed_batches:
+        print(f"⚠ {writer.failed_batches} contact batch(es) could not be saved; those brands will be retried next run")
+    return processed, enriched, total_contacts
+
+
+def report_hunter_cache():
+    """Print how many Hunter.io lookups were answered from the cache."""
+    hits = metrics.value("hunter_cache", result="hit")
+    misses = metrics.value("hunter_cache", result="miss")
+    if hits or misses:
+        print(f"♻ Hunter.io cache: {hits:.0f} of {hits + misses:.0f} domain searches served without a request")
+
+
+def report_page_cache():
+    """Print how many page fetches the page cache saved."""
+    hits = metrics.value("page_cache", result="hit")
+    revalidated = metrics.value("page_cache", result="revalidated")
+    downloads = metrics.value("page_cache", result="miss") + metrics.value("page_cache", result="error")
+    if hits or revalidated or downloads:
+        print(f"♻ Page cache: {hits + revalidated + downloads:.0f} page lookups, {downloads:.0f} downloaded, "
+              f"{hits:.0f} reused in this run, {revalidated:.0f} unchanged since the last run (304)")
+
+
+def report_page_downloads():
+    """Print how much page data was read and how much the size cap and type checks avoided."""
+    read = metrics.value("page_bytes")
+    saved = metrics.value("page_bytes_saved")
+    too_large = metrics.value("pages_skipped", reason="too_large")
+    not_html = metrics.value("pages_skipped", reason="content_type")
+    if read or saved or too_large or not_html:
+        print(f"✂ Page downloads: {read / 1024:.0f} KB read, {saved / 1024:.0f} KB not downloaded "
+              f"({too_large:.0f} page(s) cut at {PAGE_MAX_BYTES // 1024} KB, {not_html:.0f} non-HTML skipped)")
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Find contacts for brands that don't have any yet.")
+    parser.add_argument(
+        "--workers", type=int, default=ENRICH_WORKERS,
+        help=f"brands enriched in parallel (default: {ENRICH_WORKERS})"
+    )
+    add_storage_arguments(parser)
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """Main function to run the enricher."""
+    args = parse_args(argv)
+    with profiled(profile_path(args, "enricher")):
+        run(args)
+    
+    try:
+        prom_path, json_path = metrics.write(args.metrics_dir)
+        print(f"📊 Metrics written to {prom_path} and {json_path.name}")
+    except OSError as e:
+        print(f"⚠ Could not write metrics: {e}")
+
+
+def run(args: argparse.Namespace):
+    """Run the enricher with parsed command line arguments."""
     print("=" * 60)
     print("SponsorFinder - Contact Enricher")
     print("Upgrading from Generic Brands to Specific People")
@@ -531,56 +864,68 @@ def main():
         print("  Install with: pip install beautifulsoup4")
         return
     
-    # Check Supabase connection
+    # Open the brand store (Supabase, or a local SQLite file)
     try:
-        supabase = get_supabase_client()
-        print("✓ Supabase connection successful")
+        store = open_store(args.storage, args.db, dry_run=args.dry_run, supabase_factory=get_supabase_client)
+        print(f"✓ Storage: {store.name}" + (f" ({args.db})" if args.storage == "sqlite" else ""))
     except Exception as e:
-        print(f"❌ Supabase connection failed: {e}")
+        print(f"❌ Storage connection failed: {e}")
         return
     
-    # Check Hunter.io API key
+    if args.dry_run:
+        print("🧪 Dry run: contacts are looked up but not saved")
+    
+    try:
+        enrich_store(args, store)
+    finally:
+        metrics.report()
+        http.close()
+        close_hunter_cache()
+        close_page_cache()
+        store.close()
+
+
+def enrich_store(args: argparse.Namespace, store: Store):
+    """Enrich the brands of an open store and print the summary."""
+    # Check Hunter.io API key and how many searches are left
+    credits = None
     if HUNTER_API_KEY:
         print("✓ Hunter.io API key found")
+        credits = load_hunter_credits()
+        hunter_quota.set_credits(credits)
+        if credits is not None:
+            print(f"✓ Hunter.io: {credits} domain search(es) available for this run")
     else:
         print("⚠ HUNTER_API_KEY not set - Step A (Hunter.io) will be skipped")
         print("  Get a free API key at: https://hunter.io/api")
     
-    # Fetch brands without contacts
+    # Stream brands without contacts page by page
     print("\n📋 Fetching brands without contacts...")
-    brands = fetch_brands_without_contacts(supabase)
+    brands = fetch_brands_without_contacts(store, by_mentions=credits is not None)
     
-    if not brands:
+    # Process brands concurrently, politely per site
+    print(f"✓ Enriching with {max(1, args.workers)} worker(s), {HOST_REQUEST_DELAY:g}s between requests to the same site")
+    processed_count, enriched_count, total_contacts = enrich_brands(store, brands, workers=args.workers)
+    hunter_skipped = int(metrics.value("hunter_skipped"))
+    
+    if not processed_count:
         print("✓ No brands found that need enrichment")
         return
     
-    print(f"✓ Found {len(brands)} brand(s) to enrich")
-    
-    # Process each brand
-    enriched_count = 0
-    total_contacts = 0
-    
-    for i, brand in enumerate(brands, 1):
-        print(f"\n{'=' * 60}")
-        print(f"Brand {i}/{len(brands)}")
-        
-        success, contacts = enrich_brand(supabase, brand)
-        if success:
-            enriched_count += 1
-            total_contacts += contacts
-        
-        # Add delay between brands to be polite
-        if i < len(brands):
-            time.sleep(REQUEST_DELAY)
-    
     # Print summary
     print(f"\n{'=' * 60}")
     print("Enrichment Complete!")
     print(f"{'=' * 60}")
-    print(f"Total brands processed: {len(brands)}")
+    print(f"Total brands processed: {processed_count}")
     print(f"Brands enriched with contacts: {enriched_count}")
     print(f"Total contacts found: {total_contacts}")
-    print(f"Brands without contacts found: {len(brands) - enriched_count}")
+    print(f"Brands without contacts found: {processed_count - enriched_count}")
+    if hunter_skipped:
+        print(f"Brands that skipped Hunter.io (no credits left): {hunter_skipped}")
+    print()
+    report_hunter_cache()
+    report_page_cache()
+    report_page_downloads()
 
 
 if __name__ == "__main__":
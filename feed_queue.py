@@ -0,0 +1,249 @@
+"""
+SponsorFinder feed queue - feed lists and a shared work queue for sharded scraping.
+Loads feed URLs from OPML or text files, assigns them to shards by consistent hashing,
+and hands them out to worker processes through expiring leases in a SQLite file, so feeds
+held by a crashed worker are picked up again. Several machines split the shards between
+them, each with its own queue file.
+"""
+
+import time
+import bisect
+import hashlib
+import threading
+import xml.etree.ElementTree as ET
+from pathlib import Path
+from typing import Collection, Dict, Iterable, List, Optional
+
+from local_state import connect, state_path
+
+
+# Virtual nodes per shard on the hash ring (more = more even spread)
+RING_REPLICAS = 128
+
+
+def load_feed_urls(path: Path) -> List[str]:
+    """
+    Read feed URLs from an OPML file (outline xmlUrl attributes) or a text file
+    (one URL per line, "#" comments). Duplicates are dropped, order is kept.
+    """
+    path = Path(path)
+    raw = path.read_bytes()
+    
+    if path.suffix.lower() in (".opml", ".xml") or raw.lstrip().startswith(b"<"):
+        root = ET.fromstring(raw)
+        urls = [
+            outline.get("xmlUrl") or outline.get("xmlurl") or outline.get("url")
+            for outline in root.iter("outline")
+        ]
+    else:
+        urls = [line.split("#", 1)[0] for line in raw.decode("utf-8").splitlines()]
+    
+    seen = set()
+    feed_urls = []
+    for url in urls:
+        url = (url or "").strip()
+        if url and url not in seen:
+            seen.add(url)
+            feed_urls.append(url)
+    return feed_urls
+
+
+class ConsistentHashRing:
+    """
+    Maps feed URLs to shards so that changing the shard count only moves
+    about 1/N of the feeds to a different shard.
+    """
+
+    def __init__(self, shard_count: int, replicas: int = RING_REPLICAS):
+        self.shard_count = max(1, shard_count)
+        points = []
+        for shard in range(self.shard_count):
+            for replica in range(replicas):
+                points.append((self._hash(f"shard-{shard}-{replica}"), shard))
+        points.sort()
+        self._keys = [key for key, _ in points]
+        self._shards = [shard for _, shard in points]
+
+    @staticmethod
+    def _hash(value: str) -> int:
+        return int.from_bytes(hashlib.md5(value.encode("utf-8")).digest()[:8], "big")
+
+    def shard_for(self, url: str) -> int:
+        """Shard owning a URL: the first ring point clockwise from its hash."""
+        index = bisect.bisect(self._keys, self._hash(url)) % len(self._keys)
+        return self._shards[index]
+
+
+class FeedQueue:
+    """
+    Work queue of feeds with expiring leases, backed by SQLite.
+    Several processes on one machine can claim work from it concurrently. It uses a rollback
+    journal rather than WAL; the file is still meant for local disk, since SQLite locking is
+    not reliable on network filesystems.
+    A feed goes pending -> leased (a worker is scraping it) -> processed (waiting for the
+    parent process to save its brands and state) -> done.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or state_path("feed_queue.db")
+        self._lock = threading.Lock()
+        self._conn = connect(self.path, journal_mode="DELETE")
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS feed_queue (
+                    url TEXT PRIMARY KEY,
+                    shard INTEGER NOT NULL,
+                    status TEXT NOT NULL DEFAULT 'pending',
+                    lease_owner TEXT,
+                    lease_expires REAL,
+                    attempts INTEGER NOT NULL DEFAULT 0,
+                    updated_at REAL
+                )
+            """)
+            self._conn.execute(
+                "CREATE INDEX IF NOT EXISTS idx_feed_queue_claim ON feed_queue (shard, status, lease_expires)"
+            )
+
+    def enqueue(self, urls: Iterable[str], shard_count: int, requeue_after: float = 3600,
+                shards: Optional[Collection[int]] = None) -> int:
+        """
+        Add feeds to the queue, assigning shards by consistent hashing.
+        With shards, only feeds of those shards are kept (the ones this machine works on).
+        Feeds finished more than requeue_after seconds ago become pending again,
+        so a new round can start while a round in progress isn't repeated. Called before
+        the workers start, so feeds still leased or processed were left behind by a run that
+        stopped before saving them; they are pending again too.
+        Returns the number of feeds made pending.
+        """
+        ring = ConsistentHashRing(shard_count)
+        now = time.time()
+        rows = [(url, ring.shard_for(url), now) for url in urls]
+        if shards is not None:
+            rows = [row for row in rows if row[1] in shards]
+        
+        with self._lock, self._conn:
+            before = self._pending_count()
+            self._conn.execute("""
+                UPDATE feed_queue SET status = 'pending', lease_owner = NULL, lease_expires = NULL
+                WHERE status IN ('leased', 'processed')
+            """)
+            self._conn.executemany("""
+                INSERT INTO feed_queue (url, shard, status, updated_at) VALUES (?, ?, 'pending', ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    shard = excluded.shard,
+                    status = CASE
+                        WHEN feed_queue.status = 'done' AND feed_queue.updated_at < excluded.updated_at - ?
+                        THEN 'pending' ELSE feed_queue.status
+                    END
+            """, [row + (requeue_after,) for row in rows])
+            if shards is not None:
+                # Feeds of other shards belong to another machine's queue now
+                placeholders = ",".join("?" * len(shards))
+                self._conn.execute(f"DELETE FROM feed_queue WHERE shard NOT IN ({placeholders})", tuple(shards))
+            return self._pending_count() - before
+
+    def _pending_count(self) -> int:
+        return self._conn.execute("SELECT COUNT(*) FROM feed_queue WHERE status = 'pending'").fetchone()[0]
+
+    def claim(self, worker_id: str, shard: int, limit: int, lease_seconds: float) -> List[str]:
+        """
+        Lease up to limit feeds for a worker.
+        Takes pending feeds of the worker's own shard first, then feeds from any shard
+        whose lease has expired (their worker crashed or stalled), then pending feeds of
+        other shards, so idle workers help out before they stop.
+        """
+        now = time.time()
+        with self._lock:
+            # BEGIN IMMEDIATE takes the write lock up front so two processes can't claim the same rows
+            self._conn.execute("BEGIN IMMEDIATE")
+            try:
+                rows = self._conn.execute(
+                    "SELECT url FROM feed_queue WHERE shard = ? AND status = 'pending' LIMIT ?",
+                    (shard, limit)
+                ).fetchall()
+                if len(rows) < limit:
+                    rows += self._conn.execute(
+                        "SELECT url FROM feed_queue WHERE status = 'leased' AND lease_expires < ? LIMIT ?",
+                        (now, limit - len(rows))
+                    ).fetchall()
+                if len(rows) < limit:
+                    rows += self._conn.execute(
+                        "SELECT url FROM feed_queue WHERE shard != ? AND status = 'pending' LIMIT ?",
+                        (shard, limit - len(rows))
+                    ).fetchall()
+                
+                urls = [row["url"] for row in rows]
+                self._conn.executemany("""
+                    UPDATE feed_queue
+                    SET status = 'leased', lease_owner = ?, lease_expires = ?, attempts = attempts + 1, updated_at = ?
+                    WHERE url = ?
+                """, [(worker_id, now + lease_seconds, now, url) for url in urls])
+                self._conn.execute("COMMIT")
+            except Exception:
+                self._conn.execute("ROLLBACK")
+                raise
+        return urls
+
+    def mark_processed(self, url: str, worker_id: str):
+        """
+        Hand a scraped feed over to the parent process, which completes it once its brands
+        and state are saved (ignored if the lease was taken over meanwhile).
+        """
+        with self._lock, self._conn:
+            self._conn.execute("""
+                UPDATE feed_queue SET status = 'processed', lease_expires = NULL, updated_at = ?
+                WHERE url = ? AND lease_owner = ? AND status = 'leased'
+            """, (time.time(), url, worker_id))
+
+    def complete(self, urls: List[str]):
+        """Mark processed feeds as done, once the parent has saved their brands and state."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                UPDATE feed_queue SET status = 'done', lease_owner = NULL, updated_at = ?
+                WHERE url = ? AND status = 'processed'
+            """, [(now, url) for url in urls])
+
+    def requeue(self, urls: List[str]):
+        """Make processed feeds pending again, e.g. after their brands failed to save."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.executemany("""
+                UPDATE feed_queue SET status = 'pending', lease_owner = NULL, updated_at = ?
+                WHERE url = ? AND status = 'processed'
+            """, [(now, url) for url in urls])
+
+    def release(self, url: str, worker_id: str):
+        """Give a leased feed back to the queue, e.g. after a fetch error."""
+        with self._lock, self._conn:
+            self._conn.execute("""
+                UPDATE feed_queue SET status = 'pending', lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE url = ? AND lease_owner = ? AND status = 'leased'
+            """, (time.time(), url, worker_id))
+
+    def release_owner(self, worker_id: str) -> int:
+        """Give back every feed still leased by a worker that died. Returns the number released."""
+        with self._lock, self._conn:
+            cursor = self._conn.execute("""
+                UPDATE feed_queue SET status = 'pending', lease_owner = NULL, lease_expires = NULL, updated_at = ?
+                WHERE lease_owner = ? AND status = 'leased'
+            """, (time.time(), worker_id))
+        return cursor.rowcount
+
+    def has_unfinished(self) -> bool:
+        """True while any feed is pending or leased, i.e. a worker may still get work."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT 1 FROM feed_queue WHERE status IN ('pending', 'leased') LIMIT 1"
+            ).fetchone()
+        return row is not None
+
+    def counts(self) -> Dict[str, int]:
+        """Number of feeds per status."""
+        with self._lock:
+            rows = self._conn.execute("SELECT status, COUNT(*) AS n FROM feed_queue GROUP BY status").fetchall()
+        return {row["status"]: row["n"] for row in rows}
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
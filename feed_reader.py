@@ -0,0 +1,211 @@
+"""
+SponsorFinder streaming feed reader - parses RSS/Atom incrementally from a byte stream.
+Yields episodes one at a time and stops reading once enough items have been seen,
+so huge back-catalog feeds never have to be downloaded or held in memory in full.
+Malformed documents fall back to feedparser.
+"""
+
+import time
+import hashlib
+import json
+import email.utils
+import xml.etree.ElementTree as ET
+from datetime import datetime, timezone
+from typing import Dict, Iterable, Iterator, List, Optional
+
+try:
+    import feedparser
+    FEEDPARSER_AVAILABLE = True
+except ImportError:
+    FEEDPARSER_AVAILABLE = False
+
+
+ITEM_TAGS = {"item", "entry"}
+
+
+def local_name(tag: str) -> str:
+    """Strip the {namespace} part of an ElementTree tag."""
+    return tag.rsplit("}", 1)[-1] if tag.startswith("{") else tag
+
+
+def element_text(elem: ET.Element) -> str:
+    """
+    Text of an element. Inline XHTML content (Atom type="xhtml") is serialized
+    back to markup with namespaces dropped, so link extraction sees plain <a> tags.
+    """
+    if len(elem) == 0:
+        return (elem.text or "").strip()
+    
+    for descendant in elem.iter():
+        descendant.tag = local_name(descendant.tag)
+    parts = [elem.text or ""]
+    parts.extend(ET.tostring(child, encoding="unicode") for child in elem)
+    return "".join(parts).strip()
+
+
+def parse_date(value: str) -> Optional[time.struct_time]:
+    """Parse an RFC 822 (RSS) or ISO 8601 (Atom) date into a UTC struct_time."""
+    if not value:
+        return None
+    
+    parsed = email.utils.parsedate_tz(value)
+    if parsed:
+        try:
+            return time.gmtime(email.utils.mktime_tz(parsed))
+        except (OverflowError, ValueError):
+            return None
+    
+    try:
+        moment = datetime.fromisoformat(value.replace("Z", "+00:00"))
+    except ValueError:
+        return None
+    if moment.tzinfo is None:
+        moment = moment.replace(tzinfo=timezone.utc)
+    return moment.utctimetuple()
+
+
+def entry_from_element(item: ET.Element) -> Dict:
+    """
+    Build a feedparser-style entry dict (title, description/summary, content,
+    id, link, published_parsed) from an <item> or Atom <entry> element.
+    """
+    entry: Dict = {}
+    content: List[Dict[str, str]] = []
+    
+    for child in item:
+        name = local_name(child.tag)
+        
+        if name == "title":
+            entry.setdefault("title", element_text(child))
+        elif name == "description" and not child.tag.startswith("{"):
+            # RSS <description> wins over any summary seen before it
+            entry["description"] = entry["summary"] = element_text(child)
+        elif name in ("summary", "description") and "description" not in entry:
+            # Atom summary, itunes:summary, media:description
+            entry["description"] = entry["summary"] = element_text(child)
+        elif name in ("encoded", "content"):
+            # content:encoded (RSS) and <content> (Atom)
+            value = element_text(child)
+            if value:
+                content.append({"value": value})
+        elif name in ("guid", "id"):
+            entry.setdefault("id", element_text(child))
+        elif name == "link":
+            href = child.get("href")
+            if href is None:
+                entry.setdefault("link", element_text(child))
+            elif child.get("rel", "alternate") == "alternate":
+                entry.setdefault("link", href)
+        elif name in ("pubDate", "published", "date"):
+            entry.setdefault("published_parsed", parse_date(element_text(child)))
+        elif name == "updated":
+            entry.setdefault("updated_parsed", parse_date(element_text(child)))
+    
+    if content:
+        entry["content"] = content
+    return entry
+
+
+def iter_feed_entries(chunks: Iterable[bytes], max_items: Optional[int] = None,
+                      stop_guid: Optional[str] = None, min_items: int = 0) -> Iterator[Dict]:
+    """
+    Incrementally parse an RSS/Atom byte stream, yielding entries as their closing tag arrives.
+    Stops after max_items entries, or right after the entry whose id is stop_guid once at
+    least min_items entries have been read (or at the first entry after that).
+    Raises xml.etree.ElementTree.ParseError on malformed XML.
+    """
+    passed_stop = False
+    parser = ET.XMLPullParser(events=("start", "end"))
+    stack: List[ET.Element] = []
+    count = 0
+    
+    for chunk in chunks:
+        parser.feed(chunk)
+        for event, elem in parser.read_events():
+            if event == "start":
+                stack.append(elem)
+                continue
+            
+            stack.pop()
+            if local_name(elem.tag) not in ITEM_TAGS:
+                continue
+            
+            entry = entry_from_element(elem)
+            # Drop the parsed item so the tree never grows beyond one episode
+            if stack:
+                stack[-1].remove(elem)
+            
+            yield entry
+            count += 1
+            if max_items and count >= max_items:
+                return
+            passed_stop = passed_stop or bool(stop_guid and entry.get("id") == stop_guid)
+            if passed_stop and count >= min_items:
+                return
+    
+    parser.close()
+
+
+class CountingStream:
+    """Wraps a chunk iterator, keeping the consumed bytes for a possible fallback parse."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self._chunks = iter(chunks)
+        self.consumed: List[bytes] = []
+        self.bytes_read = 0
+
+    def __iter__(self):
+        for chunk in self._chunks:
+            if not chunk:
+                continue
+            self.consumed.append(chunk)
+            self.bytes_read += len(chunk)
+            yield chunk
+
+    def read_rest(self) -> bytes:
+        """Consume the remainder of the stream and return the whole document."""
+        for _ in self:
+            pass
+        return b"".join(self.consumed)
+
+
+def read_feed_entries(chunks: Iterable[bytes], max_items: Optional[int] = None, stop_guid: Optional[str] = None,
+                      response_headers: Optional[Dict[str, str]] = None, min_items: int = 0) -> Dict:
+    """
+    Read up to max_items entries from a feed byte stream (see iter_feed_entries for stop_guid and min_items).
+    Returns {"entries", "bytes_read", "streamed"}; streamed is False when the
+    document was malformed and had to be parsed in full by feedparser.
+    """
+    stream = CountingStream(chunks)
+    
+    try:
+        entries = list(iter_feed_entries(stream, max_items=max_items, stop_guid=stop_guid, min_items=min_items))
+        # Kept only until parsing succeeds; the fallback needs the raw bytes
+        stream.consumed = []
+        return {"entries": entries, "bytes_read": stream.bytes_read, "streamed": True}
+    except ET.ParseError:
+        if not FEEDPARSER_AVAILABLE:
+            raise
+    
+    body = stream.read_rest()
+    feed = feedparser.parse(body, response_headers=response_headers or {})
+    entries = feed.entries[:max_items] if max_items else feed.entries
+    return {"entries": entries, "bytes_read": len(body), "streamed": False}
+
+
+def hash_entries(entries: List[Dict], window: int) -> str:
+    """
+    Stable hash of a feed's newest `window` episodes (GUIDs and publish dates).
+    Used instead of a body hash because streaming stops at a network-dependent offset; the
+    caller must read at least `window` entries whatever else ends the read. The window size
+    is part of the result, so hashes taken over different windows never compare equal.
+    """
+    digest = hashlib.sha256()
+    for entry in entries[:window]:
+        published = entry.get("published_parsed") or entry.get("updated_parsed")
+        record = [
+            entry.get("id") or entry.get("link") or "",
+            list(published)[:6] if published else None,
+        ]
+        digest.update(json.dumps(record, ensure_ascii=False).encode("utf-8"))
+    return f"{window}:{digest.hexdigest()}"
@@ -0,0 +1,112 @@
+"""
+SponsorFinder feed state - remembers what each RSS feed looked like on the last run.
+Stores ETag, Last-Modified and a content hash per feed so unchanged feeds can be skipped,
+plus an episode watermark (last processed GUID and publish date) for incremental scraping,
+and the publish date of the oldest processed episode: together they bound the episodes
+whose sponsor mentions have already been counted.
+"""
+
+import time
+import threading
+from pathlib import Path
+from typing import Optional
+
+from local_state import connect, state_path
+
+
+class FeedStateStore:
+    """
+    Persistent per-feed HTTP validators backed by SQLite.
+    Safe to read from fetch threads while the main thread writes.
+    """
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = path or state_path("feeds.db")
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS feed_state (
+                    url TEXT PRIMARY KEY,
+                    etag TEXT,
+                    last_modified TEXT,
+                    content_hash TEXT,
+                    checked_at REAL,
+                    changed_at REAL,
+                    last_guid TEXT,
+                    last_published REAL,
+                    first_published REAL
+                )
+            """)
+            # Upgrade state files created before watermarks existed
+            columns = {row["name"] for row in self._conn.execute("PRAGMA table_info(feed_state)")}
+            if "last_guid" not in columns:
+                self._conn.execute("ALTER TABLE feed_state ADD COLUMN last_guid TEXT")
+            if "last_published" not in columns:
+                self._conn.execute("ALTER TABLE feed_state ADD COLUMN last_published REAL")
+            if "first_published" not in columns:
+                self._conn.execute("ALTER TABLE feed_state ADD COLUMN first_published REAL")
+
+    def get(self, url: str) -> Optional[dict]:
+        """Return stored state for a feed, or None if it was never scraped."""
+        with self._lock:
+            row = self._conn.execute("SELECT * FROM feed_state WHERE url = ?", (url,)).fetchone()
+        return dict(row) if row else None
+
+    def save(self, url: str, etag: Optional[str], last_modified: Optional[str], content_hash: Optional[str]):
+        """Record the validators of a successfully processed feed."""
+        now = time.time()
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO feed_state (url, etag, last_modified, content_hash, checked_at, changed_at)
+                VALUES (?, ?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    changed_at = CASE
+                        WHEN feed_state.content_hash IS excluded.content_hash THEN feed_state.changed_at
+                        ELSE excluded.changed_at
+                    END,
+                    content_hash = excluded.content_hash,
+                    checked_at = excluded.checked_at
+            """, (url, etag, last_modified, content_hash, now, now))
+
+    def save_watermark(self, url: str, guid: Optional[str], published: Optional[float],
+                       first_published: Optional[float] = None):
+        """
+        Advance a feed's episode watermark and extend first_published back to the oldest
+        processed episode. Never moves the watermark backwards, so backfills of older
+        episodes keep the newest one. first_published is only started for a feed without a
+        watermark: state from before it existed keeps treating everything up to the
+        watermark as counted.
+        """
+        if not guid and published is None:
+            return
+        with self._lock, self._conn:
+            row = self._conn.execute(
+                "SELECT last_guid, last_published, first_published FROM feed_state WHERE url = ?", (url,)
+            ).fetchone()
+            if row is None:
+                self._conn.execute(
+                    "INSERT INTO feed_state (url, last_guid, last_published, first_published, checked_at) "
+                    "VALUES (?, ?, ?, ?, ?)",
+                    (url, guid, published, first_published, time.time())
+                )
+                return
+            
+            oldest = row["first_published"]
+            if not row["last_guid"] and row["last_published"] is None:
+                oldest = first_published
+            elif oldest is not None and first_published is not None:
+                oldest = min(oldest, first_published)
+            
+            if row["last_published"] is not None and published is not None and published < row["last_published"]:
+                guid, published = row["last_guid"], row["last_published"]
+            self._conn.execute(
+                "UPDATE feed_state SET last_guid = ?, last_published = ?, first_published = ? WHERE url = ?",
+                (guid, published if published is not None else row["last_published"], oldest, url)
+            )
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
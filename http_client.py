@@ -0,0 +1,189 @@
+"""
+SponsorFinder HTTP client - one pooled, retrying client for the enricher's requests.
+All threads share one connection pool (keep-alive, so repeat requests to a host skip the
+TCP and TLS handshakes); 429 and 5xx responses and connection errors are retried with
+jittered exponential backoff, honouring Retry-After.
+"""
+
+import os
+import time
+import codecs
+import random
+import threading
+from email.utils import parsedate_to_datetime
+from typing import Callable, Optional, Tuple
+
+try:
+    import requests
+    from requests.adapters import HTTPAdapter
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+try:
+    # gzip/deflate, plus br and zstd when their decoders are installed
+    from urllib3.util.request import ACCEPT_ENCODING
+except ImportError:
+    ACCEPT_ENCODING = "gzip, deflate"
+
+try:
+    from urllib3.exceptions import NameResolutionError
+except ImportError:
+    NameResolutionError = None
+
+from metrics import Metrics
+
+
+HTTP_POOL_HOSTS = int(os.getenv("HTTP_POOL_HOSTS", "128"))  # hosts with open connections kept
+HTTP_POOL_PER_HOST = int(os.getenv("HTTP_POOL_PER_HOST", "16"))  # keep-alive connections per host
+HTTP_MAX_RETRIES = int(os.getenv("HTTP_MAX_RETRIES", "3"))  # retries after the first attempt
+HTTP_BACKOFF_BASE = float(os.getenv("HTTP_BACKOFF_BASE", "0.5"))  # seconds; doubles with every retry
+HTTP_BACKOFF_MAX = float(os.getenv("HTTP_BACKOFF_MAX", "30"))  # longest wait, also caps Retry-After
+
+HTTP_CHUNK_SIZE = 64 * 1024  # bytes per read when streaming a body
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+def retry_after_seconds(value: Optional[str]) -> Optional[float]:
+    """Parse a Retry-After header (seconds or an HTTP date). Returns None if absent or invalid."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        return max(0.0, parsedate_to_datetime(value).timestamp() - time.time())
+    except (TypeError, ValueError, OverflowError):
+        return None
+
+
+def is_retryable_error(error: Exception) -> bool:
+    """Timeouts and dropped connections are worth retrying; unknown hosts and bad URLs are not."""
+    if isinstance(error, requests.Timeout):
+        return True
+    if not isinstance(error, requests.ConnectionError):
+        return False
+    reason = getattr(error.args[0], "reason", None) if error.args else None
+    return not (NameResolutionError is not None and isinstance(reason, NameResolutionError))
+
+
+def read_text(response: "requests.Response", max_bytes: int, chunk_size: int = HTTP_CHUNK_SIZE) -> Tuple[str, int, bool]:
+    """
+    Read the body of a streamed (stream=True) response as text, decoding chunk by chunk,
+    and stop after max_bytes of (decompressed) body, so a huge body is never held in memory.
+    Returns (text, bytes read, whether the body was cut off).
+    """
+    try:
+        decoder = codecs.getincrementaldecoder(response.encoding or "utf-8")(errors="replace")
+    except LookupError:
+        decoder = codecs.getincrementaldecoder("utf-8")(errors="replace")
+    
+    parts = []
+    read = 0
+    truncated = False
+    for chunk in response.iter_content(chunk_size):
+        if read + len(chunk) > max_bytes:
+            chunk = chunk[:max_bytes - read]
+            truncated = True
+        read += len(chunk)
+        parts.append(decoder.decode(chunk))
+        if truncated:
+            break
+    parts.append(decoder.decode(b"", final=True))
+    return "".join(parts), read, truncated
+
+
+def wire_bytes_read(response: "requests.Response") -> Optional[int]:
+    """Bytes of the body read from the connection so far (compressed size), if known."""
+    try:
+        return int(response.raw.tell())
+    except (AttributeError, TypeError, ValueError):
+        return None
+
+
+class HttpClient:
+    """
+    GET requests over a shared connection pool, with retries.
+    Each thread gets its own Session (cookies aren't shared between threads), all mounted
+    on the same adapter, so connections are reused across threads.
+    """
+
+    def __init__(self, user_agent: Optional[str] = None, max_retries: int = HTTP_MAX_RETRIES,
+                 backoff_base: float = HTTP_BACKOFF_BASE, backoff_max: float = HTTP_BACKOFF_MAX,
+                 pool_hosts: int = HTTP_POOL_HOSTS, pool_per_host: int = HTTP_POOL_PER_HOST,
+                 metrics: Optional[Metrics] = None):
+        self.user_agent = user_agent
+        self.max_retries = max(0, max_retries)
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.metrics = metrics
+        # Retries are done here (with Retry-After and metrics), not by urllib3
+        self.adapter = HTTPAdapter(pool_connections=pool_hosts, pool_maxsize=pool_per_host, max_retries=0)
+        self._local = threading.local()
+
+    @property
+    def session(self) -> "requests.Session":
+        session = getattr(self._local, "session", None)
+        if session is None:
+            session = requests.Session()
+            session.mount("http://", self.adapter)
+            session.mount("https://", self.adapter)
+            session.headers["Accept-Encoding"] = ACCEPT_ENCODING
+            if self.user_agent:
+                session.headers["User-Agent"] = self.user_agent
+            self._local.session = session
+        return session
+
+    def backoff(self, attempt: int, response: Optional["requests.Response"] = None) -> float:
+        """Seconds to wait before retry number attempt (1-based): Retry-After if given, else full jitter."""
+        if response is not None:
+            retry_after = retry_after_seconds(response.headers.get("Retry-After"))
+            if retry_after is not None:
+                return min(retry_after, self.backoff_max)
+        return random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+
+    def get(self, url: str, target: str = "http", throttle: Optional[Callable[[str], None]] = None,
+            **kwargs) -> "requests.Response":
+        """
+        GET url, retrying dropped connections, timeouts, 429 and 5xx.
+        Returns the last response (which may still be a 429/5xx once retries run out) and
+        raises the last RequestException if no response arrived. target labels the metrics;
+        throttle(url) is called before every attempt (e.g. a per-host scheduler).
+        """
+        attempt = 0
+        while True:
+            if throttle is not None:
+                throttle(url)
+            start = time.perf_counter()
+            try:
+                response = self.session.get(url, **kwargs)
+            except requests.RequestException as e:
+                self._record(target, None, time.perf_counter() - start)
+                if attempt >= self.max_retries or not is_retryable_error(e):
+                    raise
+                attempt += 1
+                self._wait(target, self.backoff(attempt))
+                continue
+            
+            self._record(target, response.status_code, time.perf_counter() - start)
+            if response.status_code not in RETRY_STATUSES or attempt >= self.max_retries:
+                return response
+            
+            attempt += 1
+            delay = self.backoff(attempt, response)
+            response.close()
+            self._wait(target, delay)
+
+    def _record(self, target: str, status_code: Optional[int], seconds: float):
+        if self.metrics is not None:
+            self.metrics.http_response(target, status_code)
+            self.metrics.observe(f"{target}_request", seconds)
+
+    def _wait(self, target: str, seconds: float):
+        if self.metrics is not None:
+            self.metrics.inc("http_retries", target=target)
+        time.sleep(seconds)
+
+    def close(self):
+        self.adapter.close()
@@ -0,0 +1,179 @@
+"""
+SponsorFinder Hunter.io helpers - cached, rate-limited domain searches.
+Every domain-search response is kept in SQLite for a while, so re-running the enricher
+(or a brand sharing a domain with another) doesn't spend Hunter credits again. The raw
+response is stored and role filtering is applied on read, so changing the target roles
+takes effect without new requests. HunterQuota keeps searches under Hunter's rate limit
+and within the search credits left on the account.
+"""
+
+import os
+import json
+import time
+import threading
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional
+
+from local_state import connect, state_path
+from metrics import Metrics
+
+
+HUNTER_API_URL = os.getenv("HUNTER_API_URL", "https://api.hunter.io/v2/domain-search")
+HUNTER_ACCOUNT_URL = os.getenv("HUNTER_ACCOUNT_URL", "https://api.hunter.io/v2/account")  # credits left (free to call)
+HUNTER_RATE_LIMIT = float(os.getenv("HUNTER_RATE_LIMIT", "10"))  # domain searches per second (Hunter allows 15)
+HUNTER_CREDIT_LIMIT = os.getenv("HUNTER_CREDIT_LIMIT")  # most searches one run may spend (default: what the account has left)
+HUNTER_CACHE_TTL = float(os.getenv("HUNTER_CACHE_TTL", str(30 * 86400)))  # responses are reused for 30 days
+HUNTER_CACHE_NEGATIVE_TTL = float(os.getenv("HUNTER_CACHE_NEGATIVE_TTL", str(7 * 86400)))  # domains without emails are asked again after a week
+
+
+def hunter_emails(data: dict) -> List[dict]:
+    """The email entries of a domain-search response."""
+    return (data.get("data") or {}).get("emails") or []
+
+
+class HunterBudgetExhausted(Exception):
+    """No Hunter.io search credits are left for this run."""
+
+
+def account_search_credits(data: dict) -> Optional[int]:
+    """Domain searches left this period, from an /account response (None if it doesn't say)."""
+    searches = ((data.get("data") or {}).get("requests") or {}).get("searches") or {}
+    if searches.get("available") is None:
+        return None
+    return max(0, int(searches["available"]) - int(searches.get("used") or 0))
+
+
+def filter_hunter_contacts(data: dict, target_roles: Iterable[str]) -> List[Dict[str, Optional[str]]]:
+    """
+    Contacts from a domain-search response whose position matches one of target_roles.
+    Returns a list of dicts with name (None if unknown), role and email.
+    """
+    target_roles = [role.lower() for role in target_roles]
+    contacts = []
+    for email_data in hunter_emails(data):
+        position = email_data.get("position") or ""
+        if not any(target_role in position.lower() for target_role in target_roles):
+            continue
+        
+        email = email_data.get("value") or ""
+        if not email:
+            continue
+        
+        name = f"{email_data.get('first_name') or ''} {email_data.get('last_name') or ''}".strip()
+        contacts.append({"name": name or None, "role": position, "email": email})
+    return contacts
+
+
+class HunterCache:
+    """
+    Persistent domain -> domain-search response cache backed by SQLite.
+    Responses without any emails are stored too and expire sooner.
+    """
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = HUNTER_CACHE_TTL,
+                 negative_ttl: float = HUNTER_CACHE_NEGATIVE_TTL):
+        self.path = path or state_path("hunter.db")
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS domain_searches (
+                    domain TEXT PRIMARY KEY,
+                    response TEXT NOT NULL,
+                    emails INTEGER NOT NULL,
+                    fetched_at REAL NOT NULL
+                )
+            """)
+
+    def get(self, domain: str) -> Optional[dict]:
+        """The cached response for domain, or None if there is none or it has expired."""
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT response, emails, fetched_at FROM domain_searches WHERE domain = ?", (domain.lower(),)
+            ).fetchone()
+        if row is None:
+            return None
+        
+        ttl = self.ttl if row["emails"] else self.negative_ttl
+        if time.time() - row["fetched_at"] > ttl:
+            return None
+        try:
+            return json.loads(row["response"])
+        except ValueError:
+            return None
+
+    def save(self, domain: str, data: dict):
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO domain_searches (domain, response, emails, fetched_at) VALUES (?, ?, ?, ?)
+                ON CONFLICT(domain) DO UPDATE SET
+                    response = excluded.response,
+                    emails = excluded.emails,
+                    fetched_at = excluded.fetched_at
+            """, (domain.lower(), json.dumps(data, separators=(",", ":")), len(hunter_emails(data)), time.time()))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class HunterQuota:
+    """
+    Rate and credit budget for Hunter.io domain searches, shared by all worker threads.
+    A token bucket keeps searches under rate per second (bursts up to burst); credits is
+    the number of searches this run may still spend (None while unknown, i.e. unlimited).
+    """
+
+    def __init__(self, rate: float = HUNTER_RATE_LIMIT, burst: Optional[float] = None,
+                 credits: Optional[int] = None, metrics: Optional[Metrics] = None):
+        self.rate = rate
+        self.burst = max(1.0, burst if burst is not None else rate)
+        self.credits = credits
+        self.metrics = metrics
+        self._tokens = self.burst
+        self._updated = time.monotonic()
+        self._lock = threading.Lock()
+
+    def wait(self, url: str = ""):
+        """Block until a search may be sent (usable as an HttpClient throttle)."""
+        if self.rate <= 0:
+            return
+        with self._lock:
+            now = time.monotonic()
+            self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+            self._updated = now
+            # Going negative reserves the next token; the caller sleeps until it has refilled
+            self._tokens -= 1
+            delay = -self._tokens / self.rate if self._tokens < 0 else 0.0
+        
+        if delay > 0:
+            if self.metrics is not None:
+                self.metrics.observe("hunter_wait", delay)
+            time.sleep(delay)
+
+    def set_credits(self, credits: Optional[int]):
+        with self._lock:
+            self.credits = credits
+
+    def reserve(self) -> bool:
+        """Take one search credit. Returns False when none are left."""
+        with self._lock:
+            if self.credits is None:
+                return True
+            if self.credits <= 0:
+                return False
+            self.credits -= 1
+            return True
+
+    def refund(self):
+        """Give back a reserved credit whose search wasn't charged (error response or no response)."""
+        with self._lock:
+            if self.credits is not None:
+                self.credits += 1
+
+    def exhaust(self):
+        """Stop searching for the rest of the run (Hunter reported the limit reached)."""
+        with self._lock:
+            self.credits = 0
@@ -0,0 +1,325 @@
+"""
+SponsorFinder link extraction - pulls <a href> values out of show-notes HTML.
+Uses the stdlib HTMLParser event stream (no DOM) and keeps the BeautifulSoup
+implementation as a fallback and as the reference for compatibility checks.
+
+Episodes of a show repeat the same sponsor reads and footers, so show notes can be
+split into paragraph blocks whose links are cached by content hash (LinkParseCache).
+"""
+
+import os
+import re
+import json
+import time
+import hashlib
+import threading
+from collections import OrderedDict
+from html import unescape
+from html.parser import HTMLParser
+from pathlib import Path
+from typing import FrozenSet, List, Optional, Set, Tuple
+
+try:
+    from bs4 import BeautifulSoup
+    BEAUTIFULSOUP_AVAILABLE = True
+except ImportError:
+    BEAUTIFULSOUP_AVAILABLE = False
+
+from local_state import connect
+from metrics import Metrics
+
+
+# Compare every extraction against BeautifulSoup and report differences (slow, for verification)
+LINK_EXTRACTOR_COMPAT = os.getenv("LINK_EXTRACTOR_COMPAT", "").lower() in ("1", "true", "yes")
+
+HREF_PATTERN = re.compile(r'href', re.IGNORECASE)
+
+# Parse cache settings
+LINK_PARSE_CACHE_SIZE = int(os.getenv("LINK_PARSE_CACHE_SIZE", "4096"))  # blocks kept in memory (0 disables the cache)
+LINK_PARSE_CACHE_DISK = os.getenv("LINK_PARSE_CACHE_DISK", "0") != "0"  # also keep parsed blocks between runs
+LINK_PARSE_CACHE_VERSION = "1"  # part of every key; bump when extraction rules change
+LINK_PARSE_CACHE_WRITE_BATCH = 256  # new blocks buffered before a disk write
+
+# Show notes are split after these end tags. The split never cuts a start tag, so every
+# href stays in one block; markup that can hide tags (comments, scripts) is not split.
+BLOCK_END_PATTERN = re.compile(r'</(?:p|li|div|ul|ol|h[1-6])\s*>', re.IGNORECASE)
+UNSPLITTABLE_PATTERN = re.compile(r'<!--|<!\[CDATA\[|<script|<style|<textarea', re.IGNORECASE)
+
+
+class AnchorHrefParser(HTMLParser):
+    """
+    Collects href values of <a> tags from the parser's event stream.
+    Attribute values arrive with entities already unescaped.
+    """
+
+    def __init__(self):
+        super().__init__(convert_charrefs=True)
+        self.hrefs: List[str] = []
+
+    def handle_starttag(self, tag, attrs):
+        if tag != 'a':
+            return
+        
+        href = None
+        for name, value in attrs:
+            # Last duplicate attribute wins, as in BeautifulSoup
+            if name == 'href':
+                href = value
+        
+        if href is not None:
+            self.hrefs.append(href)
+
+
+def clean_href(href: str) -> str:
+    """
+    Normalize an already-unescaped href value.
+    Unescapes once more so double-encoded feeds (&amp;amp;) yield usable URLs.
+    """
+    href = href.strip()
+    if not href:
+        return ""
+    return unescape(href)
+
+
+def extract_links_fast(html_content: str) -> Set[str]:
+    """
+    Extract all <a href> links without building a document tree.
+    Returns a set of unique URLs.
+    """
+    if not html_content:
+        return set()
+    
+    # Cheap pre-check: most descriptions without links can be skipped outright
+    if not HREF_PATTERN.search(html_content):
+        return set()
+    
+    parser = AnchorHrefParser()
+    parser.feed(html_content)
+    parser.close()
+    
+    links = set()
+    for href in parser.hrefs:
+        href = clean_href(href)
+        if href:
+            links.add(href)
+    return links
+
+
+def extract_links_bs4(html_content: str) -> Set[str]:
+    """
+    Extract all <a href> links using BeautifulSoup.
+    Reference implementation; returns a set of unique URLs.
+    """
+    if not html_content:
+        return set()
+    
+    soup = BeautifulSoup(html_content, 'html.parser')
+    links = set()
+    
+    for anchor in soup.find_all('a', href=True):
+        href = clean_href(anchor.get('href', ''))
+        if href:
+            links.add(href)
+    
+    return links
+
+
+def report_mismatch(html_content: str, fast_links: Set[str], reference_links: Set[str]):
+    """Print how the fast extractor's output differs from BeautifulSoup's."""
+    print("      ⚠ Link extractor mismatch against BeautifulSoup:")
+    for link in sorted(reference_links - fast_links):
+        print(f"        - missing: {link}")
+    for link in sorted(fast_links - reference_links):
+        print(f"        + extra:   {link}")
+    print(f"        (HTML starts with: {html_content[:80]!r})")
+
+
+def split_blocks(html_content: str) -> List[str]:
+    """
+    Split show notes into paragraph-level blocks (after closing p/li/div/list/heading tags).
+    Returns the whole document as one block when it contains comments or raw-text elements.
+    """
+    if UNSPLITTABLE_PATTERN.search(html_content):
+        return [html_content]
+    
+    blocks = []
+    start = 0
+    for match in BLOCK_END_PATTERN.finditer(html_content):
+        blocks.append(html_content[start:match.end()])
+        start = match.end()
+    if start < len(html_content):
+        blocks.append(html_content[start:])
+    return blocks
+
+
+def block_key(block: str) -> str:
+    """Content hash of a block (whitespace around it ignored)."""
+    digest = hashlib.blake2b(digest_size=16)
+    digest.update(LINK_PARSE_CACHE_VERSION.encode())
+    digest.update(block.strip().encode("utf-8", "surrogatepass"))
+    return digest.hexdigest()
+
+
+class LinkParseCache:
+    """
+    Bounded LRU of extracted links per show-notes block, keyed by content hash.
+    With a path, blocks are also kept in SQLite so later runs start warm.
+    Each entry remembers how long parsing took, so hits add up to the parsing time saved.
+    """
+
+    def __init__(self, max_entries: int = LINK_PARSE_CACHE_SIZE, path: Optional[Path] = None,
+                 metrics: Optional[Metrics] = None):
+        self.max_entries = max(1, max_entries)
+        self.path = path
+        self.metrics = metrics
+        self._entries: "OrderedDict[str, Tuple[FrozenSet[str], float]]" = OrderedDict()
+        self._pending: List[Tuple[str, str, float]] = []
+        self._lock = threading.Lock()
+        self._conn = None
+        self.hits = 0
+        self.disk_hits = 0
+        self.misses = 0
+        self.seconds_saved = 0.0
+        
+        if path is not None:
+            self._conn = connect(path)
+            with self._conn:
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS parsed_blocks (
+                        key TEXT PRIMARY KEY,
+                        links TEXT NOT NULL,
+                        parse_seconds REAL NOT NULL,
+                        created_at REAL NOT NULL
+                    )
+                """)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def get(self, key: str) -> Optional[FrozenSet[str]]:
+        """Links of a cached block, or None on a miss."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                result = "hit"
+            elif self._conn is not None:
+                row = self._conn.execute("SELECT links, parse_seconds FROM parsed_blocks WHERE key = ?", (key,)).fetchone()
+                if row is not None:
+                    entry = (frozenset(json.loads(row["links"])), row["parse_seconds"])
+                    self._remember(key, entry)
+                result = "disk_hit" if entry is not None else "miss"
+            else:
+                result = "miss"
+            
+            if entry is None:
+                self.misses += 1
+            else:
+                self.hits += 1
+                self.disk_hits += result == "disk_hit"
+                self.seconds_saved += entry[1]
+        
+        if self.metrics is not None:
+            self.metrics.inc("link_parse_cache", result=result)
+            if entry is not None:
+                self.metrics.inc("link_parse_seconds_saved", entry[1])
+        return entry[0] if entry is not None else None
+
+    def put(self, key: str, links: Set[str], parse_seconds: float):
+        with self._lock:
+            self._remember(key, (frozenset(links), parse_seconds))
+            if self._conn is not None:
+                self._pending.append((key, json.dumps(sorted(links)), parse_seconds))
+                if len(self._pending) >= LINK_PARSE_CACHE_WRITE_BATCH:
+                    self._write_pending()
+
+    def _remember(self, key: str, entry: Tuple[FrozenSet[str], float]):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _write_pending(self):
+        if not self._pending:
+            return
+        now = time.time()
+        with self._conn:
+            self._conn.executemany(
+                "INSERT OR IGNORE INTO parsed_blocks (key, links, parse_seconds, created_at) VALUES (?, ?, ?, ?)",
+                [(key, links, seconds, now) for key, links, seconds in self._pending]
+            )
+        self._pending = []
+
+    def flush(self):
+        """Write buffered blocks to disk."""
+        with self._lock:
+            if self._conn is not None:
+                self._write_pending()
+
+    def close(self):
+        self.flush()
+        with self._lock:
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
+
+
+def extract_links_safe(html_content: str) -> Set[str]:
+    """DOM-free extraction, falling back to BeautifulSoup if the parser fails."""
+    try:
+        return extract_links_fast(html_content)
+    except Exception as e:
+        if not BEAUTIFULSOUP_AVAILABLE:
+            print(f"      Error parsing HTML: {e}")
+            return set()
+        try:
+            return extract_links_bs4(html_content)
+        except Exception as e:
+            print(f"      Error parsing HTML: {e}")
+            return set()
+
+
+def extract_links_cached(html_content: str, cache: LinkParseCache) -> Set[str]:
+    """Extract links block by block, parsing only blocks the cache hasn't seen."""
+    links = set()
+    for block in split_blocks(html_content):
+        # Blocks without links are cheaper to skip than to hash
+        if not HREF_PATTERN.search(block):
+            continue
+        
+        key = block_key(block)
+        block_links = cache.get(key)
+        if block_links is None:
+            start = time.perf_counter()
+            block_links = extract_links_safe(block)
+            cache.put(key, block_links, time.perf_counter() - start)
+        links.update(block_links)
+    return links
+
+
+def extract_all_links(html_content: str, compat: bool = LINK_EXTRACTOR_COMPAT,
+                      cache: Optional[LinkParseCache] = None) -> Set[str]:
+    """
+    Extract all <a href> links from HTML content.
+    Uses the DOM-free parser and falls back to BeautifulSoup if it fails.
+    With a cache, repeated blocks (sponsor reads, footers) are parsed only once.
+    With compat=True the result is checked against BeautifulSoup and differences are printed.
+    Returns a set of unique URLs.
+    """
+    if not html_content:
+        return set()
+    
+    if cache is not None:
+        links = extract_links_cached(html_content, cache)
+    else:
+        links = extract_links_safe(html_content)
+    
+    if compat and BEAUTIFULSOUP_AVAILABLE:
+        try:
+            reference_links = extract_links_bs4(html_content)
+        except Exception:
+            reference_links = links
+        if reference_links != links:
+            report_mismatch(html_content, links, reference_links)
+    
+    return links
@@ -0,0 +1,223 @@
+"""
+SponsorFinder link resolver - follows tracking and short links to the sponsor's real URL.
+Show notes wrap many sponsor links in redirectors (bit.ly, podtrac, chtbl, affiliate networks).
+Links on a redirector host are followed hop by hop with HEAD requests on a bounded thread pool,
+and every result (including failures) is cached in SQLite, so each link is resolved once across runs.
+"""
+
+import os
+import time
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from pathlib import Path
+from typing import Dict, Iterable, Optional, Tuple
+from urllib.parse import urljoin, urldefrag
+
+try:
+    import requests
+    REQUESTS_AVAILABLE = True
+except ImportError:
+    REQUESTS_AVAILABLE = False
+
+from domain_rules import DomainRuleSet
+from domains import extract_host
+from local_state import connect, state_path
+from metrics import Metrics
+
+
+# Hosts whose links are redirects to be followed (same rule syntax as the trash filter)
+REDIRECT_RULES_PATH = Path(
+    os.getenv("REDIRECT_RULES_PATH") or Path(__file__).parent / "data" / "redirect_domains.txt"
+)
+
+LINK_RESOLVE_WORKERS = int(os.getenv("LINK_RESOLVE_WORKERS", "8"))  # links resolved in parallel
+LINK_RESOLVE_MAX_HOPS = int(os.getenv("LINK_RESOLVE_MAX_HOPS", "5"))  # redirects followed per link
+LINK_RESOLVE_TIMEOUT = 10  # seconds per request
+LINK_CACHE_TTL = float(os.getenv("LINK_CACHE_TTL", str(30 * 86400)))  # resolved links are trusted for 30 days
+LINK_CACHE_NEGATIVE_TTL = float(os.getenv("LINK_CACHE_NEGATIVE_TTL", "86400"))  # failures are retried after a day
+LINK_USER_AGENT = "SponsorFinder/1.0 (link resolver)"
+
+REDIRECT_STATUSES = {301, 302, 303, 307, 308}
+# Some redirectors reject HEAD; retry those with a GET whose body is never read
+HEAD_UNSUPPORTED_STATUSES = {400, 403, 405, 501}
+
+
+class ResolvedLinkCache:
+    """
+    Persistent URL -> final URL cache backed by SQLite.
+    Failed resolutions are stored too (final_url NULL) and expire sooner.
+    """
+
+    def __init__(self, path: Optional[Path] = None, ttl: float = LINK_CACHE_TTL,
+                 negative_ttl: float = LINK_CACHE_NEGATIVE_TTL):
+        self.path = path or state_path("links.db")
+        self.ttl = ttl
+        self.negative_ttl = negative_ttl
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        with self._conn:
+            self._conn.execute("""
+                CREATE TABLE IF NOT EXISTS resolved_links (
+                    url TEXT PRIMARY KEY,
+                    final_url TEXT,
+                    final_host TEXT,
+                    hops INTEGER,
+                    resolved_at REAL NOT NULL
+                )
+            """)
+
+    def get(self, url: str) -> Tuple[bool, Optional[str]]:
+        """
+        Look up a link.
+        Returns (found, final_url); final_url is None for a cached failure.
+        """
+        with self._lock:
+            row = self._conn.execute(
+                "SELECT final_url, resolved_at FROM resolved_links WHERE url = ?", (url,)
+            ).fetchone()
+        if row is None:
+            return (False, None)
+        
+        ttl = self.ttl if row["final_url"] else self.negative_ttl
+        if time.time() - row["resolved_at"] > ttl:
+            return (False, None)
+        return (True, row["final_url"])
+
+    def save(self, url: str, final_url: Optional[str], hops: int):
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO resolved_links (url, final_url, final_host, hops, resolved_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    final_url = excluded.final_url,
+                    final_host = excluded.final_host,
+                    hops = excluded.hops,
+                    resolved_at = excluded.resolved_at
+            """, (url, final_url, extract_host(final_url) if final_url else None, hops, time.time()))
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class LinkResolver:
+    """
+    Resolves redirector links to their final URL.
+    Links on other hosts are returned unchanged without any request.
+    """
+
+    def __init__(self, redirect_rules: DomainRuleSet, cache: Optional[ResolvedLinkCache] = None,
+                 max_workers: int = LINK_RESOLVE_WORKERS, max_hops: int = LINK_RESOLVE_MAX_HOPS,
+                 timeout: float = LINK_RESOLVE_TIMEOUT, metrics: Optional[Metrics] = None):
+        self.redirect_rules = redirect_rules
+        self.metrics = metrics
+        self.cache = cache or ResolvedLinkCache()
+        self.max_workers = max(1, max_workers)
+        self.max_hops = max(1, max_hops)
+        self.timeout = timeout
+        self.session = requests.Session()
+        self.session.headers["User-Agent"] = LINK_USER_AGENT
+        self.cache_hits = 0
+        self.resolved = 0
+        self.failed = 0
+
+    def is_redirector(self, url: str) -> bool:
+        """True if the link's host is a known redirector."""
+        host = extract_host(url)
+        return bool(host) and self.redirect_rules.find(host) is not None
+
+    def follow(self, url: str) -> Tuple[Optional[str], int]:
+        """
+        Follow redirects from url with HEAD requests.
+        Returns (final URL, hops), or (None, hops) if a request failed or the hop limit was hit.
+        """
+        for hops in range(self.max_hops + 1):
+            response = self.session.head(url, allow_redirects=False, timeout=self.timeout)
+            self._count_response(response.status_code)
+            if response.status_code in HEAD_UNSUPPORTED_STATUSES:
+                with self.session.get(url, allow_redirects=False, timeout=self.timeout, stream=True) as response:
+                    self._count_response(response.status_code)
+            
+            location = response.headers.get("Location")
+            if response.status_code not in REDIRECT_STATUSES or not location:
+                return (url, hops) if response.status_code < 400 else (None, hops)
+            
+            url = urljoin(url, location)
+            # Stop as soon as the chain leaves redirector hosts: that's the sponsor
+            if not self.is_redirector(url):
+                return (url, hops + 1)
+        
+        return (None, self.max_hops)
+
+    def _count_response(self, status_code: Optional[int]):
+        if self.metrics is not None:
+            self.metrics.http_response("redirect", status_code)
+
+    def _count_link(self, result: str):
+        if self.metrics is not None:
+            self.metrics.inc("links_resolved", result=result)
+
+    def _resolve(self, url: str) -> Optional[str]:
+        try:
+            final_url, hops = self.follow(url)
+        except requests.RequestException:
+            self._count_response(None)
+            final_url, hops = None, 0
+        except Exception:
+            final_url, hops = None, 0
+        
+        self.cache.save(url, final_url, hops)
+        return final_url
+
+    def resolve_many(self, urls: Iterable[str]) -> Dict[str, Optional[str]]:
+        """
+        Resolve links concurrently.
+        Returns {url: final URL}; non-redirector links map to themselves, failures to None.
+        """
+        results: Dict[str, Optional[str]] = {}
+        by_key: Dict[str, Optional[str]] = {}
+        pending_keys = []
+        
+        for url in urls:
+            if url in results:
+                continue
+            if not self.is_redirector(url):
+                results[url] = url
+                continue
+            
+            # Fragments never reach the server, so links differing only by one share a lookup
+            key = urldefrag(url)[0]
+            results[url] = None
+            if key in by_key:
+                continue
+            
+            found, final_url = self.cache.get(key)
+            by_key[key] = final_url
+            if found:
+                self.cache_hits += 1
+                self._count_link("cached")
+            else:
+                pending_keys.append(key)
+        
+        if pending_keys:
+            with ThreadPoolExecutor(max_workers=min(self.max_workers, len(pending_keys))) as executor:
+                for key, final_url in zip(pending_keys, executor.map(self._resolve, pending_keys)):
+                    by_key[key] = final_url
+                    if final_url:
+                        self.resolved += 1
+                    else:
+                        self.failed += 1
+                    self._count_link("resolved" if final_url else "failed")
+        
+        for url, final_url in results.items():
+            if final_url is None:
+                results[url] = by_key.get(urldefrag(url)[0])
+        
+        return results
+
+    def report(self):
+        """Print resolution counts for this run."""
+        print(f"🔗 Link resolver: {self.resolved} resolved, {self.failed} failed, {self.cache_hits} from cache")
+
+    def close(self):
+        self.session.close()
+        self.cache.close()
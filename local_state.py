@@ -0,0 +1,36 @@
+"""
+SponsorFinder local state - SQLite files shared by the Python scripts.
+Holds caches and bookkeeping that should survive between runs (feed state, etc.).
+"""
+
+import os
+import sqlite3
+from pathlib import Path
+
+
+# Directory for local state files (override with SPONSORFINDER_STATE_DIR)
+STATE_DIR = Path(os.getenv("SPONSORFINDER_STATE_DIR") or Path(__file__).parent / ".sponsorfinder")
+
+
+def state_path(filename: str) -> Path:
+    """Return the path of a state file inside STATE_DIR."""
+    return STATE_DIR / filename
+
+
+def connect(path: Path, journal_mode: str = "WAL") -> sqlite3.Connection:
+    """
+    Open a SQLite database for local state.
+    Uses WAL by default so readers don't block the writer, and allows use from worker threads
+    (callers are responsible for serializing access). WAL needs every process on the same host
+    (its index lives in shared memory); pass journal_mode="DELETE" for files other processes
+    open through a different path or mount.
+    """
+    path = Path(path)
+    if str(path) != ":memory:":
+        path.parent.mkdir(parents=True, exist_ok=True)
+    
+    conn = sqlite3.connect(str(path), timeout=30, check_same_thread=False)
+    conn.row_factory = sqlite3.Row
+    conn.execute(f"PRAGMA journal_mode={journal_mode}")
+    conn.execute("PRAGMA synchronous=NORMAL")
+    return conn
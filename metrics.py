@@ -0,0 +1,276 @@
+"""
+SponsorFinder metrics - per-stage timers, histograms and counters for the Python scripts.
+Everything is recorded in memory during a run and written at the end as a Prometheus
+textfile (for node_exporter's textfile collector) and a JSON summary. --profile adds
+a cProfile dump of the run.
+"""
+
+import os
+import io
+import json
+import time
+import pstats
+import cProfile
+import argparse
+import threading
+from contextlib import contextmanager
+from pathlib import Path
+from typing import Dict, Iterator, List, Optional, Tuple
+
+from local_state import state_path
+
+
+# Where <script>.prom and <script>.json are written (override with --metrics-dir)
+METRICS_DIR = Path(os.getenv("SPONSORFINDER_METRICS_DIR") or state_path("metrics"))
+
+# Histogram bucket upper bounds in seconds (network stages run from milliseconds to tens of seconds)
+DURATION_BUCKETS = (0.0005, 0.001, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60)
+
+METRIC_PREFIX = "sponsorfinder"
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+def label_key(labels: Dict[str, str]) -> LabelKey:
+    return tuple(sorted((key, str(value)) for key, value in labels.items()))
+
+
+def status_class(status_code: Optional[int]) -> str:
+    """HTTP status class label: "2xx", "4xx", ... or "error" when no response arrived."""
+    return f"{status_code // 100}xx" if status_code else "error"
+
+
+class Histogram:
+    """Cumulative-bucket histogram of durations, Prometheus style."""
+
+    def __init__(self, buckets: Tuple[float, ...] = DURATION_BUCKETS):
+        self.buckets = buckets
+        self.counts = [0] * len(buckets)
+        self.total = 0.0
+        self.count = 0
+        self.max = 0.0
+
+    def observe(self, value: float):
+        for i, bound in enumerate(self.buckets):
+            if value <= bound:
+                self.counts[i] += 1
+                break
+        self.total += value
+        self.count += 1
+        self.max = max(self.max, value)
+
+    def merge(self, data: dict):
+        self.counts = [a + b for a, b in zip(self.counts, data["counts"])]
+        self.total += data["total"]
+        self.count += data["count"]
+        self.max = max(self.max, data["max"])
+
+    def to_dict(self) -> dict:
+        return {"counts": list(self.counts), "total": self.total, "count": self.count, "max": self.max}
+
+
+class Metrics:
+    """
+    Thread-safe counters and stage-duration histograms for one run.
+    Worker processes send snapshot() to the parent, which merge()s them.
+    """
+
+    def __init__(self, script: str = "sponsorfinder"):
+        self.script = script
+        self.started = time.time()
+        self._lock = threading.Lock()
+        self.counters: Dict[str, Dict[LabelKey, float]] = {}
+        self.stages: Dict[str, Histogram] = {}
+
+    def inc(self, name: str, amount: float = 1, **labels):
+        """Add to a counter, e.g. inc("links_seen") or inc("http_responses", target="feed", status="2xx")."""
+        key = label_key(labels)
+        with self._lock:
+            series = self.counters.setdefault(name, {})
+            series[key] = series.get(key, 0) + amount
+
+    def http_response(self, target: str, status_code: Optional[int]):
+        """Count an HTTP response by status class (None when the request failed outright)."""
+        self.inc("http_responses", target=target, status=status_class(status_code))
+
+    def value(self, name: str, **labels) -> float:
+        """Current value of one counter series (0 if never incremented)."""
+        with self._lock:
+            return self.counters.get(name, {}).get(label_key(labels), 0)
+
+    def observe(self, stage: str, seconds: float):
+        with self._lock:
+            if stage not in self.stages:
+                self.stages[stage] = Histogram()
+            self.stages[stage].observe(seconds)
+
+    @contextmanager
+    def timer(self, stage: str) -> Iterator[None]:
+        """Time a block of code as one observation of stage."""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(stage, time.perf_counter() - start)
+
+    def snapshot(self) -> dict:
+        """Picklable copy of everything recorded so far."""
+        with self._lock:
+            return {
+                "counters": {name: dict(series) for name, series in self.counters.items()},
+                "stages": {stage: histogram.to_dict() for stage, histogram in self.stages.items()},
+            }
+
+    def merge(self, snapshot: dict):
+        """Add a snapshot from another process."""
+        with self._lock:
+            for name, series in snapshot["counters"].items():
+                target = self.counters.setdefault(name, {})
+                for key, value in series.items():
+                    target[key] = target.get(key, 0) + value
+            for stage, data in snapshot["stages"].items():
+                self.stages.setdefault(stage, Histogram()).merge(data)
+
+    def summary(self) -> dict:
+        """JSON-friendly summary: counters and per-stage count/total/mean/max seconds."""
+        snapshot = self.snapshot()
+        counters = {}
+        for name, series in sorted(snapshot["counters"].items()):
+            if list(series) == [()]:
+                counters[name] = series[()]
+            else:
+                counters[name] = {",".join(f"{k}={v}" for k, v in key): value for key, value in sorted(series.items())}
+        
+        stages = {}
+        for stage, data in sorted(snapshot["stages"].items()):
+            stages[stage] = {
+                "count": data["count"],
+                "total_seconds": round(data["total"], 6),
+                "mean_seconds": round(data["total"] / data["count"], 6) if data["count"] else 0.0,
+                "max_seconds": round(data["max"], 6),
+            }
+        
+        return {
+            "script": self.script,
+            "started_at": self.started,
+            "duration_seconds": round(time.time() - self.started, 3),
+            "counters": counters,
+            "stages": stages,
+        }
+
+    def prometheus_text(self) -> str:
+        """Render all metrics in the Prometheus text exposition format."""
+        snapshot = self.snapshot()
+        script = self.script
+        lines: List[str] = []
+        
+        for name, series in sorted(snapshot["counters"].items()):
+            metric = f"{METRIC_PREFIX}_{name}_total"
+            lines.append(f"# TYPE {metric} counter")
+            for key, value in sorted(series.items()):
+                lines.append(f"{metric}{format_labels((('script', script),) + key)} {format_value(value)}")
+        
+        metric = f"{METRIC_PREFIX}_stage_duration_seconds"
+        if snapshot["stages"]:
+            lines.append(f"# HELP {metric} Time spent per pipeline stage.")
+            lines.append(f"# TYPE {metric} histogram")
+        for stage, data in sorted(snapshot["stages"].items()):
+            labels = (("script", script), ("stage", stage))
+            cumulative = 0
+            for bound, count in zip(DURATION_BUCKETS, data["counts"]):
+                cumulative += count
+                lines.append(f"{metric}_bucket{format_labels(labels + (('le', f'{bound:g}'),))} {cumulative}")
+            lines.append(f"{metric}_bucket{format_labels(labels + (('le', '+Inf'),))} {data['count']}")
+            lines.append(f"{metric}_sum{format_labels(labels)} {data['total']:.6f}")
+            lines.append(f"{metric}_count{format_labels(labels)} {data['count']}")
+        
+        metric = f"{METRIC_PREFIX}_last_run_timestamp_seconds"
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric}{format_labels((('script', script),))} {time.time():.0f}")
+        metric = f"{METRIC_PREFIX}_last_run_duration_seconds"
+        lines.append(f"# TYPE {metric} gauge")
+        lines.append(f"{metric}{format_labels((('script', script),))} {time.time() - self.started:.3f}")
+        return "\n".join(lines) + "\n"
+
+    def write(self, directory: Path) -> Tuple[Path, Path]:
+        """
+        Write <script>.prom and <script>.json into directory.
+        Files are replaced atomically so a collector never reads a half-written file.
+        """
+        directory = Path(directory)
+        directory.mkdir(parents=True, exist_ok=True)
+        prom_path = directory / f"{self.script}.prom"
+        json_path = directory / f"{self.script}.json"
+        write_atomic(prom_path, self.prometheus_text())
+        write_atomic(json_path, json.dumps(self.summary(), indent=2))
+        return prom_path, json_path
+
+    def report(self, top: int = 8):
+        """Print the stages that took the most time."""
+        stages = sorted(self.summary()["stages"].items(), key=lambda item: item[1]["total_seconds"], reverse=True)
+        if not stages:
+            return
+        print("⏱ Time per stage:")
+        for stage, data in stages[:top]:
+            print(f"   {stage:<16} {data['total_seconds']:9.2f}s  ({data['count']} × {data['mean_seconds'] * 1000:.1f} ms)")
+
+
+def escape_label_value(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\n", "\\n").replace('"', '\\"')
+
+
+def format_labels(labels: Tuple[Tuple[str, str], ...]) -> str:
+    return "{" + ",".join(f'{key}="{escape_label_value(str(value))}"' for key, value in labels) + "}"
+
+
+def format_value(value: float) -> str:
+    """A sample value written exactly: integers in full, other floats with repr (shortest round-trip form)."""
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+def write_atomic(path: Path, text: str):
+    temp_path = path.with_name(f".{path.name}.{os.getpid()}.tmp")
+    temp_path.write_text(text, encoding="utf-8")
+    os.replace(temp_path, path)
+
+
+def add_metrics_arguments(parser: argparse.ArgumentParser):
+    """Add the --metrics-dir/--profile options shared by both scripts."""
+    parser.add_argument(
+        "--metrics-dir", type=Path, default=METRICS_DIR, metavar="DIR",
+        help=f"where the Prometheus textfile and JSON summary are written (default: {METRICS_DIR})"
+    )
+    parser.add_argument(
+        "--profile", nargs="?", const="", default=None, metavar="FILE",
+        help="profile the run with cProfile and write the stats to FILE (default: <metrics dir>/<script>.prof)"
+    )
+
+
+@contextmanager
+def profiled(path: Optional[Path], top: int = 15) -> Iterator[None]:
+    """Run the block under cProfile when path is given, then dump stats and print the top functions."""
+    if path is None:
+        yield
+        return
+    
+    profiler = cProfile.Profile()
+    profiler.enable()
+    try:
+        yield
+    finally:
+        profiler.disable()
+        path.parent.mkdir(parents=True, exist_ok=True)
+        profiler.dump_stats(str(path))
+        output = io.StringIO()
+        pstats.Stats(profiler, stream=output).sort_stats("cumulative").print_stats(top)
+        print(output.getvalue())
+        print(f"📈 Profile written to {path} (inspect with: python -m pstats {path})")
+
+
+def profile_path(args: argparse.Namespace, script: str) -> Optional[Path]:
+    """Resolve the --profile option to a file path (None when profiling is off)."""
+    if args.profile is None:
+        return None
+    return Path(args.profile) if args.profile else Path(args.metrics_dir) / f"{script}.prof"
@@ -0,0 +1,240 @@
+"""
+SponsorFinder page cache - every web page is fetched at most once per enricher run.
+The enricher reads a brand's homepage to find its team pages and then scans it for contacts
+too, and many brands share landing pages; all of those fetches go through one PageCache.
+Pages are kept in memory for the run up to a total size, along with what was parsed out of
+them (so a page is parsed once as well), and optionally in SQLite with their
+ETag/Last-Modified, so a later run revalidates them with a conditional request instead of
+downloading them again.
+"""
+
+import os
+import time
+import threading
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Callable, Dict, Optional, Tuple
+
+from local_state import connect
+from metrics import Metrics
+
+
+PAGE_CACHE_BYTES = int(float(os.getenv("PAGE_CACHE_MB", "64")) * 1024 * 1024)  # page text and parse results kept in memory
+PAGE_CACHE_DISK = os.getenv("PAGE_CACHE_DISK", "0") != "0"  # also keep pages with validators between runs
+PAGE_CACHE_TTL = float(os.getenv("PAGE_CACHE_TTL", str(30 * 86400)))  # stored pages not fetched for 30 days are dropped
+PAGE_CACHE_DISK_ROWS = int(os.getenv("PAGE_CACHE_DISK_ROWS", "20000"))  # most pages kept in pages.db (newest first)
+
+
+def payload_size(value: Any) -> int:
+    """Approximate size of a parse result: the length of the strings it holds, however nested."""
+    if isinstance(value, (str, bytes)):
+        return len(value)
+    if isinstance(value, dict):
+        return sum(payload_size(key) + payload_size(item) for key, item in value.items())
+    if isinstance(value, (list, tuple, set, frozenset)):
+        return sum(payload_size(item) for item in value)
+    return 0
+
+
+class Page:
+    """A fetched page: status, body text, and the validators needed to revalidate it later."""
+
+    def __init__(self, url: str, status_code: int, text: str = "", etag: Optional[str] = None,
+                 last_modified: Optional[str] = None):
+        self.url = url
+        self.status_code = status_code
+        self.text = text
+        self.etag = etag
+        self.last_modified = last_modified
+        self._parsed: Dict[Callable, Any] = {}
+        self._parsed_size = 0
+        self._lock = threading.Lock()
+        self.on_resize: Optional[Callable[["Page", int], None]] = None  # set by the cache holding the page
+
+    @property
+    def ok(self) -> bool:
+        return self.status_code == 200
+
+    @property
+    def size(self) -> int:
+        """Approximate memory held by the page (its text and parse results), for the cache's size limit."""
+        return len(self.text) + len(self.url) + self._parsed_size
+
+    def parsed(self, parse: Callable[[str], Any]) -> Any:
+        """
+        parse(text), computed on first use and shared by all callers.
+        The result stays in the cache with the page, so parse should return what
+        callers need (a list of links), not the whole document tree.
+        """
+        added = 0
+        with self._lock:
+            if parse not in self._parsed:
+                result = self._parsed[parse] = parse(self.text)
+                added = payload_size(result)
+                self._parsed_size += added
+            result = self._parsed[parse]
+        if added and self.on_resize is not None:
+            self.on_resize(self, added)
+        return result
+
+
+# download(url, headers) -> Page (status 304 if the stored copy is current), or None if the request failed
+Downloader = Callable[[str, Dict[str, str]], Optional[Page]]
+
+
+class PageCache:
+    """
+    LRU of fetched pages for one run, keyed by URL and bounded by the total size of their text
+    and of what was parsed out of them.
+    Failed fetches are remembered too, so they aren't retried within the run. Concurrent
+    requests for the same URL wait for a single download. With a path, pages that came
+    with an ETag or Last-Modified are also stored in SQLite for conditional requests;
+    rows older than ttl are dropped and at most max_rows are kept.
+    """
+
+    def __init__(self, max_bytes: int = PAGE_CACHE_BYTES, path: Optional[Path] = None,
+                 metrics: Optional[Metrics] = None, ttl: float = PAGE_CACHE_TTL,
+                 max_rows: int = PAGE_CACHE_DISK_ROWS):
+        self.max_bytes = max(1, max_bytes)
+        self.path = path
+        self.metrics = metrics
+        self._pages: "OrderedDict[str, Optional[Page]]" = OrderedDict()
+        self._bytes = 0
+        self._in_flight: Dict[str, threading.Event] = {}
+        self._lock = threading.Lock()
+        self._conn = None
+        
+        if path is not None:
+            self._conn = connect(path)
+            with self._conn:
+                self._conn.execute("""
+                    CREATE TABLE IF NOT EXISTS pages (
+                        url TEXT PRIMARY KEY,
+                        etag TEXT,
+                        last_modified TEXT,
+                        text TEXT NOT NULL,
+                        fetched_at REAL NOT NULL
+                    )
+                """)
+                self._conn.execute("CREATE INDEX IF NOT EXISTS idx_pages_fetched_at ON pages (fetched_at)")
+                self._conn.execute("DELETE FROM pages WHERE fetched_at < ?", (time.time() - ttl,))
+                self._conn.execute("""
+                    DELETE FROM pages WHERE fetched_at < (
+                        SELECT fetched_at FROM pages ORDER BY fetched_at DESC LIMIT 1 OFFSET ?
+                    )
+                """, (max(0, max_rows - 1),))
+
+    def fetch(self, url: str, download: Downloader) -> Optional[Page]:
+        """
+        The page at url, downloaded only if this run hasn't fetched it yet.
+        Returns None if the request failed.
+        """
+        with self._lock:
+            cached = url in self._pages
+            if cached:
+                self._pages.move_to_end(url)
+                page = self._pages[url]
+            flight = None if cached else self._in_flight.get(url)
+            if not cached and flight is None:
+                self._in_flight[url] = threading.Event()
+        
+        if cached:
+            self._count("hit")
+            return page
+        if flight is not None:
+            # Another thread is downloading this page; use its result
+            flight.wait()
+            with self._lock:
+                page = self._pages.get(url)
+            self._count("hit")
+            return page
+        
+        page = None
+        try:
+            page, result = self._load(url, download)
+            self._count(result)
+        finally:
+            with self._lock:
+                self._remember(url, page)
+                self._in_flight.pop(url).set()
+        return page
+
+    def _load(self, url: str, download: Downloader) -> Tuple[Optional[Page], str]:
+        stored = self._stored(url)
+        headers = {}
+        if stored is not None:
+            if stored["etag"]:
+                headers["If-None-Match"] = stored["etag"]
+            if stored["last_modified"]:
+                headers["If-Modified-Since"] = stored["last_modified"]
+        
+        page = download(url, headers)
+        if page is None:
+            return None, "error"
+        
+        if page.status_code == 304 and stored is not None:
+            page = Page(url, 200, stored["text"], etag=page.etag or stored["etag"],
+                        last_modified=page.last_modified or stored["last_modified"])
+            self._store(page)
+            return page, "revalidated"
+        
+        if page.ok and (page.etag or page.last_modified):
+            self._store(page)
+        return page, "miss"
+
+    def _stored(self, url: str):
+        if self._conn is None:
+            return None
+        with self._lock:
+            return self._conn.execute(
+                "SELECT etag, last_modified, text FROM pages WHERE url = ?", (url,)
+            ).fetchone()
+
+    def _store(self, page: Page):
+        if self._conn is None:
+            return
+        with self._lock, self._conn:
+            self._conn.execute("""
+                INSERT INTO pages (url, etag, last_modified, text, fetched_at) VALUES (?, ?, ?, ?, ?)
+                ON CONFLICT(url) DO UPDATE SET
+                    etag = excluded.etag,
+                    last_modified = excluded.last_modified,
+                    text = excluded.text,
+                    fetched_at = excluded.fetched_at
+            """, (page.url, page.etag, page.last_modified, page.text, time.time()))
+
+    def _remember(self, url: str, page: Optional[Page]):
+        previous = self._pages.pop(url, None)
+        if previous is not None:
+            self._bytes -= previous.size
+        self._pages[url] = page
+        if page is not None:
+            page.on_resize = self._resized
+            self._bytes += page.size
+        self._evict()
+
+    def _resized(self, page: Page, added: int):
+        # A cached page was parsed; count the result toward the limit
+        with self._lock:
+            if self._pages.get(page.url) is page:
+                self._bytes += added
+                self._evict()
+
+    def _evict(self):
+        # The page just fetched stays even if it alone is over the limit
+        while self._bytes > self.max_bytes and len(self._pages) > 1:
+            _, evicted = self._pages.popitem(last=False)
+            if evicted is not None:
+                self._bytes -= evicted.size
+
+    def _count(self, result: str):
+        if self.metrics is not None:
+            self.metrics.inc("page_cache", result=result)
+
+    def close(self):
+        with self._lock:
+            self._pages.clear()
+            self._bytes = 0
+            if self._conn is not None:
+                self._conn.close()
+                self._conn = None
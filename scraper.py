@@ -5,10 +5,19 @@ Scrapes Podcast RSS Feeds to find sponsors by extracting domains from links in s
 """
 
 import os
-from typing import Optional, Set
+import time
+import argparse
+import calendar
+import atexit
+import threading
+import multiprocessing
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from dataclasses import dataclass, field, replace
+from datetime import datetime, timezone
+from queue import Empty
+from typing import Dict, Iterable, Iterator, List, Optional, Tuple
 from pathlib import Path
 from urllib.parse import urlparse
-from html import unescape
 
 try:
     from dotenv import load_dotenv
@@ -17,19 +26,24 @@ except ImportError:
     DOTENV_AVAILABLE = False
 
 try:
-    import feedparser
-    FEEDPARSER_AVAILABLE = True
+    import requests
+    REQUESTS_AVAILABLE = True
 except ImportError:
-    FEEDPARSER_AVAILABLE = False
-
-try:
-    from bs4 import BeautifulSoup
-    BEAUTIFULSOUP_AVAILABLE = True
-except ImportError:
-    BEAUTIFULSOUP_AVAILABLE = False
+    REQUESTS_AVAILABLE = False
 
 from supabase import create_client, Client
 
+from domain_rules import DomainRuleSet
+from domains import extract_domain_name, extract_host, extract_root_domain
+from feed_queue import FeedQueue, load_feed_urls
+from feed_reader import FEEDPARSER_AVAILABLE, hash_entries, read_feed_entries
+from feed_state import FeedStateStore
+from link_extractor import LINK_PARSE_CACHE_DISK, LINK_PARSE_CACHE_SIZE, LinkParseCache, extract_all_links
+from link_resolver import REDIRECT_RULES_PATH, LinkResolver
+from local_state import state_path
+from metrics import Metrics, add_metrics_arguments, profile_path, profiled
+from storage import Store, add_storage_arguments, open_store
+
 
 # Load environment variables from .env.local or .env
 if DOTENV_AVAILABLE:
@@ -59,29 +73,40 @@ PODCAST_RSS_FEEDS = [
     "https://feeds.megaphone.fm/stuffyoushouldknow",  # Stuff You Should Know
 ]
 
-# The "Trash Filter" - Domains to ignore
-TRASH_DOMAINS = {
-    'facebook.com',
-    'twitter.com',
-    'x.com',
-    'instagram.com',
-    'youtube.com',
-    'youtu.be',
-    'tiktok.com',
-    'spotify.com',
-    'apple.com',
-    'google.com',
-    'patreon.com',
-    'discord.com',
-    'amazon.com',
-    'amzn.to',
-    'linktr.ee',
-    't.me',
-    'reddit.com',
-    'megaphone.fm',
-    'simplecast.com',
-    'art19.com'
-}
+# The "Trash Filter" - exact/suffix/wildcard rules for domains to ignore
+TRASH_RULES_PATH = Path(os.getenv("TRASH_RULES_PATH") or Path(__file__).parent / "data" / "trash_domains.txt")
+
+# Follow short and tracking links (bit.ly, podtrac, ...) to the sponsor's own domain
+RESOLVE_LINKS = os.getenv("RESOLVE_LINKS", "1") != "0"
+
+# Brand registry settings
+BRAND_PAGE_SIZE = 1000  # rows per request when loading brands (PostgREST default max-rows)
+
+# Episodes considered per feed (newest first)
+MAX_EPISODES = 50
+
+# Feed fetch settings
+FEED_FETCH_WORKERS = int(os.getenv("FEED_FETCH_WORKERS", "8"))  # feeds downloaded in parallel
+FEED_FETCH_PER_HOST = int(os.getenv("FEED_FETCH_PER_HOST", "2"))  # parallel downloads per feed host
+FEED_REQUEST_TIMEOUT = 30  # seconds
+FEED_USER_AGENT = "SponsorFinder/1.0 (podcast feed reader)"
+FEED_CHUNK_SIZE = 64 * 1024  # bytes handed to the streaming parser at a time
+FEED_HASH_WINDOW = 20  # newest episodes hashed to spot feeds that are unchanged despite a 200
+
+# Sponsor writer settings
+BRAND_BATCH_SIZE = int(os.getenv("BRAND_BATCH_SIZE", "100"))  # brands per bulk insert
+BRAND_FLUSH_INTERVAL = float(os.getenv("BRAND_FLUSH_INTERVAL", "30"))  # seconds before a partial batch is flushed
+
+# Sharded scraping settings (--workers > 1 or --queue)
+SCRAPE_WORKERS = int(os.getenv("SCRAPE_WORKERS", "1"))  # worker processes on this machine
+FEED_QUEUE_BATCH = int(os.getenv("FEED_QUEUE_BATCH", "16"))  # feeds leased by a worker at a time
+FEED_LEASE_SECONDS = float(os.getenv("FEED_LEASE_SECONDS", "900"))  # unfinished leases are reclaimed after this
+FEED_REQUEUE_AFTER = float(os.getenv("FEED_REQUEUE_AFTER", "3600"))  # finished feeds are queued again after this
+FEED_QUEUE_POLL = 2.0  # seconds an idle worker waits while other workers still hold leases
+
+
+# Stage timings and counters for this run (written to <metrics dir>/scraper.prom and .json)
+metrics = Metrics("scraper")
 
 
 def get_supabase_client() -> Client:
@@ -95,195 +120,660 @@ def get_supabase_client() -> Client:
     return create_client(SUPABASE_URL, SUPABASE_KEY)
 
 
-def extract_root_domain(url: str) -> Optional[str]:
+_trash_rules: Optional[DomainRuleSet] = None
+
+
+def get_trash_rules() -> DomainRuleSet:
+    """Load and compile the trash filter rules once."""
+    global _trash_rules
+    if _trash_rules is None:
+        _trash_rules = DomainRuleSet.from_file(TRASH_RULES_PATH, name="Trash filter")
+    return _trash_rules
+
+
+def is_trash_domain(domain: str) -> bool:
     """
-    Extract root domain from a URL.
-    Example: https://www.athleticgreens.com/tim -> athleticgreens.com
+    Check if a host matches the trash filter rules.
+    Suffix rules cover subdomains (open.spotify.com matches spotify.com).
     """
-    if not url:
-        return None
+    if not domain:
+        return True
     
-    try:
-        # Add protocol if missing
-        if not url.startswith(('http://', 'https://')):
-            url = 'https://' + url
+    return get_trash_rules().match(domain) is not None
+
+
+_redirect_rules: Optional[DomainRuleSet] = None
+
+
+def get_redirect_rules() -> DomainRuleSet:
+    """Load and compile the redirector rules once."""
+    global _redirect_rules
+    if _redirect_rules is None:
+        _redirect_rules = DomainRuleSet.from_file(REDIRECT_RULES_PATH, name="Redirectors")
+    return _redirect_rules
+
+
+def is_redirector_domain(domain: str) -> bool:
+    """
+    Check if a host is a known short-link or tracking redirector.
+    A link that still points at one was not resolved to the sponsor's site.
+    """
+    return get_redirect_rules().match(domain) is not None
+
+
+_link_resolver: Optional[LinkResolver] = None
+
+
+def get_link_resolver() -> Optional[LinkResolver]:
+    """Create the redirect-following link resolver once (None when disabled)."""
+    global _link_resolver
+    if _link_resolver is None and RESOLVE_LINKS and REQUESTS_AVAILABLE:
+        _link_resolver = LinkResolver(get_redirect_rules(), metrics=metrics)
+    return _link_resolver
+
+
+def close_link_resolver():
+    """Close the resolver's HTTP session and its SQLite cache, and drop it."""
+    global _link_resolver
+    if _link_resolver is not None:
+        _link_resolver.close()
+        _link_resolver = None
+
+
+_link_parse_cache: Optional[LinkParseCache] = None
+
+
+def get_link_parse_cache() -> Optional[LinkParseCache]:
+    """Create the show-notes parse cache once (None when LINK_PARSE_CACHE_SIZE is 0)."""
+    global _link_parse_cache
+    if _link_parse_cache is None and LINK_PARSE_CACHE_SIZE > 0:
+        path = state_path("link_parse_cache.db") if LINK_PARSE_CACHE_DISK else None
+        _link_parse_cache = LinkParseCache(LINK_PARSE_CACHE_SIZE, path=path, metrics=metrics)
+    return _link_parse_cache
+
+
+def close_link_parse_cache():
+    """Write cached blocks to disk (when enabled) and drop the cache."""
+    global _link_parse_cache
+    if _link_parse_cache is not None:
+        _link_parse_cache.close()
+        _link_parse_cache = None
+
+
+def report_link_parse_cache():
+    """Print how many show-notes blocks were reused, including those of worker processes."""
+    hits = metrics.value("link_parse_cache", result="hit") + metrics.value("link_parse_cache", result="disk_hit")
+    misses = metrics.value("link_parse_cache", result="miss")
+    if hits or misses:
+        saved = metrics.value("link_parse_seconds_saved")
+        print(f"♻ Parse cache: {hits:.0f} of {hits + misses:.0f} show-notes blocks reused, ~{saved:.2f}s of parsing saved")
+
+
+def normalize_brand_name(name: str) -> str:
+    """Normalize a brand name for case-insensitive comparison."""
+    return (name or "").lower().strip()
+
+
+class BrandRegistry:
+    """
+    In-memory index of existing brands, keyed by normalized name.
+    Loaded once per run so duplicate checks never hit the database per link.
+    """
+
+    def __init__(self, store: Store, page_size: int = BRAND_PAGE_SIZE):
+        self.store = store
+        self.page_size = page_size
+        self.brands: Dict[str, Optional[str]] = {}  # normalized name -> brand id
+        self.last_seen: Optional[str] = None  # newest created_at seen so far
+
+    def __len__(self) -> int:
+        return len(self.brands)
+
+    def __contains__(self, brand_name: str) -> bool:
+        return normalize_brand_name(brand_name) in self.brands
+
+    def load(self) -> int:
+        """
+        Load every brand page by page.
+        Returns the number of brands indexed.
+        """
+        self.brands.clear()
+        self.last_seen = None
+        with metrics.timer("load_brands"):
+            self._load_pages()
+        return len(self.brands)
+
+    def refresh(self) -> int:
+        """
+        Load brands created since the last load (delta refresh).
+        Picks up brands inserted by other runs. Returns the number of rows fetched.
+        """
+        # Without a last_seen timestamp (empty table) this re-reads everything; it must not
+        # clear the registry like load() does, or names reserved by the writer would be lost
+        with metrics.timer("refresh_brands"):
+            return self._load_pages(since=self.last_seen)
+
+    def add(self, brand_name: str, brand_id: Optional[str] = None, created_at: Optional[str] = None):
+        """Register a brand, e.g. right after inserting it."""
+        normalized_name = normalize_brand_name(brand_name)
+        if not normalized_name:
+            return
+        if brand_id or normalized_name not in self.brands:
+            self.brands[normalized_name] = brand_id
+        if created_at and (not self.last_seen or created_at > self.last_seen):
+            self.last_seen = created_at
+
+    def _load_pages(self, since: Optional[str] = None) -> int:
+        fetched = 0
+        # Pages include rows sharing the since timestamp; add() is idempotent
+        for rows in self.store.iter_brand_pages(since=since, page_size=self.page_size):
+            for row in rows:
+                self.add(row.get("name", ""), row.get("id"), row.get("created_at"))
+            fetched += len(rows)
+        return fetched
+
+
+class SponsorWriter:
+    """
+    Buffers newly discovered brands and writes them in batches.
+    Each batch is one store call (one RPC on Supabase); names that already exist are skipped.
+    Flushes when the buffer is full, when the flush interval has elapsed, and at exit
+    (until close() is called).
+    """
+
+    def __init__(self, store: Store, registry: BrandRegistry, batch_size: int = BRAND_BATCH_SIZE,
+                 flush_interval: float = BRAND_FLUSH_INTERVAL):
+        self.store = store
+        self.registry = registry
+        self.batch_size = max(1, batch_size)
+        self.flush_interval = flush_interval
+        self.pending: List[dict] = []
+        self.last_flush = time.monotonic()
+        self.inserted_total = 0
+        self.skipped_total = 0
+        self.failed_batches = 0
+        atexit.register(self.flush)
+
+    def add(self, brand_name: str, website_url: str) -> bool:
+        """
+        Queue a brand for insertion.
+        Returns True if queued, False if the brand is already known.
+        """
+        if brand_name in self.registry:
+            return False
+        
+        self.pending.append({
+            "name": brand_name,
+            "category": "podcast-found",
+            "website_url": website_url,
+            "is_active": True
+        })
+        # Reserve the name so repeated links in this run are not queued twice
+        self.registry.add(brand_name)
         
-        parsed = urlparse(url)
-        domain = parsed.netloc.lower()
+        if len(self.pending) >= self.batch_size:
+            self.flush()
+        else:
+            self.flush_if_due()
+        return True
+
+    def close(self):
+        """Flush pending brands, close the store and drop the exit hook."""
+        atexit.unregister(self.flush)
+        self.flush()
+        self.store.close()
+
+    def flush_if_due(self):
+        """Flush a partial batch once the flush interval has elapsed."""
+        if self.pending and time.monotonic() - self.last_flush >= self.flush_interval:
+            self.flush()
+
+    def flush(self) -> Tuple[int, int]:
+        """
+        Write all pending brands in one call.
+        Returns (inserted, skipped) counts for the batch.
+        """
+        self.last_flush = time.monotonic()
+        if not self.pending:
+            return (0, 0)
         
-        # Remove www. prefix
-        if domain.startswith('www.'):
-            domain = domain[4:]
+        batch = self.pending
+        self.pending = []
         
-        # Remove port if present
-        if ':' in domain:
-            domain = domain.split(':')[0]
+        try:
+            with metrics.timer("save"):
+                inserted_rows = self.store.insert_brands(batch)
+        except Exception as e:
+            print(f"  ⚠ Error saving batch of {len(batch)} brands: {e}")
+            self.failed_batches += 1
+            metrics.inc("brand_batches", result="failed")
+            # Release the reservations so a later link can queue these names again
+            for brand in batch:
+                self.registry.brands.pop(normalize_brand_name(brand["name"]), None)
+            return (0, 0)
         
-        return domain if domain else None
-    except Exception as e:
-        print(f"      Error parsing URL '{url}': {e}")
-        return None
+        for row in inserted_rows:
+            self.registry.add(row.get("name", ""), row.get("id"), row.get("created_at"))
+        
+        inserted = len(inserted_rows)
+        skipped = len(batch) - inserted
+        self.inserted_total += inserted
+        self.skipped_total += skipped
+        metrics.inc("brand_batches", result="ok")
+        metrics.inc("brands_inserted", inserted)
+        metrics.inc("brands_skipped_existing", skipped)
+        
+        print(f"  💾 Saved batch of {len(batch)} brands: {inserted} inserted, {skipped} skipped (already existed)")
+        return (inserted, skipped)
+
+
+class ForwardingSponsorWriter:
+    """
+    Stands in for SponsorWriter inside worker processes.
+    Drops brands the worker already knows and forwards the rest to the parent process,
+    which owns the single SponsorWriter.
+    """
+
+    def __init__(self, registry: BrandRegistry, results):
+        self.registry = registry
+        self.results = results
+
+    def add(self, brand_name: str, website_url: str) -> bool:
+        """Forward a brand to the parent. Returns False if the brand is already known."""
+        if brand_name in self.registry:
+            return False
+        
+        self.registry.add(brand_name)
+        self.results.put(("brand", brand_name, website_url))
+        return True
+
+    def flush_if_due(self):
+        """Nothing to flush; the parent batches the writes."""
+
+    def flush(self) -> Tuple[int, int]:
+        return (0, 0)
 
 
-def extract_domain_name(domain: str) -> str:
+def save_sponsor(writer: SponsorWriter, domain: str, website_url: str) -> bool:
     """
-    Extract brand name from domain (without TLD).
-    Example: athleticgreens.com -> athleticgreens
+    Queue sponsor for saving.
+    Returns True if it is a new brand, False if skipped (duplicate or invalid).
     """
     if not domain:
-        return ""
+        return False
     
-    domain = domain.lower().strip()
+    brand_name = extract_domain_name(domain)
     
-    # Split by dot and take the main part
-    parts = domain.split('.')
+    if not brand_name:
+        return False
     
-    # Handle common two-part TLDs (e.g., co.uk, com.au)
-    two_part_tlds = {'co', 'com', 'net', 'org', 'io', 'ai', 'tv', 'me', 'us', 'uk', 'ca', 'au'}
+    if not writer.add(brand_name, website_url):
+        metrics.inc("links_duplicate_brand")
+        return False
     
-    if len(parts) >= 3 and parts[-2] in two_part_tlds:
-        # e.g., example.co.uk -> example
-        return parts[-3]
-    elif len(parts) >= 2:
-        # e.g., example.com -> example
-        return parts[-2]
-    else:
-        return parts[0] if parts else domain
+    metrics.inc("brands_found")
+    print(f"  🎯 Sponsor Found: {brand_name} ({domain}) -> {website_url}")
+    return True
+
+
+@dataclass
+class BrandMention:
+    """Episodes of one feed linking to one sponsor domain, with the first and last publish dates."""
+    brand_name: str
+    mentions: int = 0
+    first_seen: Optional[float] = None
+    last_seen: Optional[float] = None
+
+    def add(self, published: Optional[float]):
+        self.mentions += 1
+        if published is not None:
+            self.first_seen = published if self.first_seen is None else min(self.first_seen, published)
+            self.last_seen = published if self.last_seen is None else max(self.last_seen, published)
+
+
+@dataclass
+class FetchedFeed:
+    """A downloaded feed (its parsed episodes), or the error that prevented downloading it."""
+    url: str
+    entries: Optional[list] = None  # episodes read by the streaming reader (or its feedparser fallback)
+    headers: Dict[str, str] = field(default_factory=dict)
+    error: Optional[Exception] = None
+    not_modified: bool = False  # 304, or same content hash as the last run
+    etag: Optional[str] = None
+    last_modified: Optional[str] = None
+    content_hash: Optional[str] = None
+    bytes_read: int = 0
+    streamed: bool = True  # False when a malformed document needed the feedparser fallback
+    # Newest and oldest episode processed from this feed, set by process_feed
+    newest_guid: Optional[str] = None
+    newest_published: Optional[float] = None
+    oldest_published: Optional[float] = None
+    # Sponsor domain -> mentions in the processed episodes, set by process_feed
+    mentions: Dict[str, BrandMention] = field(default_factory=dict)
+
+
+class TimedChunks:
+    """Iterates over response chunks, adding up the time spent waiting on the network."""
+
+    def __init__(self, chunks: Iterable[bytes]):
+        self.chunks = iter(chunks)
+        self.waited = 0.0
 
+    def __iter__(self) -> "TimedChunks":
+        return self
 
-def extract_all_links(html_content: str) -> Set[str]:
+    def __next__(self) -> bytes:
+        start = time.perf_counter()
+        try:
+            return next(self.chunks)
+        finally:
+            self.waited += time.perf_counter() - start
+
+
+def fetch_feed(rss_url: str, state: Optional[FeedStateStore] = None, max_items: int = MAX_EPISODES) -> FetchedFeed:
     """
-    Extract all <a href> links from HTML content using BeautifulSoup.
-    Returns a set of unique URLs.
+    Download a single feed, parsing episodes while the response streams in.
+    Stops reading after max_items episodes (or at the last processed episode).
+    With a state store, sends a conditional GET and flags feeds unchanged since the last run.
+    Network and HTTP errors are returned on the result instead of raised.
     """
-    if not html_content:
-        return set()
-    
-    if not BEAUTIFULSOUP_AVAILABLE:
-        print("  ⚠ BeautifulSoup not available!")
-        return set()
+    request_headers = {'User-Agent': FEED_USER_AGENT}
+    previous = state.get(rss_url) if state else None
+    if previous:
+        if previous.get("etag"):
+            request_headers['If-None-Match'] = previous["etag"]
+        if previous.get("last_modified"):
+            request_headers['If-Modified-Since'] = previous["last_modified"]
     
     try:
-        soup = BeautifulSoup(html_content, 'html.parser')
-        links = set()
+        start = time.perf_counter()
+        with requests.get(
+            rss_url,
+            timeout=FEED_REQUEST_TIMEOUT,
+            headers=request_headers,
+            allow_redirects=True,
+            stream=True
+        ) as response:
+            metrics.http_response("feed", response.status_code)
+            if response.status_code == 304 and previous:
+                metrics.observe("download", time.perf_counter() - start)
+                return FetchedFeed(
+                    url=rss_url,
+                    not_modified=True,
+                    etag=previous.get("etag"),
+                    last_modified=previous.get("last_modified"),
+                    content_hash=previous.get("content_hash")
+                )
+            
+            response.raise_for_status()
+            
+            # feedparser expects lower-case header names
+            headers = {key.lower(): value for key, value in response.headers.items()}
+            # Parsing runs while the body streams in; split the time into waiting and parsing
+            connected = time.perf_counter()
+            chunks = TimedChunks(response.iter_content(chunk_size=FEED_CHUNK_SIZE))
+            # The hash window is read in full even when the last processed episode comes
+            # earlier, so the hash never depends on where the previous run stopped
+            hash_window = min(FEED_HASH_WINDOW, max_items)
+            result = read_feed_entries(
+                chunks,
+                max_items=max_items,
+                stop_guid=previous.get("last_guid") if previous else None,
+                response_headers=headers,
+                min_items=hash_window
+            )
+            metrics.observe("download", connected - start + chunks.waited)
+            metrics.observe("parse", time.perf_counter() - connected - chunks.waited)
         
-        for anchor in soup.find_all('a', href=True):
-            href = anchor.get('href', '').strip()
-            if href:
-                # Unescape HTML entities
-                href = unescape(href)
-                links.add(href)
+        metrics.inc("feed_bytes", result["bytes_read"])
+        content_hash = hash_entries(result["entries"], hash_window)
         
-        return links
+        return FetchedFeed(
+            url=rss_url,
+            entries=result["entries"],
+            headers=headers,
+            # Some hosts ignore validators but serve identical episodes
+            not_modified=bool(previous and previous.get("content_hash") == content_hash),
+            etag=headers.get("etag"),
+            last_modified=headers.get("last-modified"),
+            content_hash=content_hash,
+            bytes_read=result["bytes_read"],
+            streamed=result["streamed"]
+        )
+    except requests.RequestException as e:
+        if e.response is None:
+            metrics.http_response("feed", None)
+        return FetchedFeed(url=rss_url, error=e)
     except Exception as e:
-        print(f"      Error parsing HTML: {e}")
-        return set()
+        return FetchedFeed(url=rss_url, error=e)
 
 
-def is_trash_domain(domain: str) -> bool:
+def save_feed_state(state: FeedStateStore, fetched: FetchedFeed):
+    """Remember a processed feed's validators and episode watermark for the next run."""
+    if fetched.error is not None:
+        return
+    state.save(fetched.url, fetched.etag, fetched.last_modified, fetched.content_hash)
+    state.save_watermark(fetched.url, fetched.newest_guid, fetched.newest_published, fetched.oldest_published)
+
+
+class FeedFetcher:
     """
-    Check if domain is in the trash filter list.
-    Also checks if any part of the domain matches trash domains.
+    Downloads feeds concurrently.
+    Enforces a global worker limit and a per-host limit, and yields feeds as they finish.
     """
-    if not domain:
-        return True
-    
-    # Direct match
-    if domain in TRASH_DOMAINS:
-        return True
-    
-    # Check if any part of the domain matches (for subdomains)
-    domain_parts = domain.split('.')
-    for part in domain_parts:
-        if part in TRASH_DOMAINS or f"{part}.com" in TRASH_DOMAINS:
-            return True
+
+    def __init__(self, max_workers: int = FEED_FETCH_WORKERS, per_host: int = FEED_FETCH_PER_HOST,
+                 state: Optional[FeedStateStore] = None, max_items: int = MAX_EPISODES):
+        self.max_workers = max(1, max_workers)
+        self.state = state
+        self.max_items = max_items
+        self.per_host = max(1, per_host)
+        self._host_slots: Dict[str, threading.BoundedSemaphore] = {}
+        self._lock = threading.Lock()
+
+    def _host_slot(self, rss_url: str) -> threading.BoundedSemaphore:
+        host = urlparse(rss_url).netloc.lower()
+        with self._lock:
+            if host not in self._host_slots:
+                self._host_slots[host] = threading.BoundedSemaphore(self.per_host)
+            return self._host_slots[host]
+
+    def _fetch(self, rss_url: str) -> FetchedFeed:
+        with self._host_slot(rss_url):
+            return fetch_feed(rss_url, self.state, self.max_items)
+
+    def fetch_all(self, rss_urls: Iterable[str]) -> Iterator[FetchedFeed]:
+        """
+        Download all feeds, yielding each one as soon as it completes.
+        At most 2 x max_workers feeds are downloading or waiting to be consumed at a time,
+        so a slow consumer doesn't make the whole catalog pile up in memory.
+        """
+        window = self.max_workers * 2
+        with ThreadPoolExecutor(max_workers=self.max_workers) as executor:
+            in_flight = set()
+            for url in interleave_by_host(rss_urls):
+                if len(in_flight) >= window:
+                    done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                    for future in done:
+                        yield future.result()
+                in_flight.add(executor.submit(self._fetch, url))
+            
+            while in_flight:
+                done, in_flight = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    yield future.result()
+
+
+def interleave_by_host(urls: Iterable[str]) -> List[str]:
+    """
+    Order URLs round-robin across hosts.
+    Keeps workers from queueing up behind one host's per-host limit.
+    """
+    by_host: Dict[str, List[str]] = {}
+    for url in urls:
+        by_host.setdefault(urlparse(url).netloc.lower(), []).append(url)
     
-    return False
+    ordered = []
+    queues = [list(reversed(host_urls)) for host_urls in by_host.values()]
+    while queues:
+        for queue in queues:
+            ordered.append(queue.pop())
+        queues = [queue for queue in queues if queue]
+    return ordered
+
 
+def episode_guid(episode) -> Optional[str]:
+    """Stable identifier of an episode (RSS guid, falling back to link)."""
+    return episode.get("id") or episode.get("guid") or episode.get("link") or None
 
-def brand_exists(supabase: Client, brand_name: str) -> bool:
-    """Check if brand exists (case-insensitive)."""
+
+def episode_published(episode) -> Optional[float]:
+    """Episode publish date as a UTC timestamp, or None if the feed doesn't give one."""
+    published = episode.get("published_parsed") or episode.get("updated_parsed")
+    if not published:
+        return None
     try:
-        normalized_name = brand_name.lower().strip()
-        
-        response = supabase.table("brands").select("id, name").execute()
-        
-        if response.data:
-            for brand in response.data:
-                if brand["name"].lower().strip() == normalized_name:
-                    return True
-        
-        return False
-    except Exception as e:
-        print(f"  Error checking brand existence: {e}")
-        return False
+        return float(calendar.timegm(published))
+    except (TypeError, ValueError, OverflowError):
+        return None
 
 
-def save_sponsor(supabase: Client, domain: str, website_url: str) -> bool:
+def select_new_episodes(episodes: list, watermark: Optional[dict]) -> list:
     """
-    Save sponsor to database.
-    Returns True if saved successfully, False if skipped (duplicate) or error.
+    Keep only episodes newer than the feed's watermark.
+    Compares publish dates when both sides have one, otherwise keeps episodes
+    listed before the last processed GUID (feeds list newest first).
     """
-    if not domain:
-        return False
+    if not watermark or (not watermark.get("last_guid") and watermark.get("last_published") is None):
+        return episodes
     
-    brand_name = extract_domain_name(domain)
+    last_guid = watermark.get("last_guid")
+    last_published = watermark.get("last_published")
     
-    if not brand_name:
-        return False
+    # Position of the last processed episode; everything before it is newer
+    cutoff = len(episodes)
+    if last_guid:
+        for i, episode in enumerate(episodes):
+            if episode_guid(episode) == last_guid:
+                cutoff = i
+                break
     
-    try:
-        # Check if brand already exists
-        if brand_exists(supabase, brand_name):
-            return False
+    new_episodes = []
+    for i, episode in enumerate(episodes):
+        if last_guid and episode_guid(episode) == last_guid:
+            continue
         
-        # Insert new brand
-        brand_data = {
-            "name": brand_name,
-            "category": "podcast-found",
-            "website_url": website_url,
-            "is_active": True
-        }
+        published = episode_published(episode)
+        if last_published is not None and published is not None:
+            is_new = published > last_published
+        else:
+            is_new = i < cutoff
         
-        brand_response = supabase.table("brands").insert(brand_data).execute()
-        
-        if not brand_response.data or len(brand_response.data) == 0:
-            print(f"  ⚠ Failed to create brand '{brand_name}'")
-            return False
-        
-        print(f"  🎯 Sponsor Found: {brand_name} ({domain}) -> {website_url}")
-        return True
+        if is_new:
+            new_episodes.append(episode)
     
-    except Exception as e:
-        # Handle duplicate key errors gracefully
-        error_str = str(e).lower()
-        if 'duplicate' in error_str or 'unique' in error_str or 'already exists' in error_str:
-            return False
-        print(f"  ⚠ Error saving '{brand_name}': {e}")
-        return False
+    return new_episodes
 
 
-def scrape_feed(rss_url: str, max_episodes: int = 50):
+def select_uncounted_episodes(episodes: list, counted: Optional[dict]) -> list:
     """
-    Scrape a single RSS feed and extract sponsor links.
+    Keep only episodes whose mentions haven't been counted yet: newer than the feed's
+    watermark, or published before its oldest counted episode (a deeper backfill).
+    Feed state without first_published treats everything up to the watermark as counted.
+    """
+    uncounted = select_new_episodes(episodes, counted)
+    first_published = counted.get("first_published") if counted else None
+    if first_published is None:
+        return uncounted
+    
+    newer = {id(episode) for episode in uncounted}
+    uncounted = []
+    for episode in episodes:
+        published = episode_published(episode)
+        if id(episode) in newer or (published is not None and published < first_published):
+            uncounted.append(episode)
+    return uncounted
+
+
+def scrape_feed(rss_url: str, max_episodes: int = MAX_EPISODES, writer: Optional[SponsorWriter] = None,
+                state: Optional[FeedStateStore] = None):
+    """
+    Download and scrape a single RSS feed.
+    Pass a shared writer to reuse its brand registry and batch inserts across feeds,
+    and a state store to skip unchanged feeds and only process new episodes.
+    """
+    fetched = fetch_feed(rss_url, state, max_items=max_episodes)
+    watermark = state.get(rss_url) if state else None
+    sponsors = process_feed(fetched, max_episodes=max_episodes, writer=writer, watermark=watermark, counted=watermark)
+    if state and writer is None:
+        # process_feed flushed its own writer, so the feed's brands are saved
+        save_feed_state(state, fetched)
+    return sponsors
+
+
+def process_feed(fetched: FetchedFeed, max_episodes: int = MAX_EPISODES, writer: Optional[SponsorWriter] = None,
+                 watermark: Optional[dict] = None, counted: Optional[dict] = None):
+    """
+    Parse a downloaded RSS feed and extract sponsor links.
+    With a watermark (stored feed state), only episodes newer than the last run are processed.
+    Mentions are only counted for episodes the stored state in counted doesn't cover yet
+    (see select_uncounted_episodes), so full and backfill runs don't count an episode twice.
     """
     if not FEEDPARSER_AVAILABLE:
         raise ImportError("feedparser library not installed. Run: pip install feedparser")
     
+    rss_url = fetched.url
     print(f"\n📻 Scraping: {rss_url}")
     
+    if fetched.error is not None:
+        print(f"  ❌ Error fetching feed: {fetched.error}")
+        metrics.inc("feeds", result="fetch_error")
+        return 0
+    
+    if fetched.not_modified:
+        print("   ✓ Feed unchanged since last run, skipping")
+        metrics.inc("feeds", result="not_modified")
+        return 0
+    
+    owns_writer = writer is None
     try:
-        feed = feedparser.parse(rss_url)
+        episodes = fetched.entries[:max_episodes]
+        if not fetched.streamed:
+            print("  ⚠ Warning: Feed parsing issues detected (parsed with feedparser fallback)")
+        
+        new_episodes = select_new_episodes(episodes, watermark)
+        if len(new_episodes) < len(episodes):
+            print(f"   Found {len(episodes)} episodes ({len(new_episodes)} new since last run)")
+        else:
+            print(f"   Found {len(episodes)} episodes")
+        episodes = new_episodes
+        metrics.inc("episodes_new", len(episodes))
         
-        if feed.bozo:
-            print(f"  ⚠ Warning: Feed parsing issues detected")
+        uncounted = {id(episode) for episode in select_uncounted_episodes(episodes, counted)}
         
-        episodes = feed.entries[:max_episodes]
-        print(f"   Found {len(episodes)} episodes")
+        # Track the newest and oldest episodes so the watermark can advance once brands
+        # and mention counts are saved
+        for episode in episodes:
+            published = episode_published(episode)
+            if published is not None and (fetched.oldest_published is None or published < fetched.oldest_published):
+                fetched.oldest_published = published
+            if fetched.newest_guid is None or (
+                published is not None and (fetched.newest_published is None or published > fetched.newest_published)
+            ):
+                fetched.newest_guid = episode_guid(episode)
+                fetched.newest_published = published
+        
+        if owns_writer:
+            store = open_store(supabase_factory=get_supabase_client)
+            registry = BrandRegistry(store)
+            registry.load()
+            writer = SponsorWriter(store, registry)
         
-        supabase = get_supabase_client()
         sponsors_found = 0
         
+        # First pass: extract links from every episode
+        episode_links = []
+        parse_cache = get_link_parse_cache()
         for i, episode in enumerate(episodes, 1):
             title = episode.get("title", "")[:60]
             
@@ -310,35 +800,388 @@ def scrape_feed(rss_url: str, max_episodes: int = 50):
                 continue
             
             # Extract all links from the combined HTML
-            links = extract_all_links(combined_html)
-            
+            with metrics.timer("extract"):
+                links = extract_all_links(combined_html, cache=parse_cache)
+            metrics.inc("links_seen", len(links))
             if links:
-                print(f"   Episode {i}: '{title}...' - Found {len(links)} links")
+                episode_links.append((i, title, links, episode_published(episode), id(episode) in uncounted))
+        
+        # Resolve short and tracking links for the whole feed at once (concurrent, cached)
+        resolver = get_link_resolver()
+        resolved = {}
+        if resolver is not None:
+            with metrics.timer("resolve"):
+                resolved = resolver.resolve_many(link for _, _, links, _, _ in episode_links for link in links)
+        
+        # Second pass: filter and save sponsors, counting each domain once per episode
+        for i, title, links, published, count in episode_links:
+            print(f"   Episode {i}: '{title}...' - Found {len(links)} links")
+            filter_start = time.perf_counter()
+            episode_domains = set()
+            
+            for link in links:
+                link = resolved.get(link) or link
+                host = extract_host(link)
+                
+                if not host:
+                    continue
+                
+                # Still on a redirector (resolution off or failed, or an interstitial page):
+                # the redirector's host is not the sponsor
+                if is_redirector_domain(host):
+                    metrics.inc("links_unresolved_dropped")
+                    continue
+                
+                # Skip trash domains (matched on the full host so exact rules can apply)
+                if is_trash_domain(host):
+                    metrics.inc("links_trash_filtered")
+                    continue
+                
+                domain = extract_root_domain(link)
+                if count and domain and domain not in episode_domains:
+                    episode_domains.add(domain)
+                    count_mention(fetched, domain, published)
                 
-                for link in links:
-                    domain = extract_root_domain(link)
-                    
-                    if not domain:
-                        continue
-                    
-                    # Skip trash domains
-                    if is_trash_domain(domain):
-                        continue
-                    
-                    # Save sponsor (handles duplicates internally)
-                    if save_sponsor(supabase, domain, link):
-                        sponsors_found += 1
+                # Save sponsor (handles duplicates internally)
+                if save_sponsor(writer, domain, link):
+                    sponsors_found += 1
+            
+            metrics.observe("filter", time.perf_counter() - filter_start)
+            writer.flush_if_due()
         
         print(f"   ✓ Found {sponsors_found} new sponsors from this feed")
+        metrics.inc("feeds", result="ok")
         return sponsors_found
     
     except Exception as e:
         print(f"  ❌ Error scraping feed: {e}")
+        metrics.inc("feeds", result="scrape_error")
+        # Keep the feed state untouched so the next run retries it
+        fetched.error = e
         return 0
+    finally:
+        if owns_writer and writer is not None:
+            writer.close()
+
+
+def count_mention(fetched: FetchedFeed, domain: str, published: Optional[float]):
+    """Count one episode of a feed linking to a sponsor domain."""
+    mention = fetched.mentions.get(domain)
+    if mention is None:
+        brand_name = extract_domain_name(domain)
+        if not brand_name:
+            return
+        mention = fetched.mentions[domain] = BrandMention(brand_name)
+    mention.add(published)
+
 
+def format_timestamp(timestamp: Optional[float]) -> Optional[str]:
+    return datetime.fromtimestamp(timestamp, timezone.utc).isoformat() if timestamp is not None else None
+
+
+def collect_mentions(processed_feeds: List[FetchedFeed]) -> List[dict]:
+    """
+    Merge the mention counts of all processed feeds into one row per (domain, feed).
+    Feeds that failed are left out, like their feed state, so the retry counts them once.
+    """
+    merged: Dict[Tuple[str, str], BrandMention] = {}
+    for fetched in processed_feeds:
+        if fetched.error is not None:
+            continue
+        for domain, mention in fetched.mentions.items():
+            total = merged.setdefault((domain, fetched.url), BrandMention(mention.brand_name))
+            total.mentions += mention.mentions
+            for published in (mention.first_seen, mention.last_seen):
+                if published is not None:
+                    total.first_seen = published if total.first_seen is None else min(total.first_seen, published)
+                    total.last_seen = published if total.last_seen is None else max(total.last_seen, published)
+    
+    return [
+        {
+            "domain": domain,
+            "feed_url": feed_url,
+            "brand_name": mention.brand_name,
+            "mentions": mention.mentions,
+            "first_seen_at": format_timestamp(mention.first_seen),
+            "last_seen_at": format_timestamp(mention.last_seen),
+        }
+        for (domain, feed_url), mention in merged.items()
+    ]
+
+
+def save_mentions(store: Store, processed_feeds: List[FetchedFeed]) -> bool:
+    """
+    Add this run's mention counts in one bulk upsert (one row per brand and feed).
+    Returns False if the write failed.
+    """
+    rows = collect_mentions(processed_feeds)
+    if not rows:
+        return True
+    
+    try:
+        with metrics.timer("save_mentions"):
+            written = store.upsert_brand_mentions(rows)
+    except Exception as e:
+        print(f"⚠ Error saving brand mentions: {e}")
+        return False
+    
+    metrics.inc("brand_mentions_written", written)
+    print(f"💾 Saved mention counts for {written} brand/feed pairs")
+    return True
+
+
+def detach_feed(fetched: FetchedFeed) -> FetchedFeed:
+    """
+    Copy of a processed feed without its episodes, small enough to keep for
+    thousands of feeds and to send between processes.
+    """
+    error = RuntimeError(str(fetched.error)) if fetched.error is not None else None
+    return replace(fetched, entries=None, error=error)
 
-def main():
+
+def scrape_in_process(feed_urls: List[str], writer: SponsorWriter, registry: BrandRegistry,
+                      feed_state: FeedStateStore, incremental: bool, max_episodes: int) -> Tuple[int, List[FetchedFeed]]:
+    """
+    Download feeds concurrently in this process and scrape each one as soon as it arrives.
+    Returns (new sponsors found, processed feeds).
+    """
+    total_sponsors = 0
+    fetcher = FeedFetcher(state=feed_state if incremental else None, max_items=max_episodes)
+    processed_feeds = []
+    
+    for fetched in fetcher.fetch_all(feed_urls):
+        print(f"\n{'=' * 60}")
+        
+        # Pick up brands inserted by other runs since the last load
+        try:
+            registry.refresh()
+        except Exception as e:
+            print(f"  ⚠ Brand registry refresh failed: {e}")
+        
+        state = feed_state.get(fetched.url)
+        sponsors = process_feed(fetched, max_episodes=max_episodes, writer=writer,
+                                watermark=state if incremental else None, counted=state)
+        total_sponsors += sponsors
+        processed_feeds.append(detach_feed(fetched))
+    
+    return total_sponsors, processed_feeds
+
+
+def run_worker(worker_id: str, shard: int, queue_path: str, incremental: bool, max_episodes: int,
+               storage_backend: str, db_path: str, results):
+    """
+    Worker process: lease feeds from the shared queue (own shard first, then expired leases),
+    scrape them, and send brands and feed state to the parent process.
+    Always ends with a ("done", worker_id, sponsors, trash hits, metrics snapshot) message.
+    """
+    sponsors_found = 0
+    leased: List[str] = []
+    feed_queue = None
+    feed_state = None
+    store = None
+    
+    try:
+        feed_queue = FeedQueue(Path(queue_path))
+        feed_state = FeedStateStore()
+        # Workers only read brands; the parent process does all writes
+        store = open_store(storage_backend, Path(db_path), supabase_factory=get_supabase_client)
+        registry = BrandRegistry(store)
+        registry.load()
+        writer = ForwardingSponsorWriter(registry, results)
+        fetcher = FeedFetcher(state=feed_state if incremental else None, max_items=max_episodes)
+        
+        while True:
+            leased = feed_queue.claim(worker_id, shard, FEED_QUEUE_BATCH, FEED_LEASE_SECONDS)
+            if not leased:
+                # Leases still held elsewhere come back if their worker dies (the parent
+                # releases them, or they expire), so only stop once nothing is left at all
+                if not feed_queue.has_unfinished():
+                    break
+                time.sleep(FEED_QUEUE_POLL)
+                continue
+            
+            try:
+                registry.refresh()
+            except Exception as e:
+                print(f"  ⚠ [{worker_id}] Brand registry refresh failed: {e}")
+            
+            for fetched in fetcher.fetch_all(leased):
+                state = feed_state.get(fetched.url)
+                sponsors_found += process_feed(fetched, max_episodes=max_episodes, writer=writer,
+                                               watermark=state if incremental else None, counted=state)
+                results.put(("feed", detach_feed(fetched)))
+                # The parent completes the feed once its brands and state are saved. Failed feeds
+                # are done for this round too; their state isn't saved, so the next round retries them
+                feed_queue.mark_processed(fetched.url, worker_id)
+                leased.remove(fetched.url)
+    except Exception as e:
+        print(f"❌ [{worker_id}] Worker stopped: {e}")
+    finally:
+        if feed_queue is not None:
+            # Hand back unfinished feeds right away instead of waiting for the lease to expire
+            for url in leased:
+                feed_queue.release(url, worker_id)
+            feed_queue.close()
+        if feed_state is not None:
+            feed_state.close()
+        if store is not None:
+            store.close()
+        close_link_parse_cache()
+        close_link_resolver()
+        trash_hits = dict(_trash_rules.hits) if _trash_rules is not None else {}
+        results.put(("done", worker_id, sponsors_found, trash_hits, metrics.snapshot()))
+
+
+def scrape_sharded(feed_urls: List[str], writer: SponsorWriter, trash_rules: DomainRuleSet, incremental: bool,
+                   max_episodes: int, workers: int, shards: int, first_shard: int, queue_path: Path,
+                   storage_backend: str, db_path: Path) -> Tuple[int, List[FetchedFeed]]:
+    """
+    Scrape feeds with worker processes sharing a SQLite work queue.
+    Feeds are assigned to shards by consistent hashing of their URL; worker i works on
+    shard first_shard + i, so several machines can split the shards, each with its own queue
+    file holding only its shards. Idle workers take over feeds of the other local shards.
+    This process is the single writer: workers send brands here and they're batched by writer.
+    Feeds stay processed in the queue until finish_queued_feeds() records the save.
+    Returns (new sponsors found, processed feeds).
+    """
+    worker_shards = {f"{os.uname().nodename}-{os.getpid()}-w{i}": (first_shard + i) % shards for i in range(workers)}
+    feed_queue = FeedQueue(queue_path)
+    queued = feed_queue.enqueue(feed_urls, shards, requeue_after=FEED_REQUEUE_AFTER,
+                                shards=set(worker_shards.values()))
+    counts = feed_queue.counts()
+    print(f"\n📋 Feed queue {queue_path}: {queued} feeds queued, "
+          f"{counts.get('pending', 0)} pending, {counts.get('leased', 0)} leased, {counts.get('done', 0)} done")
+    
+    # spawn: workers must not inherit this process's threads or database connections
+    context = multiprocessing.get_context("spawn")
+    results = context.Queue()
+    processes = {}
+    for worker_id, shard in worker_shards.items():
+        process = context.Process(
+            target=run_worker,
+            args=(worker_id, shard, str(queue_path), incremental, max_episodes, storage_backend, str(db_path), results),
+            daemon=True
+        )
+        process.start()
+        processes[worker_id] = process
+        print(f"✓ Started worker {worker_id} on shard {shard}/{shards}")
+    
+    total_sponsors = 0
+    processed_feeds = []
+    remaining = len(processes)
+    
+    finished = set()
+    while remaining:
+        try:
+            message = results.get(timeout=1)
+        except Empty:
+            writer.flush_if_due()
+            # Hand the leases of crashed workers to the others right away
+            for worker_id, process in processes.items():
+                if worker_id not in finished and not process.is_alive():
+                    finished.add(worker_id)
+                    released = feed_queue.release_owner(worker_id)
+                    if released:
+                        print(f"⚠ Worker {worker_id} stopped; its {released} leased feed(s) are queued again")
+            if not any(process.is_alive() for process in processes.values()):
+                print(f"⚠ {remaining} worker(s) exited without reporting")
+                break
+            continue
+        
+        kind = message[0]
+        if kind == "brand":
+            writer.add(message[1], message[2])
+        elif kind == "feed":
+            processed_feeds.append(message[1])
+        elif kind == "done":
+            finished.add(message[1])
+            remaining -= 1
+            total_sponsors += message[2]
+            trash_rules.hits.update(message[3])
+            metrics.merge(message[4])
+    
+    for process in processes.values():
+        process.join()
+    feed_queue.close()
+    return total_sponsors, processed_feeds
+
+
+def finish_queued_feeds(queue_path: Path, processed_feeds: List[FetchedFeed], saved: bool):
+    """
+    Complete the feeds workers processed once their brands and state are saved,
+    or put them back in the queue if the save failed.
+    """
+    urls = [fetched.url for fetched in processed_feeds]
+    feed_queue = FeedQueue(queue_path)
+    try:
+        if saved:
+            feed_queue.complete(urls)
+        else:
+            feed_queue.requeue(urls)
+    finally:
+        feed_queue.close()
+
+
+def parse_args(argv: Optional[List[str]] = None) -> argparse.Namespace:
+    """Parse command line arguments."""
+    parser = argparse.ArgumentParser(description="Find podcast sponsors from links in RSS show notes.")
+    parser.add_argument(
+        "--max-episodes", type=int, default=MAX_EPISODES,
+        help=f"newest episodes to consider per feed (default: {MAX_EPISODES})"
+    )
+    parser.add_argument(
+        "--backfill", type=int, default=0, metavar="N",
+        help="process the newest N episodes of every feed, ignoring the cache and watermarks"
+    )
+    parser.add_argument(
+        "--full", action="store_true",
+        help="ignore the feed cache and watermarks and reprocess the whole episode window"
+    )
+    parser.add_argument(
+        "--feeds", type=Path, metavar="FILE",
+        help="OPML file or text file with one feed URL per line (default: built-in feed list)"
+    )
+    parser.add_argument(
+        "--workers", type=int, default=SCRAPE_WORKERS,
+        help=f"worker processes; more than 1 uses the shared feed queue (default: {SCRAPE_WORKERS})"
+    )
+    parser.add_argument(
+        "--shards", type=int, default=0,
+        help="total shards across all machines splitting the feeds (default: --workers)"
+    )
+    parser.add_argument(
+        "--first-shard", type=int, default=0, metavar="K",
+        help="shard handled by this machine's first worker (default: 0)"
+    )
+    parser.add_argument(
+        "--queue", type=Path, metavar="PATH",
+        help="feed queue database shared by this machine's workers (default: .sponsorfinder/feed_queue.db)"
+    )
+    add_storage_arguments(parser)
+    add_metrics_arguments(parser)
+    return parser.parse_args(argv)
+
+
+def main(argv: Optional[List[str]] = None):
     """Main function to run the scraper."""
+    args = parse_args(argv)
+    with profiled(profile_path(args, "scraper")):
+        run(args)
+    
+    try:
+        prom_path, json_path = metrics.write(args.metrics_dir)
+        print(f"📊 Metrics written to {prom_path} and {json_path.name}")
+    except OSError as e:
+        print(f"⚠ Could not write metrics: {e}")
+
+
+def run(args: argparse.Namespace):
+    """Run the scraper with parsed command line arguments."""
+    incremental = not (args.full or args.backfill)
+    max_episodes = args.backfill or args.max_episodes
+    workers = max(1, args.workers)
+    sharded = workers > 1 or args.queue is not None
+    
     print("=" * 60)
     print("SponsorFinder - Link Extraction Strategy")
     print("The 'Link Detective' - Finding sponsors from RSS feed links")
@@ -350,32 +1193,118 @@ def main():
         print("  Install with: pip install feedparser")
         return
     
-    if not BEAUTIFULSOUP_AVAILABLE:
-        print("❌ BeautifulSoup library not installed!")
-        print("  Install with: pip install beautifulsoup4")
+    if not REQUESTS_AVAILABLE:
+        print("❌ requests library not installed!")
+        print("  Install with: pip install requests")
         return
     
-    # Check Supabase connection
+    # Load the feed list
+    if args.feeds:
+        try:
+            feed_urls = load_feed_urls(args.feeds)
+            print(f"✓ Loaded {len(feed_urls)} feeds from {args.feeds}")
+        except Exception as e:
+            print(f"❌ Could not load feeds from {args.feeds}: {e}")
+            return
+    else:
+        feed_urls = PODCAST_RSS_FEEDS
+    
+    # Load trash filter rules
     try:
-        supabase = get_supabase_client()
-        print("✓ Supabase connection successful")
+        trash_rules = get_trash_rules()
+        print(f"✓ Loaded {len(trash_rules)} trash filter rules from {TRASH_RULES_PATH.name}")
+    except OSError as e:
+        print(f"❌ Could not load trash filter rules: {e}")
+        return
+    
+    # Open the brand store (Supabase, or a local SQLite file)
+    try:
+        store = open_store(args.storage, args.db, dry_run=args.dry_run, supabase_factory=get_supabase_client)
+        print(f"✓ Storage: {store.name}" + (f" ({args.db})" if args.storage == "sqlite" else ""))
     except Exception as e:
-        print(f"❌ Supabase connection failed: {e}")
+        print(f"❌ Storage connection failed: {e}")
         return
     
-    # Scrape each feed
-    total_sponsors = 0
+    # Load existing brands once for in-memory duplicate checks
+    registry = BrandRegistry(store)
+    try:
+        registry.load()
+        print(f"✓ Loaded {len(registry)} existing brands")
+    except Exception as e:
+        print(f"❌ Failed to load existing brands: {e}")
+        return
     
-    for rss_url in PODCAST_RSS_FEEDS:
-        print(f"\n{'=' * 60}")
-        sponsors = scrape_feed(rss_url, max_episodes=50)
-        total_sponsors += sponsors
+    writer = SponsorWriter(store, registry)
+    feed_state = FeedStateStore()
+    
+    if args.backfill:
+        print(f"\n⏪ Backfill: processing the newest {args.backfill} episodes of every feed")
+    elif args.full:
+        print("\n🔁 Full run: ignoring feed cache and watermarks")
+    
+    if args.dry_run:
+        print("\n🧪 Dry run: nothing will be written, feed state is left untouched")
+    
+    if sharded:
+        queue_path = args.queue or state_path("feed_queue.db")
+        if args.dry_run and args.queue is None:
+            # Keep the real queue's done/pending bookkeeping out of dry runs
+            queue_path = state_path("feed_queue.dry-run.db")
+            queue_path.unlink(missing_ok=True)
+        total_sponsors, processed_feeds = scrape_sharded(
+            feed_urls, writer, trash_rules, incremental, max_episodes,
+            workers=workers,
+            shards=args.shards or workers,
+            first_shard=args.first_shard,
+            queue_path=queue_path,
+            storage_backend=args.storage,
+            db_path=args.db
+        )
+    else:
+        total_sponsors, processed_feeds = scrape_in_process(
+            feed_urls, writer, registry, feed_state, incremental, max_episodes
+        )
+    
+    writer.flush()
+    # The store is closed below, so the exit hook must not write to it
+    atexit.unregister(writer.flush)
+    
+    # Only remember feeds as seen once their brands and mention counts are safely written
+    # (and never in a dry run): the watermarks are what keep the next run from counting
+    # these episodes again, and a failed save leaves them uncounted for the retry
+    saved = False
+    if writer.failed_batches == 0:
+        if save_mentions(store, processed_feeds):
+            saved = True
+            if not args.dry_run:
+                for fetched in processed_feeds:
+                    save_feed_state(feed_state, fetched)
+        else:
+            print("⚠ Brand mentions failed to save; feeds will be re-scraped next run")
+    else:
+        print("⚠ Some brand batches failed to save; feeds will be re-scraped next run")
+    if sharded:
+        finish_queued_feeds(queue_path, processed_feeds, saved)
+    feed_state.close()
+    store.close()
+    resolver = _link_resolver
+    close_link_parse_cache()
+    close_link_resolver()
     
     # Print summary
     print(f"\n{'=' * 60}")
     print("Scraping Complete!")
     print(f"{'=' * 60}")
+    print(f"Feeds processed: {len(processed_feeds)}")
     print(f"Total new sponsors found: {total_sponsors}")
+    inserted_label = "Brands that would be inserted (dry run)" if args.dry_run else "Brands inserted"
+    print(f"{inserted_label}: {writer.inserted_total} (skipped as duplicates: {writer.skipped_total})")
+    print()
+    trash_rules.report()
+    if resolver is not None:
+        resolver.report()
+    report_link_parse_cache()
+    metrics.report()
 
 
 if __name__ == "__main__":
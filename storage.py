@@ -0,0 +1,537 @@
+#!/usr/bin/env python3
+"""
+SponsorFinder storage - the brands/contacts reads and writes used by the scraper and the enricher.
+SupabaseStore talks to the production database; SQLiteStore keeps the same tables in a local
+file for fast experiments and offline runs. DryRunStore wraps either one and discards writes.
+
+SQLite data can be exported as JSONL and bulk-loaded into Postgres with COPY:
+    python storage.py export --db .sponsorfinder/sponsorfinder.db --out export/
+    psql "$DATABASE_URL" -v dir="$PWD/export" -f supabase/load_jsonl.sql
+"""
+
+import os
+import json
+import uuid
+import argparse
+import threading
+from abc import ABC, abstractmethod
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import Callable, Dict, Iterator, List, Optional
+
+from local_state import connect, state_path
+
+
+# Default backend: "supabase" or "sqlite" (override per run with --storage)
+STORAGE_BACKEND = os.getenv("SPONSORFINDER_STORAGE", "supabase")
+
+# Local database used by the sqlite backend (override per run with --db)
+SQLITE_PATH = Path(os.getenv("SPONSORFINDER_DB") or state_path("sponsorfinder.db"))
+
+STORAGE_BACKENDS = ("supabase", "sqlite")
+
+
+def utc_now() -> str:
+    return datetime.now(timezone.utc).isoformat()
+
+
+class Store(ABC):
+    """
+    Storage interface shared by the scraper and the enricher.
+    Brand rows are dicts with at least id, name and created_at.
+    """
+    
+    name = "store"
+
+    @abstractmethod
+    def iter_brand_pages(self, since: Optional[str] = None, page_size: int = 1000) -> Iterator[List[dict]]:
+        """Yield pages of brands (id, name, created_at) ordered by created_at, id; only rows at or after since."""
+
+    @abstractmethod
+    def insert_brands(self, brands: List[dict]) -> List[dict]:
+        """Insert brands, skipping names that already exist (case-insensitive). Returns the inserted rows."""
+
+    @abstractmethod
+    def iter_brands_without_contacts(self, page_size: int = 1000, by_mentions: bool = False) -> Iterator[List[dict]]:
+        """
+        Yield pages of brands (id, name, website_url) that have a website but no contacts yet.
+        Pages are ordered by id and each one starts after the last id of the previous page.
+        With by_mentions they are ordered most mentioned first instead (podcast mentions, then
+        the latest mention, then id) and rows also have mentions and last_seen_at.
+        """
+
+    @abstractmethod
+    def insert_contacts(self, contacts: List[dict]) -> List[dict]:
+        """
+        Insert contacts (brand_id, email, name, role) in one call, skipping any whose
+        (brand_id, lowercased email) already exists. Returns the inserted rows.
+        """
+
+    @abstractmethod
+    def mark_brands_checked(self, brand_ids: List[str]) -> int:
+        """Touch the brands' updated_at in one update so processed brands can be tracked. Returns rows updated."""
+
+    @abstractmethod
+    def upsert_brand_mentions(self, mentions: List[dict]) -> int:
+        """
+        Add mention counts keyed by (domain, feed_url) in one call: counts are added to the
+        stored ones and first/last seen are widened, never replaced. Callers only pass episodes
+        not counted before (see the feed watermarks in scraper.py). Returns the number of rows written.
+        """
+
+    def close(self):
+        pass
+
+
+class SupabaseStore(Store):
+    """Store backed by Supabase (PostgREST tables and the RPCs from supabase/migrations)."""
+    
+    name = "supabase"
+
+    def __init__(self, supabase):
+        self.supabase = supabase
+
+    def iter_brand_pages(self, since: Optional[str] = None, page_size: int = 1000) -> Iterator[List[dict]]:
+        start = 0
+        while True:
+            query = self.supabase.table("brands").select("id, name, created_at")
+            if since:
+                query = query.gte("created_at", since)
+            
+            response = query.order("created_at").order("id").range(start, start + page_size - 1).execute()
+            rows = response.data or []
+            yield rows
+            
+            if len(rows) < page_size:
+                break
+            start += page_size
+
+    def insert_brands(self, brands: List[dict]) -> List[dict]:
+        response = self.supabase.rpc("insert_brands_ignore_duplicates", {"new_brands": brands}).execute()
+        return response.data or []
+
+    def iter_brands_without_contacts(self, page_size: int = 1000, by_mentions: bool = False) -> Iterator[List[dict]]:
+        # Filtered (and ranked) in the database (migrations 006 and 008); keyset pages stay cheap however deep they go
+        last = {}
+        while True:
+            if by_mentions:
+                response = self.supabase.rpc("brands_without_contacts_by_mentions", {
+                    "after_mentions": last.get("mentions"),
+                    "after_last_seen": last.get("last_seen_at"),
+                    "after_id": last.get("id"),
+                    "page_size": page_size,
+                }).execute()
+            else:
+                response = self.supabase.rpc(
+                    "brands_without_contacts", {"after_id": last.get("id"), "page_size": page_size}
+                ).execute()
+            rows = response.data or []
+            if rows:
+                yield rows
+            
+            if len(rows) < page_size:
+                break
+            last = rows[-1]
+
+    def insert_contacts(self, contacts: List[dict]) -> List[dict]:
+        if not contacts:
+            return []
+        # Duplicates are skipped by the (brand_id, LOWER(email)) unique index (migration 007)
+        response = self.supabase.rpc("insert_contacts_ignore_duplicates", {"new_contacts": contacts}).execute()
+        return response.data or []
+
+    def mark_brands_checked(self, brand_ids: List[str]) -> int:
+        if not brand_ids:
+            return 0
+        response = self.supabase.table("brands").update({"updated_at": utc_now()}).in_("id", brand_ids).execute()
+        return len(response.data or [])
+
+    def upsert_brand_mentions(self, mentions: List[dict]) -> int:
+        if not mentions:
+            return 0
+        response = self.supabase.rpc("upsert_brand_mentions", {"new_mentions": mentions}).execute()
+        return response.data or 0
+
+
+class SQLiteStore(Store):
+    """
+    Store backed by a local SQLite file with the same brands/contacts columns as Postgres.
+    Case-insensitive brand uniqueness uses a name_key column (Python lower(), which unlike
+    SQLite's lower() also folds non-ASCII letters).
+    """
+    
+    name = "sqlite"
+
+    def __init__(self, path: Optional[Path] = None):
+        self.path = Path(path or SQLITE_PATH)
+        self._lock = threading.Lock()
+        self._conn = connect(self.path)
+        # Python lower(), as used for name_key, for grouping mentions by brand in SQL
+        self._conn.create_function("py_lower", 1, lambda value: value.lower() if value is not None else None,
+                                   deterministic=True)
+        with self._conn:
+            self._conn.execute("PRAGMA foreign_keys=ON")
+            self._conn.executescript("""
+                CREATE TABLE IF NOT EXISTS brands (
+                    id TEXT PRIMARY KEY,
+                    name TEXT NOT NULL,
+                    name_key TEXT NOT NULL,
+                    category TEXT NOT NULL,
+                    website_url TEXT,
+                    logo_url TEXT,
+                    is_active INTEGER DEFAULT 1,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                CREATE UNIQUE INDEX IF NOT EXISTS idx_brands_name_key ON brands (name_key);
+                CREATE INDEX IF NOT EXISTS idx_brands_created_at ON brands (created_at, id);
+                
+                CREATE TABLE IF NOT EXISTS contacts (
+                    id TEXT PRIMARY KEY,
+                    brand_id TEXT NOT NULL REFERENCES brands(id) ON DELETE CASCADE,
+                    email TEXT NOT NULL,
+                    name TEXT,
+                    role TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL
+                );
+                CREATE INDEX IF NOT EXISTS idx_contacts_brand_id ON contacts (brand_id);
+                
+                CREATE TABLE IF NOT EXISTS brand_mentions (
+                    domain TEXT NOT NULL,
+                    feed_url TEXT NOT NULL,
+                    brand_name TEXT NOT NULL,
+                    mentions INTEGER NOT NULL DEFAULT 0,
+                    first_seen_at TEXT,
+                    last_seen_at TEXT,
+                    created_at TEXT NOT NULL,
+                    updated_at TEXT NOT NULL,
+                    PRIMARY KEY (domain, feed_url)
+                );
+            """)
+            has_unique_emails = self._conn.execute(
+                "SELECT 1 FROM sqlite_master WHERE type = 'index' AND name = 'idx_contacts_brand_email_unique'"
+            ).fetchone()
+            if not has_unique_emails:
+                # Files written before the index existed may hold duplicates; keep the oldest of each
+                self._conn.execute("""
+                    DELETE FROM contacts WHERE rowid NOT IN (
+                        SELECT MIN(rowid) FROM contacts GROUP BY brand_id, lower(email)
+                    )
+                """)
+                self._conn.execute(
+                    "CREATE UNIQUE INDEX idx_contacts_brand_email_unique ON contacts (brand_id, lower(email))"
+                )
+
+    def iter_brand_pages(self, since: Optional[str] = None, page_size: int = 1000) -> Iterator[List[dict]]:
+        # Keyset pagination: each page starts after the last (created_at, id) seen
+        after = (since, "") if since else ("", "")
+        while True:
+            with self._lock:
+                rows = self._conn.execute("""
+                    SELECT id, name, created_at FROM brands
+                    WHERE (created_at, id) >= (?, ?)
+                    ORDER BY created_at, id LIMIT ?
+                """, (after[0], after[1], page_size)).fetchall()
+            page = [dict(row) for row in rows]
+            yield page
+            
+            if len(page) < page_size:
+                break
+            after = (page[-1]["created_at"], page[-1]["id"] + "\0")
+
+    def insert_brands(self, brands: List[dict]) -> List[dict]:
+        now = utc_now()
+        rows = [
+            {
+                "id": str(uuid.uuid4()),
+                "name": brand["name"],
+                "category": brand.get("category") or "",
+                "website_url": brand.get("website_url"),
+                "is_active": 1 if brand.get("is_active", True) else 0,
+                "created_at": now,
+                "updated_at": now,
+            }
+            for brand in brands
+        ]
+        inserted = []
+        with self._lock, self._conn:
+            for row in rows:
+                cursor = self._conn.execute("""
+                    INSERT INTO brands (id, name, name_key, category, website_url, is_active, created_at, updated_at)
+                    VALUES (:id, :name, :name_key, :category, :website_url, :is_active, :created_at, :updated_at)
+                    ON CONFLICT DO NOTHING
+                """, dict(row, name_key=row["name"].lower()))
+                if cursor.rowcount:
+                    inserted.append(row)
+        return inserted
+
+    def iter_brands_without_contacts(self, page_size: int = 1000, by_mentions: bool = False) -> Iterator[List[dict]]:
+        if by_mentions:
+            yield from self._iter_brands_without_contacts_by_mentions(page_size)
+            return
+        
+        after_id = ""
+        while True:
+            with self._lock:
+                rows = self._conn.execute("""
+                    SELECT b.id, b.name, b.website_url FROM brands b
+                    WHERE b.id > ? AND b.website_url IS NOT NULL AND b.website_url <> ''
+                      AND NOT EXISTS (SELECT 1 FROM contacts c WHERE c.brand_id = b.id)
+                    ORDER BY b.id LIMIT ?
+                """, (after_id, page_size)).fetchall()
+            page = [dict(row) for row in rows]
+            if page:
+                yield page
+            
+            if len(page) < page_size:
+                break
+            after_id = page[-1]["id"]
+
+    def _iter_brands_without_contacts_by_mentions(self, page_size: int) -> Iterator[List[dict]]:
+        # Same ranking as migration 008. The per-brand totals are materialized once per run
+        # (grouped by py_lower() to match name_key) rather than aggregated again for every page
+        with self._lock, self._conn:
+            self._conn.executescript("""
+                DROP TABLE IF EXISTS temp.brand_mention_counts;
+                CREATE TEMP TABLE brand_mention_counts AS
+                    SELECT py_lower(brand_name) AS brand_key, SUM(mentions) AS mentions,
+                           MAX(last_seen_at) AS last_seen_at
+                    FROM brand_mentions GROUP BY py_lower(brand_name);
+                CREATE UNIQUE INDEX temp.idx_brand_mention_counts_key ON brand_mention_counts (brand_key);
+            """)
+        last = None
+        while True:
+            with self._lock:
+                rows = self._conn.execute("""
+                    WITH ranked AS (
+                        SELECT b.id, b.name, b.website_url, COALESCE(t.mentions, 0) AS mentions,
+                               t.last_seen_at, COALESCE(t.last_seen_at, '') AS seen_key
+                        FROM brands b LEFT JOIN temp.brand_mention_counts t ON t.brand_key = b.name_key
+                        WHERE b.website_url IS NOT NULL AND b.website_url <> ''
+                          AND NOT EXISTS (SELECT 1 FROM contacts c WHERE c.brand_id = b.id)
+                    )
+                    SELECT id, name, website_url, mentions, last_seen_at FROM ranked
+                    WHERE :after_id IS NULL
+                       OR mentions < :mentions
+                       OR (mentions = :mentions AND seen_key < :seen_key)
+                       OR (mentions = :mentions AND seen_key = :seen_key AND id > :after_id)
+                    ORDER BY mentions DESC, seen_key DESC, id LIMIT :page_size
+                """, {
+                    "after_id": last and last["id"],
+                    "mentions": last and last["mentions"],
+                    "seen_key": last and (last["last_seen_at"] or ""),
+                    "page_size": page_size,
+                }).fetchall()
+            page = [dict(row) for row in rows]
+            if page:
+                yield page
+            
+            if len(page) < page_size:
+                break
+            last = page[-1]
+
+    def insert_contacts(self, contacts: List[dict]) -> List[dict]:
+        now = utc_now()
+        inserted = []
+        with self._lock, self._conn:
+            for contact in contacts:
+                row = {
+                    "id": str(uuid.uuid4()),
+                    "brand_id": contact["brand_id"],
+                    "email": contact["email"],
+                    "name": contact.get("name"),
+                    "role": contact.get("role"),
+                    "created_at": now,
+                    "updated_at": now,
+                }
+                cursor = self._conn.execute("""
+                    INSERT INTO contacts (id, brand_id, email, name, role, created_at, updated_at)
+                    VALUES (:id, :brand_id, :email, :name, :role, :created_at, :updated_at)
+                    ON CONFLICT DO NOTHING
+                """, row)
+                if cursor.rowcount > 0:
+                    inserted.append(row)
+        return inserted
+
+    def mark_brands_checked(self, brand_ids: List[str]) -> int:
+        if not brand_ids:
+            return 0
+        placeholders = ",".join("?" * len(brand_ids))
+        with self._lock, self._conn:
+            cursor = self._conn.execute(
+                f"UPDATE brands SET updated_at = ? WHERE id IN ({placeholders})", (utc_now(), *brand_ids)
+            )
+        return cursor.rowcount
+
+    def upsert_brand_mentions(self, mentions: List[dict]) -> int:
+        now = utc_now()
+        # min()/max() with a NULL argument return NULL in SQLite, so undated sides are skipped explicitly
+        query = """
+            INSERT INTO brand_mentions (domain, feed_url, brand_name, mentions, first_seen_at, last_seen_at, created_at, updated_at)
+            VALUES (:domain, :feed_url, :brand_name, :mentions, :first_seen_at, :last_seen_at, :now, :now)
+            ON CONFLICT (domain, feed_url) DO UPDATE SET
+                brand_name = excluded.brand_name,
+                mentions = brand_mentions.mentions + excluded.mentions,
+                first_seen_at = min(coalesce(brand_mentions.first_seen_at, excluded.first_seen_at),
+                                    coalesce(excluded.first_seen_at, brand_mentions.first_seen_at)),
+                last_seen_at = max(coalesce(brand_mentions.last_seen_at, excluded.last_seen_at),
+                                   coalesce(excluded.last_seen_at, brand_mentions.last_seen_at)),
+                updated_at = excluded.updated_at
+        """
+        with self._lock, self._conn:
+            self._conn.executemany(query, [dict(mention, now=now) for mention in mentions])
+        return len(mentions)
+
+    def export_jsonl(self, out_dir: Path) -> Dict[str, int]:
+        """
+        Write brands.jsonl, contacts.jsonl and brand_mentions.jsonl (one JSON object per line, Postgres column names).
+        Returns the number of rows written per table.
+        """
+        out_dir = Path(out_dir)
+        out_dir.mkdir(parents=True, exist_ok=True)
+        queries = {
+            "brands": """
+                SELECT id, name, category, website_url, logo_url, is_active, created_at, updated_at
+                FROM brands ORDER BY created_at, id
+            """,
+            "contacts": """
+                SELECT id, brand_id, email, name, role, created_at, updated_at
+                FROM contacts ORDER BY created_at, id
+            """,
+            "brand_mentions": """
+                SELECT domain, feed_url, brand_name, mentions, first_seen_at, last_seen_at, created_at, updated_at
+                FROM brand_mentions ORDER BY domain, feed_url
+            """,
+        }
+        
+        counts = {}
+        for table, query in queries.items():
+            count = 0
+            with self._lock, open(out_dir / f"{table}.jsonl", "w", encoding="utf-8") as f:
+                for row in self._conn.execute(query):
+                    record = dict(row)
+                    if "is_active" in record:
+                        record["is_active"] = bool(record["is_active"])
+                    f.write(json.dumps(record, ensure_ascii=False) + "\n")
+                    count += 1
+            counts[table] = count
+        return counts
+
+    def close(self):
+        with self._lock:
+            self._conn.close()
+
+
+class DryRunStore(Store):
+    """
+    Reads from the wrapped store but only pretends to write.
+    Inserts are de-duplicated in memory so the run behaves as if they had been saved.
+    """
+
+    def __init__(self, store: Store):
+        self.store = store
+        self.name = f"{store.name}, dry run"
+        self._brand_keys = set()
+        self._contact_keys = set()
+        self.brands_written = 0
+        self.contacts_written = 0
+        self.mentions_written = 0
+
+    def iter_brand_pages(self, since: Optional[str] = None, page_size: int = 1000) -> Iterator[List[dict]]:
+        for page in self.store.iter_brand_pages(since, page_size):
+            self._brand_keys.update(row["name"].lower() for row in page)
+            yield page
+
+    def insert_brands(self, brands: List[dict]) -> List[dict]:
+        inserted = []
+        for brand in brands:
+            key = brand["name"].lower()
+            if key in self._brand_keys:
+                continue
+            self._brand_keys.add(key)
+            inserted.append(dict(brand, id=f"dry-run-{uuid.uuid4()}", created_at=None))
+        self.brands_written += len(inserted)
+        return inserted
+
+    def iter_brands_without_contacts(self, page_size: int = 1000, by_mentions: bool = False) -> Iterator[List[dict]]:
+        return self.store.iter_brands_without_contacts(page_size, by_mentions)
+
+    def insert_contacts(self, contacts: List[dict]) -> List[dict]:
+        inserted = []
+        for contact in contacts:
+            key = (contact["brand_id"], contact["email"].lower())
+            if key in self._contact_keys:
+                continue
+            self._contact_keys.add(key)
+            inserted.append(dict(contact, id=f"dry-run-{uuid.uuid4()}"))
+        self.contacts_written += len(inserted)
+        return inserted
+
+    def mark_brands_checked(self, brand_ids: List[str]) -> int:
+        return len(brand_ids)
+
+    def upsert_brand_mentions(self, mentions: List[dict]) -> int:
+        self.mentions_written += len(mentions)
+        return len(mentions)
+
+    def close(self):
+        self.store.close()
+
+
+def open_store(backend: str = STORAGE_BACKEND, path: Optional[Path] = None, dry_run: bool = False,
+               supabase_factory: Optional[Callable] = None) -> Store:
+    """
+    Open the configured store.
+    supabase_factory creates the Supabase client (each script passes its get_supabase_client).
+    """
+    if backend == "sqlite":
+        store: Store = SQLiteStore(path)
+    elif backend == "supabase":
+        if supabase_factory is None:
+            raise ValueError("Supabase backend needs a client factory")
+        store = SupabaseStore(supabase_factory())
+    else:
+        raise ValueError(f"Unknown storage backend '{backend}' (choose from {', '.join(STORAGE_BACKENDS)})")
+    
+    return DryRunStore(store) if dry_run else store
+
+
+def add_storage_arguments(parser: argparse.ArgumentParser):
+    """Add the --storage/--db/--dry-run options shared by both scripts."""
+    parser.add_argument(
+        "--storage", choices=STORAGE_BACKENDS, default=STORAGE_BACKEND,
+        help=f"where brands and contacts are read and written (default: {STORAGE_BACKEND})"
+    )
+    parser.add_argument(
+        "--db", type=Path, default=SQLITE_PATH, metavar="PATH",
+        help=f"SQLite database for --storage sqlite (default: {SQLITE_PATH})"
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true",
+        help="read from the store but don't write anything"
+    )
+
+
+def main():
+    """Command line: export a local SQLite store as JSONL for COPY into Postgres."""
+    parser = argparse.ArgumentParser(description="SponsorFinder local storage tools.")
+    subcommands = parser.add_subparsers(dest="command", required=True)
+    export = subcommands.add_parser("export", help="write brands.jsonl, contacts.jsonl and brand_mentions.jsonl")
+    export.add_argument("--db", type=Path, default=SQLITE_PATH, help=f"SQLite database (default: {SQLITE_PATH})")
+    export.add_argument("--out", type=Path, default=Path("export"), help="output directory (default: export/)")
+    args = parser.parse_args()
+    
+    if not args.db.exists():
+        print(f"❌ No database at {args.db}")
+        return
+    
+    store = SQLiteStore(args.db)
+    counts = store.export_jsonl(args.out)
+    store.close()
+    print(f"💾 Exported {counts['brands']} brands, {counts['contacts']} contacts and "
+          f"{counts['brand_mentions']} brand mention counts to {args.out}/")
+
+
+if __name__ == "__main__":
+    main()
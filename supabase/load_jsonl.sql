@@ -0,0 +1,42 @@
+-- Bulk-load a JSONL export of a local SponsorFinder store (python storage.py export) into Postgres.
+--
+--   psql "$DATABASE_URL" -v dir="$PWD/export" -f supabase/load_jsonl.sql
+--
+-- Each line is loaded whole into a JSONB column with COPY (CSV mode with quote and delimiter
+-- characters that never occur in JSON, so backslash escapes are left alone), then mapped
+-- onto the tables. Brands whose name already exists (case-insensitively) are skipped and their
+-- contacts are attached to the existing brand (skipping emails it already has, see migration 007).
+-- Mention counts are added to existing ones.
+
+\set ON_ERROR_STOP on
+\set brands_file :dir '/brands.jsonl'
+\set contacts_file :dir '/contacts.jsonl'
+\set mentions_file :dir '/brand_mentions.jsonl'
+
+BEGIN;
+
+CREATE TEMP TABLE import_brands (doc JSONB) ON COMMIT DROP;
+CREATE TEMP TABLE import_contacts (doc JSONB) ON COMMIT DROP;
+CREATE TEMP TABLE import_mentions (doc JSONB) ON COMMIT DROP;
+
+\copy import_brands (doc) FROM :'brands_file' WITH (FORMAT csv, QUOTE E'\x01', DELIMITER E'\x02')
+\copy import_contacts (doc) FROM :'contacts_file' WITH (FORMAT csv, QUOTE E'\x01', DELIMITER E'\x02')
+\copy import_mentions (doc) FROM :'mentions_file' WITH (FORMAT csv, QUOTE E'\x01', DELIMITER E'\x02')
+
+INSERT INTO brands (id, name, category, website_url, logo_url, is_active, created_at, updated_at)
+SELECT b.id, b.name, b.category, b.website_url, b.logo_url, COALESCE(b.is_active, true), b.created_at, b.updated_at
+FROM import_brands i
+CROSS JOIN LATERAL jsonb_populate_record(NULL::brands, i.doc) AS b
+ON CONFLICT DO NOTHING;
+
+INSERT INTO contacts (id, brand_id, email, name, role, created_at, updated_at)
+SELECT c.id, brands.id, c.email, c.name, c.role, c.created_at, c.updated_at
+FROM import_contacts i
+CROSS JOIN LATERAL jsonb_populate_record(NULL::contacts, i.doc) AS c
+JOIN import_brands ib ON (ib.doc->>'id')::UUID = c.brand_id
+JOIN brands ON LOWER(brands.name) = LOWER(ib.doc->>'name')
+ON CONFLICT DO NOTHING;
+
+SELECT upsert_brand_mentions(COALESCE(jsonb_agg(doc), '[]'::JSONB)) FROM import_mentions;
+
+COMMIT;
@@ -0,0 +1,41 @@
+-- Merge case-insensitive duplicate brands before enforcing uniqueness.
+-- Contacts are moved to the oldest brand of each name, then the extra brands are removed.
+WITH ranked AS (
+  SELECT
+    id,
+    FIRST_VALUE(id) OVER (PARTITION BY LOWER(name) ORDER BY created_at, id) AS keep_id
+  FROM brands
+)
+UPDATE contacts
+SET brand_id = ranked.keep_id
+FROM ranked
+WHERE contacts.brand_id = ranked.id
+  AND ranked.id <> ranked.keep_id;
+
+WITH ranked AS (
+  SELECT
+    id,
+    FIRST_VALUE(id) OVER (PARTITION BY LOWER(name) ORDER BY created_at, id) AS keep_id
+  FROM brands
+)
+DELETE FROM brands
+USING ranked
+WHERE brands.id = ranked.id
+  AND ranked.id <> ranked.keep_id;
+
+-- One brand per case-insensitive name
+CREATE UNIQUE INDEX IF NOT EXISTS idx_brands_name_lower_unique ON brands (LOWER(name));
+
+-- Bulk insert brands, silently skipping names that already exist (used by the scraper).
+-- PostgREST upserts can only target plain columns, so the expression index is used from SQL here.
+-- Returns only the rows that were actually inserted.
+CREATE OR REPLACE FUNCTION public.insert_brands_ignore_duplicates(new_brands JSONB)
+RETURNS SETOF brands
+LANGUAGE sql
+AS $$
+  INSERT INTO brands (name, category, website_url, is_active)
+  SELECT b.name, b.category, b.website_url, COALESCE(b.is_active, true)
+  FROM jsonb_to_recordset(new_brands) AS b(name TEXT, category TEXT, website_url TEXT, is_active BOOLEAN)
+  ON CONFLICT ((LOWER(name))) DO NOTHING
+  RETURNING *;
+$$;
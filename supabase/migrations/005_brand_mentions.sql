@@ -0,0 +1,60 @@
+-- How often each sponsor domain appears in each podcast feed (written by the scraper once per run).
+-- mentions counts episodes linking to the domain; first/last seen are those episodes' publish dates.
+CREATE TABLE IF NOT EXISTS brand_mentions (
+  domain TEXT NOT NULL,
+  feed_url TEXT NOT NULL,
+  brand_name TEXT NOT NULL,
+  mentions INTEGER NOT NULL DEFAULT 0,
+  first_seen_at TIMESTAMP WITH TIME ZONE,
+  last_seen_at TIMESTAMP WITH TIME ZONE,
+  created_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  updated_at TIMESTAMP WITH TIME ZONE DEFAULT TIMEZONE('utc', NOW()),
+  PRIMARY KEY (domain, feed_url)
+);
+
+-- Joins to brands on the same case-insensitive name as idx_brands_name_lower_unique
+CREATE INDEX IF NOT EXISTS idx_brand_mentions_brand_name_lower ON brand_mentions (LOWER(brand_name));
+
+ALTER TABLE brand_mentions ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Brand mentions are viewable by everyone"
+  ON brand_mentions FOR SELECT
+  USING (true);
+
+-- Per-brand totals for ranking sponsors by reach and recency
+CREATE OR REPLACE VIEW brand_mention_totals AS
+SELECT
+  LOWER(brand_name) AS brand_key,
+  MIN(brand_name) AS brand_name,
+  COUNT(*) AS podcasts,
+  SUM(mentions) AS mentions,
+  MIN(first_seen_at) AS first_seen_at,
+  MAX(last_seen_at) AS last_seen_at
+FROM brand_mentions
+GROUP BY LOWER(brand_name);
+
+-- Bulk upsert of one run's mention counts (used by the scraper), one row per (domain, feed_url).
+-- Counts are added to the stored ones and the seen range is widened, never replaced: the
+-- scraper only sends episodes it hasn't counted before (tracked per feed in its local feed state).
+-- Returns the number of rows written.
+CREATE OR REPLACE FUNCTION public.upsert_brand_mentions(new_mentions JSONB)
+RETURNS INTEGER
+LANGUAGE sql
+AS $$
+  WITH upserted AS (
+    INSERT INTO brand_mentions AS m (domain, feed_url, brand_name, mentions, first_seen_at, last_seen_at)
+    SELECT n.domain, n.feed_url, n.brand_name, n.mentions, n.first_seen_at, n.last_seen_at
+    FROM jsonb_to_recordset(new_mentions) AS n(
+      domain TEXT, feed_url TEXT, brand_name TEXT, mentions INTEGER,
+      first_seen_at TIMESTAMP WITH TIME ZONE, last_seen_at TIMESTAMP WITH TIME ZONE
+    )
+    ON CONFLICT (domain, feed_url) DO UPDATE SET
+      brand_name = EXCLUDED.brand_name,
+      mentions = m.mentions + EXCLUDED.mentions,
+      first_seen_at = LEAST(m.first_seen_at, EXCLUDED.first_seen_at),
+      last_seen_at = GREATEST(m.last_seen_at, EXCLUDED.last_seen_at),
+      updated_at = TIMEZONE('utc', NOW())
+    RETURNING 1
+  )
+  SELECT COUNT(*)::INTEGER FROM upserted;
+$$;
@@ -0,0 +1,18 @@
+-- Brands the enricher still has to process: a website but no contacts yet.
+-- Keyset-paginated on id so the enricher can stream any number of brands page by page;
+-- pass the last id of the previous page as after_id (NULL for the first page).
+-- The NOT EXISTS check uses idx_contacts_brand_id, and the id order uses the primary key.
+CREATE OR REPLACE FUNCTION public.brands_without_contacts(after_id UUID DEFAULT NULL, page_size INTEGER DEFAULT 1000)
+RETURNS TABLE (id UUID, name TEXT, website_url TEXT)
+LANGUAGE sql
+STABLE
+AS $$
+  SELECT b.id, b.name, b.website_url
+  FROM brands b
+  WHERE (after_id IS NULL OR b.id > after_id)
+    AND b.website_url IS NOT NULL
+    AND b.website_url <> ''
+    AND NOT EXISTS (SELECT 1 FROM contacts c WHERE c.brand_id = b.id)
+  ORDER BY b.id
+  LIMIT page_size;
+$$;
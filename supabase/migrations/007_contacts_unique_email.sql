@@ -0,0 +1,29 @@
+-- Remove duplicate contacts (same brand, same email ignoring case) before enforcing uniqueness.
+-- The oldest row of each is kept.
+WITH ranked AS (
+  SELECT
+    id,
+    FIRST_VALUE(id) OVER (PARTITION BY brand_id, LOWER(email) ORDER BY created_at, id) AS keep_id
+  FROM contacts
+)
+DELETE FROM contacts
+USING ranked
+WHERE contacts.id = ranked.id
+  AND ranked.id <> ranked.keep_id;
+
+-- One contact per brand and case-insensitive email
+CREATE UNIQUE INDEX IF NOT EXISTS idx_contacts_brand_email_unique ON contacts (brand_id, LOWER(email));
+
+-- Bulk insert contacts, silently skipping ones the brand already has (used by the enricher).
+-- Like insert_brands_ignore_duplicates, this targets the expression index from SQL,
+-- which PostgREST upserts can't do. Returns only the rows that were actually inserted.
+CREATE OR REPLACE FUNCTION public.insert_contacts_ignore_duplicates(new_contacts JSONB)
+RETURNS SETOF contacts
+LANGUAGE sql
+AS $$
+  INSERT INTO contacts (brand_id, email, name, role)
+  SELECT c.brand_id, c.email, c.name, c.role
+  FROM jsonb_to_recordset(new_contacts) AS c(brand_id UUID, email TEXT, name TEXT, role TEXT)
+  ON CONFLICT (brand_id, (LOWER(email))) DO NOTHING
+  RETURNING *;
+$$;
@@ -0,0 +1,99 @@
+-- Per-brand mention totals kept up to date by a trigger on brand_mentions, so ranking brands
+-- joins one row per brand instead of aggregating the whole brand_mention_totals view per page.
+-- Only the brands a changed brand_mentions row belongs to are recounted (through the
+-- LOWER(brand_name) index from migration 005).
+CREATE TABLE IF NOT EXISTS brand_mention_counts (
+  brand_key TEXT PRIMARY KEY,
+  mentions BIGINT NOT NULL DEFAULT 0,
+  last_seen_at TIMESTAMP WITH TIME ZONE
+);
+
+ALTER TABLE brand_mention_counts ENABLE ROW LEVEL SECURITY;
+
+CREATE POLICY "Brand mention counts are viewable by everyone"
+  ON brand_mention_counts FOR SELECT
+  USING (true);
+
+INSERT INTO brand_mention_counts (brand_key, mentions, last_seen_at)
+SELECT brand_key, mentions, last_seen_at FROM brand_mention_totals
+ON CONFLICT (brand_key) DO NOTHING;
+
+CREATE OR REPLACE FUNCTION public.refresh_brand_mention_count(key TEXT)
+RETURNS VOID
+LANGUAGE sql
+AS $$
+  WITH totals AS (
+    SELECT SUM(mentions) AS mentions, MAX(last_seen_at) AS last_seen_at
+    FROM brand_mentions
+    WHERE LOWER(brand_name) = key
+  ), upserted AS (
+    INSERT INTO brand_mention_counts AS c (brand_key, mentions, last_seen_at)
+    SELECT key, t.mentions, t.last_seen_at FROM totals t WHERE t.mentions IS NOT NULL
+    ON CONFLICT (brand_key) DO UPDATE SET
+      mentions = EXCLUDED.mentions,
+      last_seen_at = EXCLUDED.last_seen_at
+    RETURNING 1
+  )
+  DELETE FROM brand_mention_counts c
+  WHERE c.brand_key = key AND NOT EXISTS (SELECT 1 FROM totals t WHERE t.mentions IS NOT NULL);
+$$;
+
+CREATE OR REPLACE FUNCTION public.brand_mentions_count_trigger()
+RETURNS TRIGGER
+LANGUAGE plpgsql
+AS $$
+BEGIN
+  IF TG_OP IN ('INSERT', 'UPDATE') THEN
+    PERFORM public.refresh_brand_mention_count(LOWER(NEW.brand_name));
+  END IF;
+  IF TG_OP = 'DELETE' OR (TG_OP = 'UPDATE' AND LOWER(OLD.brand_name) <> LOWER(NEW.brand_name)) THEN
+    PERFORM public.refresh_brand_mention_count(LOWER(OLD.brand_name));
+  END IF;
+  RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS brand_mentions_count ON brand_mentions;
+CREATE TRIGGER brand_mentions_count
+  AFTER INSERT OR UPDATE OR DELETE ON brand_mentions
+  FOR EACH ROW EXECUTE FUNCTION public.brand_mentions_count_trigger();
+
+-- Brands the enricher still has to process, most mentioned first (podcast mentions, then the
+-- latest mention, from brand_mention_counts). Used when Hunter.io credits are limited, so the
+-- credits go to the brands that matter most while the enricher still streams page by page.
+-- Keyset-paginated on (mentions, last_seen_at, id): pass the last row of the previous page as
+-- after_mentions/after_last_seen/after_id (after_id NULL for the first page). Brands that get
+-- contacts during the run drop out without shifting later pages.
+CREATE OR REPLACE FUNCTION public.brands_without_contacts_by_mentions(
+  after_mentions BIGINT DEFAULT NULL,
+  after_last_seen TIMESTAMP WITH TIME ZONE DEFAULT NULL,
+  after_id UUID DEFAULT NULL,
+  page_size INTEGER DEFAULT 1000
+)
+RETURNS TABLE (id UUID, name TEXT, website_url TEXT, mentions BIGINT, last_seen_at TIMESTAMP WITH TIME ZONE)
+LANGUAGE sql
+STABLE
+AS $$
+  WITH ranked AS (
+    SELECT
+      b.id,
+      b.name,
+      b.website_url,
+      COALESCE(t.mentions, 0)::BIGINT AS mentions,
+      t.last_seen_at,
+      COALESCE(t.last_seen_at, '-infinity') AS seen_key
+    FROM brands b
+    LEFT JOIN brand_mention_counts t ON t.brand_key = LOWER(b.name)
+    WHERE b.website_url IS NOT NULL
+      AND b.website_url <> ''
+      AND NOT EXISTS (SELECT 1 FROM contacts c WHERE c.brand_id = b.id)
+  )
+  SELECT r.id, r.name, r.website_url, r.mentions, r.last_seen_at
+  FROM ranked r
+  WHERE after_id IS NULL
+     OR r.mentions < after_mentions
+     OR (r.mentions = after_mentions AND r.seen_key < COALESCE(after_last_seen, '-infinity'))
+     OR (r.mentions = after_mentions AND r.seen_key = COALESCE(after_last_seen, '-infinity') AND r.id > after_id)
+  ORDER BY r.mentions DESC, r.seen_key DESC, r.id
+  LIMIT page_size;
+$$;